@@ -88,8 +88,23 @@ removes other data that is generated by sovers/utilities/PyFoam
                           action="store_true",
                           dest="verbose",
                           default=False,
-                          help="Print what cases are cleared")
-        
+                          help="Print what cases are cleared and how much space was freed")
+        output.add_option("--dry-run",
+                          action="store_true",
+                          dest="dryRun",
+                          default=False,
+                          help="Don't remove anything. Only report how much would be removed")
+
+        behave=OptionGroup(self.parser,
+                           "Behaviour",
+                           "How the files are removed")
+        self.parser.add_option_group(behave)
+        behave.add_option("--jobs",
+                          type="int",
+                          dest="jobs",
+                          default=None,
+                          help="Number of threads that remove the files. Default: 8")
+
         
     def run(self):
         for cName in self.parser.getArgs():
@@ -100,13 +115,19 @@ removes other data that is generated by sovers/utilities/PyFoam
                     print "Clearing",cName
 
                 sol=SolutionDirectory(cName,archive=None,paraviewLink=False)
-                sol.clear(after=self.parser.getOptions().after,
-                          processor=self.parser.getOptions().processor,
-                          pyfoam=self.parser.getOptions().pyfoam,
-                          vtk=self.parser.getOptions().vtk,
-                          keepRegular=self.parser.getOptions().keepRegular,
-                          keepLast=self.parser.getOptions().latest,
-                          clearHistory=self.parser.getOptions().clearHistory,
-                          functionObjectData=self.parser.getOptions().functionObjectData)
-        
-                self.addToCaseLog(cName)
+                remover=sol.clear(after=self.parser.getOptions().after,
+                                  processor=self.parser.getOptions().processor,
+                                  pyfoam=self.parser.getOptions().pyfoam,
+                                  vtk=self.parser.getOptions().vtk,
+                                  keepRegular=self.parser.getOptions().keepRegular,
+                                  keepLast=self.parser.getOptions().latest,
+                                  clearHistory=self.parser.getOptions().clearHistory,
+                                  functionObjectData=self.parser.getOptions().functionObjectData,
+                                  jobs=self.opts.jobs,
+                                  dryRun=self.opts.dryRun)
+
+                if self.opts.verbose or self.opts.dryRun:
+                    print cName+":",remover.report()
+
+                if not self.opts.dryRun:
+                    self.addToCaseLog(cName)
@@ -73,6 +73,17 @@ If the case is under VCS then the cloning mechanism of the VCS is used
                           dest="followSymlinks",
                           default=False,
                           help="Follow symlinks instead of just copying them")
+        behave.add_option("--link-mesh",
+                          type="choice",
+                          choices=["hardlink","reflink"],
+                          dest="linkMesh",
+                          default=None,
+                          help="Don't copy the files of the meshes but link them. 'hardlink' is fast and needs no space but writing the mesh of the clone also changes the original. 'reflink' makes copy-on-write-copies (only on file-systems that support it). Files that can't be linked are copied. Possible values: hardlink, reflink. Default: copy the meshes")
+        behave.add_option("--jobs",
+                          type="int",
+                          dest="jobs",
+                          default=None,
+                          help="Number of processor-directories that are copied at the same time. Default: 8")
         behave.add_option("--no-vcs",
                           action="store_false",
                           dest="vcs",
@@ -126,7 +137,9 @@ If the case is under VCS then the cloning mechanism of the VCS is used
             
         sol.cloneCase(
             dName,
-            followSymlinks=self.parser.getOptions().followSymlinks
+            followSymlinks=self.parser.getOptions().followSymlinks,
+            link=self.opts.linkMesh,
+            jobs=self.opts.jobs
             )
 
         self.addToCaseLog(dName,"Cloned to",dName)
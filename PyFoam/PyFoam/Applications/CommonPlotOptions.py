@@ -39,6 +39,21 @@ class CommonPlotOptions(object):
                                default=None,
                                dest="implementation",
                                help="The implementation that should be used for plotting")
+        behaveGroup.add_option("--max-frame-rate",
+                               type="float",
+                               dest="maxFrameRate",
+                               default=2.,
+                               help="Maximum number of replots per second. Replots that are requested in between are dropped. Default: %default")
+        behaveGroup.add_option("--synchronous-plotting",
+                               action="store_false",
+                               dest="asyncPlotting",
+                               default=True,
+                               help="Replot in the thread that reads the output (by default the replotting is done by a separate thread if the implementation allows it)")
+        behaveGroup.add_option("--report-plotting",
+                               action="store_true",
+                               dest="reportPlotting",
+                               default=False,
+                               help="Print the number of replots, the dropped replots and the latency of the replots at the end")
         
         self.parser.add_option_group(behaveGroup)
 
@@ -22,6 +22,7 @@ from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
 from PyFoam.LogAnalysis.BoundingLogAnalyzer import BoundingLogAnalyzer
 from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
 from PyFoam.Basics.CSVCollection import CSVCollection
+from PyFoam.Execution.ProcessScheduler import ProcessScheduler
 
 from PyFoamApplication import PyFoamApplication
 from PyFoam.FoamInformation import changeFoamVersion,injectVariables
@@ -96,6 +97,18 @@ and executes all the variations of that case
                           action="store_false",
                           help="Don't start the process-control-server")
         
+        solver.add_option("--parallel-variations",
+                          dest="parallelVariations",
+                          type="int",
+                          default=1,
+                          help="Number of variations that are run at the same time (each in a separate process with the output going to a file of its own). Default: %default")
+        
+        solver.add_option("--core-budget",
+                          dest="coreBudget",
+                          type="int",
+                          default=None,
+                          help="Number of processors that the variations running at the same time may use (variations that are decomposed count with the number of processors). Default: the number of processors on this machine")
+        
     def run(self):
         fName=self.parser.getArgs()[0]
 
@@ -128,16 +141,23 @@ and executes all the variations of that case
         csv=CSVCollection(self.data.id+".csv")
         
         rDir=self.data.id+".results"
-        rmtree(rDir)
+        if path.exists(rDir):
+            rmtree(rDir)
         mkdir(rDir)
 
         calculated=0
         format="%%0%dd" % len(str(len(self.data)))
-        
+
+        if self.opts.parallelVariations>1:
+            scheduler=ProcessScheduler(maxJobs=self.opts.parallelVariations,
+                                       maxCores=self.opts.coreBudget)
+            results=[]
+
         for i in range(len(self.data)):
             runID=(format % i)
-            print >>aLog,runID,
-            csv["ID"]=runID
+            result=VariationResult(runID)
+            result.add(runID)
+            result["ID"]=runID
             
             use,para=self.data[i]
             para["template"]=self.data.template
@@ -158,134 +178,252 @@ and executes all the variations of that case
                 print "%s='%s' " % (k,v),
                 if v.find(" ")>=0 or v.find("\t")>=0:
                     v="'"+v+"'"
-                print >>aLog,v,
-                csv[k]=v
+                result.add(v)
+                result[k]=v
                 
             print
 
             if not use:
                 print "Skipping because not all conditions are satisfied"
-                csv.clear()
                 print 
+                if self.opts.parallelVariations>1:
+                    results.append(result)
+                else:
+                    result.write(aLog,csv)
                 continue
             
             cName=("%s."+format) % (self.data.id, i)
-            log=open(cName+".log","w")
+
+            if self.opts.parallelVariations>1:
+                try:
+                    nrProcs=self.data.prep.nrProcs(para)
+                except Exception,e:
+                    # the problem will show up when the variation is run
+                    print "Problem determining the number of processors:",e
+                    nrProcs=1
+                print "Scheduled with",nrProcs,"processors. Output goes to",cName+".output"
+                print
+                results.append(result)
+                result.task=scheduler.add(self.runVariationIsolated,
+                                          args=(para,result,cName,rDir,purge,steady),
+                                          cores=nrProcs)
+            else:
+                self.runVariation(para,result,cName,rDir,purge,steady)
+                result.write(aLog,csv)
+
+        if self.opts.parallelVariations>1:
+            print "Running",len(scheduler),"variations with at most",
+            print self.opts.parallelVariations,"at the same time"
+            print
+
+            def started(task):
+                print "Started variation",
+                print [r.runID for r in results if r.task==task][0]
+                sys.stdout.flush()
+
+            def finished(task,ok,res):
+                if ok:
+                    print "Finished variation",res.runID
+                else:
+                    print "Variation",
+                    print [r.runID for r in results if r.task==task][0],
+                    print "failed:"
+                    print res
+                sys.stdout.flush()
+
+            finishedResults=scheduler.run(started=started,finished=finished)
+
+            # write in the order of the variations
+            for r in results:
+                if r.task!=None:
+                    ok,res=finishedResults[r.task]
+                    if ok:
+                        r=res
+                    else:
+                        r.failed(res)
+                r.write(aLog,csv)
+
+        aLog.close()
+
+    def runVariationIsolated(self,para,result,cName,rDir,purge,steady):
+        """Runs a variation in a separate process. The output goes to a
+        file of its own
+        @return: the result"""
+        out=open(cName+".output","w")
+        sys.stdout=out
+        sys.stderr=out
+        try:
+            self.runVariation(para,result,cName,rDir,purge,steady)
+        finally:
+            out.flush()
+        return result
+
+    def runVariation(self,para,result,cName,rDir,purge,steady):
+        """Does the actual work for one variation (copying the template,
+        preparing, running and evaluating)
+        @param para: dictionary with the parameters of the variation
+        @param result: the VariationResult where the results are collected
+        @param cName: name of the case directory
+        @param rDir: directory where the results are kept
+        @param purge: remove the case directory afterwards
+        @param steady: run until convergence"""
+
+        log=open(cName+".log","w")
             
-            para["case"]=cName
-            print "Case-directory:",cName
-            para["results"]=path.join(rDir,runID)
-            print "Results directory:",para["results"]
-            mkdir(para["results"])
+        para["case"]=cName
+        print "Case-directory:",cName
+        para["results"]=path.join(rDir,result.runID)
+        print "Results directory:",para["results"]
+        mkdir(para["results"])
             
-            if path.exists(cName):
-                if self.opts.removeOld:
-                    print "   Removing old case-directory"
-                    rmtree(cName)
-                else:
-                    error("Case-directory",cName,"exists")
+        if path.exists(cName):
+            if self.opts.removeOld:
+                print "   Removing old case-directory"
+                rmtree(cName)
+            else:
+                error("Case-directory",cName,"exists")
 
-            print "   copying template"
-            out=copytree(self.data.template,cName)
-            print >>log,"---- Copying"
-            for l in out:
-                print >>log,l,
+        print "   copying template"
+        out=copytree(self.data.template,cName)
+        print >>log,"---- Copying"
+        for l in out or []:
+            print >>log,l,
                 
-            print "   preparing"
-            ok,erg=self.data.prep.execute(para,log)
-            print >>aLog,ok,
-            csv["prepare OK"]=ok
+        print "   preparing"
+        ok,erg=self.data.prep.execute(para,log)
+        result.add(ok)
+        result["prepare OK"]=ok
             
-            for i in range(len(erg)):
-                print >>aLog,erg[i],
-                csv["Prepare %02d" % i]=erg[i]
-                
-            aLog.flush()
+        for i in range(len(erg)):
+            result.add(erg[i])
+            result["Prepare %02d" % i]=erg[i]
                 
-            if self.opts.test:
-                print "   Skipping execution"
-            else:
-                print "   running the solver"
-                sys.stdout.flush()
+        if self.opts.test:
+            print "   Skipping execution"
+        else:
+            print "   running the solver"
+            sys.stdout.flush()
 
-                if steady:
-                    runnerClass=ConvergenceRunner
-                else:
-                    runnerClass=AnalyzedRunner
+            if steady:
+                runnerClass=ConvergenceRunner
+            else:
+                runnerClass=AnalyzedRunner
                     
-                run=runnerClass(BoundingLogAnalyzer(doTimelines=True,progress=True),
-                                argv=[self.data.solver,".",cName],
-                                silent=True,
-                                lam=Command.parallel,
-                                server=self.opts.server)
+            run=runnerClass(BoundingLogAnalyzer(doTimelines=True,progress=True),
+                            argv=[self.data.solver,".",cName],
+                            silent=True,
+                            lam=Command.parallel,
+                            server=self.opts.server)
                 
-                run.start()
-                ok=run.runOK()
-                if ok:
-                    print "   executed OK"
-                else:
-                    print "   fatal error"
-
-                for aName in run.listAnalyzers():
-                    a=run.getAnalyzer(aName)
-                    if 'titles' in dir(a):
-                        for tit in a.lines.getValueNames():
-                            t,v=a.getTimeline(tit)
-                            if len(v)>0:
-                                para["result_"+aName+"_"+tit]=v[-1]
-
-                print >>aLog,run.runOK(),run.lastTime(),run.run.wallTime(),
-                csv["Run OK"]=run.runOK()
-                csv["End Time"]=run.lastTime()
-                csv["Wall Time"]=run.run.wallTime()
-                csv["Wall Time (Foam)"]=run.totalClockTime()
-                csv["CPU Time"]=run.totalCpuTime()
-                csv["Wall Time First Step"]=run.firstClockTime()
-                csv["CPU Time First Step"]=run.firstCpuTime()
+            run.start()
+            ok=run.runOK()
+            if ok:
+                print "   executed OK"
+            else:
+                print "   fatal error"
+
+            for aName in run.listAnalyzers():
+                a=run.getAnalyzer(aName)
+                if 'titles' in dir(a):
+                    for tit in a.lines.getValueNames():
+                        t,v=a.getTimeline(tit)
+                        if len(v)>0:
+                            para["result_"+aName+"_"+tit]=v[-1]
+
+            result.add(run.runOK(),run.lastTime(),run.run.wallTime())
+            result["Run OK"]=run.runOK()
+            result["End Time"]=run.lastTime()
+            result["Wall Time"]=run.run.wallTime()
+            result["Wall Time (Foam)"]=run.totalClockTime()
+            result["CPU Time"]=run.totalCpuTime()
+            result["Wall Time First Step"]=run.firstClockTime()
+            result["CPU Time First Step"]=run.firstCpuTime()
                 
-                para["endTime"]=run.lastTime()
-                para["runlog"]=run.logFile
+            para["endTime"]=run.lastTime()
+            para["runlog"]=run.logFile
 
-                if self.opts.showDict:
-                    print para
+            if self.opts.showDict:
+                print para
                     
-                print "   evaluating results"
+            print "   evaluating results"
                 
-                ok,erg=self.data.post.execute(para,log)
+            ok,erg=self.data.post.execute(para,log)
 
-                if Command.parallel!=None:
-                    print "  Stoping LAM"
-                    Command.parallel.stop()
-                    Command.parallel=None
+            if Command.parallel!=None:
+                print "  Stoping LAM"
+                Command.parallel.stop()
+                Command.parallel=None
                 
-                if ok:
-                    print "  Evaluation OK",
-                else:
-                    print "  Evaluation failed",
+            if ok:
+                print "  Evaluation OK",
+            else:
+                print "  Evaluation failed",
 
-                if len(erg)>0:
-                    print ":",erg,
-                print
+            if len(erg)>0:
+                print ":",erg,
+            print
                 
-                print >>aLog,ok,
-                for i in range(len(erg)):
-                    print >>aLog,erg[i],
-                    csv["Post %02d" % i]=erg[i]
+            result.add(ok)
+            for i in range(len(erg)):
+                result.add(erg[i])
+                result["Post %02d" % i]=erg[i]
                     
-            if purge:
-                print "   removing the case-directory"
-                out=rmtree(cName)
-                print >>log,"---- Removing"
-                for l in out:
-                    print >>log,l,
-
-            log.close()
-            print
+        if purge:
+            print "   removing the case-directory"
+            out=rmtree(cName)
+            print >>log,"---- Removing"
+            for l in out or []:
+                print >>log,l,
+
+        log.close()
+        print
+        result.complete=True
+
+class VariationResult(object):
+    """The results of one variation. They are collected separately so
+    that variations that run at the same time don't mix their results in
+    the overview- and the CSV-file"""
+
+    def __init__(self,runID):
+        """@param runID: the ID of the variation"""
+        self.runID=runID
+        self.overview=[]
+        self.csv=[]
+        self.complete=False
+        self.task=None
+
+    def add(self,*vals):
+        """Add values to the line in the overview-file"""
+        self.overview+=vals
+
+    def __setitem__(self,key,value):
+        """Set a value in the CSV-file"""
+        self.csv.append((key,value))
+
+    def failed(self,msg):
+        """The variation failed with an error
+        @param msg: the error message
+        @return: the error message"""
+        self.complete=True
+        self.add("failed")
+        self["Error"]=msg.strip().split("\n")[-1]
+        return msg
+
+    def write(self,aLog,csv):
+        """Write the results
+        @param aLog: the overview-file
+        @param csv: the CSVCollection"""
+        for v in self.overview:
+            print >>aLog,v,
+        if self.complete:
+            for k,v in self.csv:
+                csv[k]=v
             print >>aLog
-            aLog.flush()
             csv.write()
-            
-        aLog.close()
+        else:
+            # the variation was skipped
+            csv.clear()
+        aLog.flush()
         
 class ComparatorData(object):
     """ The object that holds the actual data"""
@@ -403,6 +541,24 @@ class CommandChain(object):
 
         return status,result
 
+    def nrProcs(self,para):
+        """The number of processors that the case is decomposed for by
+        this chain. Derived values are calculated on a copy of the
+        parameters (without executing anything else)
+        @param para: A dictionary with the parameters"""
+
+        para=dict(para)
+        nr=1
+        for c in self.commands:
+            if not c.doIt(para):
+                continue
+            if isinstance(c,(DerivedCommand,SetDictionaryCommand)):
+                c.setValue(para)
+            elif isinstance(c,DecomposeCommand):
+                nr=c.nrProcs(para)
+
+        return nr
+
     def hasObjectOfType(self,typ):
         """Checks whether there is an object of a specific type"""
 
@@ -524,14 +680,20 @@ class DerivedCommand(Command):
         self.name=getNonEmpty(c,"name")
         self.expression=getNonEmpty(c,"expression")
 
-    def execute(self,para,log):
+    def setValue(self,para):
+        """Calculate the value and set it in the parameters
+        @return: the value"""
         tmp=replaceValues(self.expression,para)
         try:
             val=eval(tmp)
         except SyntaxError:
             error("Syntax error in",tmp)
-        print "     Setting",self.name,"to",val
         para[self.name]=str(val)
+        return val
+
+    def execute(self,para,log):
+        val=self.setValue(para)
+        print "     Setting",self.name,"to",val
 
         return True,None
 
@@ -556,8 +718,11 @@ class SetDictionaryCommand(Command):
         self.key=getNonEmpty(c,"key")
         self.value=getNonEmpty(c,"value")
 
-    def execute(self,para,log):
+    def setValue(self,para):
         para[self.key]=self.value
+
+    def execute(self,para,log):
+        self.setValue(para)
         return True,None
 
 class FoamVersionCommand(Command):
@@ -608,6 +773,10 @@ class DecomposeCommand(Command):
         self.hostfile=getNonEmpty(c,"hostfile",default="")
         self.options=getNonEmpty(c,"options",default="")
 
+    def nrProcs(self,para):
+        """@return: the number of processors the case is decomposed for"""
+        return max(1,int(replaceValues(self.cpus,para)))
+
     def execute(self,para,log):
         nr=int(replaceValues(self.cpus,para))
         machines=replaceValues(self.hostfile,para)
@@ -2,16 +2,23 @@
 Application-class that implements pyFoamListCases.py
 """
 from optparse import OptionGroup
-from os import path,listdir,stat
+from os import path,listdir,stat,getpid,rename
 import time,datetime
+# time.strptime imports this module when it is first called. That import
+# fails if it happens in several threads at the same time
+import _strptime
 from stat import ST_MTIME
 import string
-import subprocess
-import re
+import math
+import cPickle as pickle
 
 from PyFoamApplication import PyFoamApplication
 
 from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
+from PyFoam.RunDictionary.DirectoryIndex import statKey
+from PyFoam.Basics.Utilities import diskUsage
+from PyFoam.Infrastructure.Hardcoded import userDirectory,assertDirectory
+from PyFoam.Error import warning
 
 from PyFoam import configuration
 
@@ -49,7 +56,7 @@ etc). Currently doesn't honor the parallel data
                         action="store_true",
                         dest="diskusage",
                         default=False,
-                        help="Show the disk-usage of the case (in MB) - may take a long time")
+                        help="Show the disk-usage of the case (in MB) - may take a long time. It is calculated again even if --cache is used")
 
         what.add_option("--parallel-info",
                         action="store_true",
@@ -102,90 +109,199 @@ etc). Currently doesn't honor the parallel data
                           dest="progress",
                           default=False,
                           help="Print the directories while they are being processed")
+        behave.add_option("--jobs",
+                          action="store",
+                          type="int",
+                          dest="jobs",
+                          default=8,
+                          help="Number of directories that are scanned at the same time. Default: %default")
+        behave.add_option("--cache",
+                          action="store_true",
+                          dest="cache",
+                          default=False,
+                          help="Keep the information about the cases in a cache (in the directory "+userDirectory()+"). The information (except the state and the disk-usage) is only read again if time- or processor-directories were added or removed")
 
-    def readState(self,sol,sFile,default=""):
-        fName=path.join(sol.name,"PyFoamState."+sFile)
+    def readState(self,cName,sFile,default=""):
+        fName=path.join(cName,"PyFoamState."+sFile)
         if not path.exists(fName):
             return default
         else:
             self.hasState=True
             return open(fName).read().strip()
         
+    # version of the data in the cache. Increment if the data changes
+    cacheVersion=1
+
+    def cacheKey(self,cName):
+        """@return: data that changes if time- or processor-directories
+        of the case are added or removed"""
+        key=[statKey(cName)]
+        proc0=path.join(cName,"processor0")
+        if self.opts.parallel and path.isdir(proc0):
+            key.append(statKey(proc0))
+        return (self.cacheVersion,self.opts.parallel,tuple(key))
+
+    def scanCase(self,cName):
+        """Get the information about a case
+        @return: a dictionary with the data or None if this is no case"""
+
+        try:
+            key=None
+            if self.cache!=None:
+                key=self.cacheKey(cName)
+                try:
+                    oldKey,data=self.cache[path.abspath(cName)]
+                    if oldKey==key:
+                        data=data.copy()
+                        data["name"]=cName
+                        if self.opts.diskusage:
+                            # files in the case change without changing
+                            # the key (log-files for instance)
+                            data["diskusage"]=self.diskUsage(cName)
+                        self.readStates(cName,data)
+                        return data
+                except KeyError:
+                    pass
+
+            sol=SolutionDirectory(cName,archive=None,paraviewLink=False)
+            if not sol.isValid():
+                return None
+
+            if self.opts.progress:
+                print "Processing %s" % cName
+
+            data={}
+
+            data["mtime"]=stat(cName)[ST_MTIME]
+            times=sol.getTimes()
+            try:
+                data["first"]=times[0]
+            except IndexError:
+                data["first"]="None"
+            try:
+                data["last"]=times[-1]
+            except IndexError:
+                data["last"]="None"
+            data["nrSteps"]=len(times)
+            data["procs"]=sol.nrProcs()
+            data["pFirst"]=-1
+            data["pLast"]=-1
+            data["nrParallel"]=-1
+            if self.opts.parallel:
+                pTimes=sol.getParallelTimes()
+                data["nrParallel"]=len(pTimes)
+                if len(pTimes)>0:
+                    data["pFirst"]=pTimes[0]
+                    data["pLast"]=pTimes[-1]
+            data["name"]=cName
+            data["diskusage"]=-1
+            stats={}
+            if self.opts.diskusage:
+                data["diskusage"]=self.diskUsage(cName,stats=stats)
+            if self.opts.parallel:
+                for f in sol.processorDirs():
+                    try:
+                        mtime=stats[f].st_mtime
+                    except KeyError:
+                        mtime=stat(path.join(cName,f))[ST_MTIME]
+                    data["mtime"]=max(int(mtime),data["mtime"])
+
+            if self.cache!=None:
+                cached=data.copy()
+                # is always calculated again
+                cached["diskusage"]=-1
+                self.cache[path.abspath(cName)]=(key,cached)
+                self.cacheChanged=True
+
+            self.readStates(cName,data)
+
+            return data
+        except OSError:
+            print "%s is unreadable" % cName
+            return None
+
+    def diskUsage(self,cName,stats=None):
+        """@return: the disk-usage of the case in MB. Same as 'du -sm'
+        (rounded up)"""
+        return int(math.ceil(diskUsage(cName,stats=stats)/(1024.*1024.)))
+
+    def readStates(self,cName,data):
+        """Add the information from the state-files to the data"""
+
+        if not self.opts.state:
+            return
+
+        try:
+            data["nowTime"]=float(self.readState(cName,"CurrentTime"))
+        except ValueError:
+            data["nowTime"]=None
+
+        try:
+            data["lastOutput"]=time.mktime(time.strptime(self.readState(cName,"LastOutputSeen")))
+        except ValueError:
+            data["lastOutput"]="nix"
+        try:
+            data["startedAt"]=time.mktime(time.strptime(self.readState(cName,"StartedAt")))
+        except ValueError:
+            data["startedAt"]="nix"
+
+        data["state"]=self.readState(cName,"TheState")
+
+    def cacheFile(self):
+        return path.join(userDirectory(),"listCasesCache")
+
     def run(self):
         dirs=self.parser.getArgs()
         
         if len(dirs)==0:
             dirs=[path.curdir]
 
-        cData=[]
-        totalDiskusage=0
-
         self.hasState=False
-        
+
+        self.cache=None
+        self.cacheChanged=False
+        if self.opts.cache:
+            self.cache={}
+            try:
+                self.cache=pickle.load(open(self.cacheFile(),"rb"))
+            except (IOError,EOFError,pickle.UnpicklingError):
+                pass
+
+        candidates=[]
         for d in dirs:
             for n in listdir(d):
                 cName=path.join(d,n)
                 if path.isdir(cName):
-                    try:
-                        sol=SolutionDirectory(cName,archive=None,paraviewLink=False)
-                        if sol.isValid():
-                            if self.opts.progress:
-                                print "Processing",cName
-
-                            data={}
-
-                            data["mtime"]=stat(cName)[ST_MTIME]
-                            times=sol.getTimes()
-                            try:
-                                data["first"]=times[0]
-                            except IndexError:
-                                data["first"]="None"                            
-                            try:
-                                data["last"]=times[-1]
-                            except IndexError:
-                                data["last"]="None"                            
-                            data["nrSteps"]=len(times)
-                            data["procs"]=sol.nrProcs()
-                            data["pFirst"]=-1
-                            data["pLast"]=-1
-                            data["nrParallel"]=-1
-                            if self.opts.parallel:
-                                pTimes=sol.getParallelTimes()
-                                data["nrParallel"]=len(pTimes)
-                                if len(pTimes)>0:
-                                    data["pFirst"]=pTimes[0]
-                                    data["pLast"]=pTimes[-1]                                
-                            data["name"]=cName
-                            data["diskusage"]=-1
-                            if self.opts.diskusage:
-                                data["diskusage"]=int(subprocess.Popen(["du","-sm",cName], stdout=subprocess.PIPE).communicate()[0].split()[0])
-                                totalDiskusage+=data["diskusage"]
-                            if self.opts.parallel:
-                                for f in listdir(cName):
-                                    if re.compile("processor[0-9]+").match(f):
-                                        data["mtime"]=max(stat(path.join(cName,f))[ST_MTIME],data["mtime"])
-
-                            if self.opts.state:
-                                try:
-                                    data["nowTime"]=float(self.readState(sol,"CurrentTime"))
-                                except ValueError:
-                                    data["nowTime"]=None
-                                    
-                                try:
-                                    data["lastOutput"]=time.mktime(time.strptime(self.readState(sol,"LastOutputSeen")))
-                                except ValueError:
-                                    data["lastOutput"]="nix"
-                                try:
-                                    data["startedAt"]=time.mktime(time.strptime(self.readState(sol,"StartedAt")))
-                                except ValueError:
-                                    data["startedAt"]="nix"
-
-                                data["state"]=self.readState(sol,"TheState")
-                                    
-                            cData.append(data)
-                    except OSError:
-                        print cName,"is unreadable"
-                        
+                    candidates.append(cName)
+
+        if self.opts.jobs>1 and len(candidates)>1:
+            # most of the time is spent waiting for the file-system
+            from multiprocessing.pool import ThreadPool
+            pool=ThreadPool(min(self.opts.jobs,len(candidates)))
+            try:
+                results=pool.map(self.scanCase,candidates)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results=map(self.scanCase,candidates)
+
+        cData=[r for r in results if r!=None]
+
+        totalDiskusage=0
+        if self.opts.diskusage:
+            for c in cData:
+                totalDiskusage+=c["diskusage"]
+
+        if self.cacheChanged:
+            try:
+                assertDirectory(userDirectory())
+                tmpName=self.cacheFile()+".%d" % getpid()
+                pickle.dump(self.cache,open(tmpName,"wb"),pickle.HIGHEST_PROTOCOL)
+                rename(tmpName,self.cacheFile())
+            except (IOError,OSError),e:
+                warning("Could not write the cache",self.cacheFile(),":",e)
+
         if self.opts.progress:
             print "Sorting data"
             
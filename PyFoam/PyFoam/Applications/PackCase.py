@@ -69,6 +69,27 @@ with ~
                          dest="basename",
                          default=None,
                          help='Name of the case inside the tar-file. If not set the actual basename of the case is used')
+        self.parser.add_option("--threads",
+                         action="store",
+                         type="int",
+                         dest="threads",
+                         default=None,
+                         help='Number of threads that compress the tar-file. If unset the number of processors is used')
+
+        incremental=OptionGroup(self.parser,
+                                "Incremental",
+                                "Only pack the files that changed since a previous archive")
+        self.parser.add_option_group(incremental)
+        incremental.add_option("--manifest",
+                               action="store",
+                               dest="manifest",
+                               default=None,
+                               help='Write the list of packed files with their modification times and sizes to this file')
+        incremental.add_option("--since",
+                               action="store",
+                               dest="since",
+                               default=None,
+                               help='Manifest written for a previous archive. Only files that were changed or added since then are packed. Files that were removed are not recorded')
         
     def run(self):
         sName=self.parser.getArgs()[0]
@@ -96,4 +117,7 @@ with ~
                      last=self.parser.getOptions().last,
                      additional=self.parser.getOptions().additional,
                      exclude=self.parser.getOptions().exclude,
-                     base=self.parser.getOptions().basename)
+                     base=self.parser.getOptions().basename,
+                     threads=self.opts.threads,
+                     since=self.opts.since,
+                     manifest=self.opts.manifest)
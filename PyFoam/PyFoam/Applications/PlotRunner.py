@@ -127,6 +127,9 @@ read and the regular expressions in it are displayed
                           noLog=self.opts.noLog,
                           logTail=self.opts.logTail,
                           plottingImplementation=self.opts.implementation,
+                          maxFrameRate=self.opts.maxFrameRate,
+                          asyncPlotting=self.opts.asyncPlotting,
+                          reportPlotting=self.opts.reportPlotting,
                           writePickled=self.opts.writePickled,
                           singleFile=self.opts.singleDataFilesOnly,
                           remark=self.opts.remark,
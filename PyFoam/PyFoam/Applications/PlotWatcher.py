@@ -127,6 +127,9 @@ file until interrupted.
                            replotFrequency=self.opts.replotFrequency,
                            writePickled=self.opts.writePickled,
                            plottingImplementation=self.opts.implementation,
+                           maxFrameRate=self.opts.maxFrameRate,
+                           asyncPlotting=self.opts.asyncPlotting,
+                           reportPlotting=self.opts.reportPlotting,
                            solverNotRunning=self.opts.solverNotRunning)
 
         run.start()
@@ -57,7 +57,7 @@ Example of usage:
                 sub=match.group(2)
         
         try:
-            dictFile=ParsedParameterFile(fName,backup=False,debug=self.opts.debug)
+            dictFile=ParsedParameterFile(fName,backup=False,debug=self.opts.debug,lazy=True)
             val=dictFile[key]
         except KeyError:
             self.error("Key: ",key,"not existing in File",fName)
@@ -5,26 +5,35 @@ from PyFoam.Applications.PyFoamApplication import PyFoamApplication
 
 import xmlrpclib,socket
 import sys
+from os import path,sep
 from optparse import OptionGroup
 import cPickle as pickle
 from time import sleep
 
 from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry
+from PyFoam.Basics.TimelineStore import isTimelineStore,readTimelineStore
 from PyFoam.Basics.PlotTimelinesFactory import createPlotTimelines
 from PyFoam.Basics.GeneralPlotTimelines import PlotLinesRegistry
 from PyFoam.Basics.CustomPlotInfo import CustomPlotInfo
+from PyFoam.Execution.ProcessScheduler import ProcessScheduler,nrOfCores
 from PyFoam.Error import error,warning
 
 class RedoPlot(PyFoamApplication):
-    def __init__(self):
+    def __init__(self,args=None):
         description="""\
 Either connects to a running pyFoam-Server and gets all the
 information for plotting or reads the relevant data from a pickle file
-and either displays the plot or writes the plots to file
+and either displays the plot or writes the plots to file.
+
+Several pickle files (or servers specified as <host>:<port>) can be
+given. They are processed in parallel and the names of the files that
+are written are prefixed with a name derived from the file (the
+server)
         """
         PyFoamApplication.__init__(self,
+                                   args=args,
                                    description=description,
-                                   usage="%prog [options] (<host> <port>|<pickleFile>)",
+                                   usage="%prog [options] (<host> <port>|<host>:<port> ...|<pickleFile> ...)",
                                    interspersed=True,
                                    nr=1,
                                    exactNr=False)
@@ -41,7 +50,19 @@ and either displays the plot or writes the plots to file
                         dest="pickle",
                         action="store_true",
                         default=False,
-                        help="Get the data from a pickle-file")
+                        help="Get the data from a pickle-file (pickledPlots) or a timeline store (timelineStore) in the .analyzed-directory of a run")
+        mode.add_option("--update-interval",
+                        dest="updateInterval",
+                        action="store",
+                        default=None,
+                        type="float",
+                        help="Only with --server: keep running and every that many seconds get the data that changed since the last time from the server and update the plots/files. Stops when the server goes away")
+        mode.add_option("--jobs",
+                        dest="jobs",
+                        action="store",
+                        default=None,
+                        type="int",
+                        help="Number of inputs that are processed at the same time (in separate processes). Default: the number of processors")
 
         self.parser.add_option_group(mode)
 
@@ -53,6 +74,11 @@ and either displays the plot or writes the plots to file
                           action="store_true",
                           default=False,
                           help="Write CSV-files instead of plotting")
+        output.add_option("--with-csv-files",
+                          dest="withCsvFiles",
+                          action="store_true",
+                          default=False,
+                          help="Write CSV-files in addition to the plots")
         output.add_option("--file-prefix",
                           dest="filePrefix",
                           default="",
@@ -89,9 +115,9 @@ and either displays the plot or writes the plots to file
         plot.add_option("--sleep-time",
                         dest="sleepTime",
                         action="store",
-                        default=0.1,
+                        default=0.,
                         type="float",
-                        help="How long to wait to allow gnuplot to finish. Default: %default")
+                        help="How long to wait after every plot. Usually not needed because at the end the program waits for the plotting implementation to write all the pictures. Default: %default")
         plot.add_option("--insert-titles",
                         dest="insertTitles",
                         action="store_true",
@@ -106,13 +132,93 @@ and either displays the plot or writes the plots to file
         if self.opts.server and self.opts.pickle:
             error("Both modes selected")
 
+        sources=self.getSources()
+        if len(sources)>1 and self.opts.updateInterval:
+            error("--update-interval only works with one server")
+
+        jobs=self.opts.jobs
+        if jobs==None:
+            jobs=nrOfCores()
+        jobs=min(jobs,len(sources))
+
+        if jobs<=1:
+            for s in sources:
+                self.processSource(*s)
+            return
+
+        scheduler=ProcessScheduler(maxJobs=jobs,maxCores=jobs)
+        for s in sources:
+            scheduler.add(self.processSource,args=s)
+
+        def finished(task,ok,res):
+            if ok:
+                print "Finished",sources[task][1],":",len(res),"files written"
+            else:
+                print "Processing",sources[task][1],"failed:"
+                print res
+            sys.stdout.flush()
+
+        results=scheduler.run(finished=finished)
+        failed=len([ok for ok,res in results if not ok])
+        if failed>0:
+            error(failed,"of",len(sources),"inputs failed")
+
+    def getSources(self):
+        """@return: list with the kind ('server' or 'file'), the name
+        (the server address or the file name) and the prefix for the
+        files of every input"""
+
+        args=self.parser.getArgs()
+        sources=[]
         if self.opts.server:
-            if len(self.parser.getArgs())!=2:
-                error("Need a server and a port to be specified")
-                
-            host=self.parser.getArgs()[0]
-            port=int(self.parser.getArgs()[1])
+            i=0
+            while i<len(args):
+                if args[i].find(":")>0:
+                    host,port=args[i].rsplit(":",1)
+                    i+=1
+                elif i+1<len(args):
+                    host,port=args[i],args[i+1]
+                    i+=2
+                else:
+                    error("Need a server and a port to be specified")
+                try:
+                    port=int(port)
+                except ValueError:
+                    error("Port",port,"of server",host,"is not a number")
+                sources.append(["server",(host,port),"%s_%d" % (host,port)])
+        else:
+            for f in args:
+                d=path.dirname(path.normpath(f))
+                if d.endswith(".analyzed"):
+                    d=d[:-len(".analyzed")]
+                if d=="":
+                    d=path.basename(f)
+                sources.append(["file",f,d.replace(sep,"_").strip("._")])
 
+        if len(sources)==1:
+            # compatible with the single-input behaviour
+            sources[0][2]=""
+        else:
+            used={}
+            for s in sources:
+                label=s[2]
+                if label in used:
+                    used[label]+=1
+                    s[2]="%s_%d" % (label,used[label])
+                else:
+                    used[label]=1
+                s[2]+="_"
+        return [tuple(s) for s in sources]
+
+    def processSource(self,kind,name,label):
+        """Get the data of one input and write the files/plots for it
+        @param kind: 'server' or 'file'
+        @param name: the address of the server or the name of the file
+        @param label: prefix for the names of the written files
+        @return: list with the names of the written files"""
+
+        if kind=="server":
+            host,port=name
             try:
                 self.server=xmlrpclib.ServerProxy("http://%s:%d" % (host,port))
                 methods=self.server.system.listMethods()
@@ -122,16 +228,18 @@ and either displays the plot or writes the plots to file
                 self.error("XMLRPC-problem",reason)
 
             plotInfo=self.executeCommand("getPlots()")
-            lineInfo=self.executeCommand("getPlotData()")
+            lineInfo=self.executeCommand("getPlotDataChanges({})")
+            if lineInfo==None:
+                # older server
+                lineInfo=self.executeCommand("getPlotData()")
         else:
-            if len(self.parser.getArgs()[0])!=1:
-                warning("Only the first parameter is used")
-                
-            fName=self.parser.getArgs()[0]
-            unpick=pickle.Unpickler(open(fName))
-            
-            lineInfo=unpick.load()
-            plotInfo=unpick.load()
+            if isTimelineStore(name):
+                lineInfo,plotInfo=readTimelineStore(name)
+            else:
+                unpick=pickle.Unpickler(open(name))
+
+                lineInfo=unpick.load()
+                plotInfo=unpick.load()
         
         print "Found",len(plotInfo),"plots and",len(lineInfo),"data sets"
         
@@ -142,44 +250,86 @@ and either displays the plot or writes the plots to file
             
         registry.resolveSlaves()
 
+        self.pRegistry=PlotLinesRegistry()
+        plots={}
+        written=[]
+        try:
+            written+=self.writeOutput(registry,plotInfo,plots,label=label)
+
+            if kind=="server" and self.opts.updateInterval:
+                while True:
+                    sleep(self.opts.updateInterval)
+                    try:
+                        changes=self.server.getPlotDataChanges(registry.lastSeen())
+                    except (xmlrpclib.Fault,socket.error),reason:
+                        print "Stopping updates:",reason
+                        break
+                    registry.applyChanges(changes)
+                    written+=self.writeOutput(registry,plotInfo,plots,label=label)
+        finally:
+            # returns when all the pictures are written
+            for p in plots.values():
+                p.finish()
+
+        return written
+
+    def writeOutput(self,registry,plotInfo,plots,label=""):
+        """Write the files or plots for the current data
+        @param registry: the lines
+        @param plotInfo: the specifications of the plots
+        @param plots: dictionary with the plots that were already created
+        @param label: added to the prefixes of the file names
+        @return: list with the names of the written files"""
+
+        written=[]
+
         if self.opts.csvFiles and self.opts.rawLines:
             for k,l in registry.lines.iteritems():
                 name=str(k)
                 if type(k)==int:
                     name="Line%d" % k
-                name=self.opts.filePrefix+name+".csv"
+                name=self.opts.filePrefix+label+name+".csv"
                 print "Writing",k,"to",name
                 l.getData().writeCSV(name)
-            return
-        
-        pRegistry=PlotLinesRegistry()
+                written.append(name)
+            return written
         
         for i,p in plotInfo.iteritems():
             theId=p["id"]
             print "Plotting",i,":",theId,
             spec=CustomPlotInfo(raw=p["spec"])
             if len(registry.get(p["data"]).getTimes())>0 and registry.get(p["data"]).getValueNames()>0:
-                if self.opts.csvFiles:
-                    registry.get(p["data"]).getData().writeCSV(self.opts.filePrefix+theId+".csv")
-                else:
-                    mp=createPlotTimelines(registry.get(p["data"]),
-                                           spec,
-                                           implementation=self.opts.implementation,
-                                           showWindow=self.opts.showWindow,
-                                           registry=pRegistry)
-                    if self.opts.insertTitles:
-                        mp.actualSetTitle(p["spec"]["theTitle"])
+                if self.opts.csvFiles or self.opts.withCsvFiles:
+                    name=self.opts.filePrefix+label+theId+".csv"
+                    registry.get(p["data"]).getData().writeCSV(name)
+                    written.append(name)
+                if not self.opts.csvFiles:
+                    if theId in plots:
+                        mp=plots[theId]
+                        mp.redo()
+                    else:
+                        mp=createPlotTimelines(registry.get(p["data"]),
+                                               spec,
+                                               implementation=self.opts.implementation,
+                                               showWindow=self.opts.showWindow,
+                                               registry=self.pRegistry)
+                        plots[theId]=mp
+                        if self.opts.insertTitles:
+                            mp.actualSetTitle(p["spec"]["theTitle"])
                     if self.opts.writePictures:
                         if mp.hasData():
-                            mp.doHardcopy(self.opts.prefix+theId,"png")
+                            mp.doHardcopy(self.opts.prefix+label+theId,"png")
+                            written.append(self.opts.prefix+label+theId+".png")
                         else:
                             print "has no data",
                 print
             else:
                 print "No data - skipping"
 
-            sleep(self.opts.sleepTime) # there seems to be a timing issue with Gnuplot
-            
+            if self.opts.sleepTime>0:
+                sleep(self.opts.sleepTime)
+
+        return written
         
     def executeCommand(self,cmd):
         result=None
@@ -0,0 +1,110 @@
+"""Helpers for reading and writing lists in the binary format of
+OpenFOAM-files. The binary data is handled with numpy"""
+
+from PyFoam.Error import PyFoamException
+
+import re
+
+listComponents={"label"           : ("label",1),
+                "bool"            : ("label",1),
+                "scalar"          : ("scalar",1),
+                "sphericalTensor" : ("scalar",1),
+                "vector2D"        : ("scalar",2),
+                "vector"          : ("scalar",3),
+                "symmTensor"      : ("scalar",6),
+                "tensor"          : ("scalar",9)}
+"""The basic type and the number of components of the list elements"""
+
+defaultArch="LSB;label=32;scalar=64"
+"""Architecture that is assumed if the header has no arch-entry"""
+
+def archTypes(arch=None):
+    """Get the numpy-types for the labels and scalars of an architecture
+    @param arch: the arch-entry of the header (for instance
+    'LSB;label=32;scalar=64'). Quotes are allowed
+    @return: tuple with the numpy-types of label and scalar"""
+
+    if arch==None:
+        arch=defaultArch
+    arch=arch.strip('"')
+
+    order="<"
+    sizes={"label":32,"scalar":64}
+    for e in arch.split(";"):
+        e=e.strip()
+        if e=="LSB":
+            order="<"
+        elif e=="MSB":
+            order=">"
+        elif e.find("=")>0:
+            name,val=e.split("=",1)
+            if name.strip() in sizes:
+                sizes[name.strip()]=int(val)
+
+    if sizes["label"] not in [32,64]:
+        raise BinaryFormatError("Unsupported label size "+str(sizes["label"])+" in arch "+arch)
+    if sizes["scalar"] not in [32,64]:
+        raise BinaryFormatError("Unsupported scalar size "+str(sizes["scalar"])+" in arch "+arch)
+
+    return (order+"i%d" % (sizes["label"]/8),
+            order+"f%d" % (sizes["scalar"]/8))
+
+def typeFromName(name):
+    """Get the basic type and the number of components from a type name
+    @param name: names like List<vector>, vectorField or labelList
+    @return: tuple with 'label' or 'scalar' and the number of components.
+    None if the name is unknown"""
+
+    if name==None:
+        return None
+    m=re.match("^List<(.+)>$",name)
+    if m:
+        name=m.group(1)
+    else:
+        for post in ["Field","List"]:
+            if name[-len(post):]==post:
+                name=name[:-len(post)]
+                break
+    if name=="faceCompact":
+        name="label"
+
+    return listComponents.get(name,None)
+
+def decodeList(data,lngth,dtype,components=1):
+    """Converts raw binary data to a numpy-array
+    @param data: string with the raw data
+    @param lngth: number of elements
+    @param dtype: numpy-type of the components
+    @param components: number of components of every element
+    @return: array in the native byte order. Has more than one column if
+    the elements have more than one component"""
+
+    import numpy
+
+    val=numpy.frombuffer(data,dtype=dtype,count=lngth*components)
+    val=val.astype(val.dtype.newbyteorder("="))
+    if components>1:
+        val=val.reshape((lngth,components))
+    return val
+
+def encodeList(val,labelType,scalarType,basicType=None):
+    """Converts a list to raw binary data
+    @param val: a numpy-array or something that numpy can convert to one
+    @param labelType: numpy-type for integer data
+    @param scalarType: numpy-type for floating point data
+    @param basicType: 'label' or 'scalar'. If unset the type of the data
+    decides
+    @return: the length of the list and the raw data"""
+
+    import numpy
+
+    val=numpy.asarray(val)
+    if basicType=="label" or (basicType==None and val.dtype.kind in "iub"):
+        val=val.astype(labelType)
+    else:
+        val=val.astype(scalarType)
+    return len(val),val.tobytes()
+
+class BinaryFormatError(PyFoamException):
+    def __init__(self,descr):
+        PyFoamException.__init__(self,descr)
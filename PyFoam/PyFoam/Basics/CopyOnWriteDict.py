@@ -0,0 +1,96 @@
+"""A dictionary that shares its data with other dictionaries until it
+is modified"""
+
+from UserDict import DictMixin
+
+class CopyOnWriteDict(DictMixin,object):
+    """Read-only view of a dictionary that makes a private copy of the
+    data the first time it is modified. Sub-dictionaries are wrapped
+    the same way (so only the modified levels are copied).
+
+    Used to pass the same data to a number of listeners without
+    copying it for every one of them"""
+
+    def __init__(self,data):
+        """@param data: the dictionary that is shared. Must not be
+        modified by the owner afterwards"""
+        self._data=data
+        self._copied=False
+        self._children={}
+
+    def isCopied(self):
+        """@return: whether this level has already made a private copy"""
+        return self._copied
+
+    def _makeCopy(self):
+        if not self._copied:
+            self._data=dict(self._data)
+            self._copied=True
+
+    def __getitem__(self,key):
+        try:
+            return self._children[key]
+        except KeyError:
+            pass
+        val=self._data[key]
+        if isinstance(val,(dict,CopyOnWriteDict)):
+            val=CopyOnWriteDict(val)
+            self._children[key]=val
+        return val
+
+    def __setitem__(self,key,value):
+        self._makeCopy()
+        self._data[key]=value
+        if key in self._children:
+            del self._children[key]
+
+    def __delitem__(self,key):
+        self._makeCopy()
+        del self._data[key]
+        if key in self._children:
+            del self._children[key]
+
+    def keys(self):
+        return self._data.keys()
+
+    def __contains__(self,key):
+        return key in self._data
+
+    def has_key(self,key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def toDict(self):
+        """@return: the data as ordinary dictionaries (a copy)"""
+        return plainCopy(self)
+
+    def copy(self):
+        return self.toDict()
+
+    def __deepcopy__(self,memo):
+        from copy import deepcopy
+        return deepcopy(self.toDict(),memo)
+
+    def __reduce__(self):
+        # pickle as an ordinary dictionary so that no one needs this class
+        # for reading the data
+        return (dict,(self.toDict(),))
+
+def plainCopy(val):
+    """Copies nested dictionaries and converts every CopyOnWriteDict to an
+    ordinary dictionary on the way (for instance for transfering the data
+    via XMLRPC)
+    @param val: the value to convert"""
+
+    if isinstance(val,(dict,CopyOnWriteDict)):
+        result={}
+        for k in val.keys():
+            result[k]=plainCopy(val[k])
+        return result
+    else:
+        return val
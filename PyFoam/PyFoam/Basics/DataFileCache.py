@@ -0,0 +1,131 @@
+"""Cache for the data in text-files with columns of numbers (like
+timelines or samples). The data of a file is parsed once into a numpy
+array and kept until the file changes"""
+
+from os import stat
+import re,warnings
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    OrderedDict=dict
+
+# Maximum number of bytes that the cached data may use. The data of
+# the file that was used last is always kept
+maxCacheSize=2**30
+
+_dataCache=OrderedDict()
+_cacheSize=0
+
+_commentLine=re.compile(r"^[ \t]*#.*$\n?",re.M)
+
+def clearCache():
+    """Throw away all the cached data"""
+    global _cacheSize
+    _dataCache.clear()
+    _cacheSize=0
+
+def parseDataFile(fName):
+    """Reads the data of a file into an array. Vectors are
+    split into their components. Lines that are shorter than the
+    longest line are padded with NaN
+    @param fName: name of the file
+    @return: tuple with the array (one row per data line) and an array
+    with the number of values in every row (None if all the rows are
+    complete)"""
+    import numpy
+
+    txt=open(fName).read().translate(None,"()")
+
+    # the header is always at the start. Only look for other comments if
+    # there are any
+    start=0
+    while True:
+        m=_commentLine.match(txt,start)
+        if m==None or m.end()==start:
+            break
+        start=m.end()
+    body=txt[start:]
+    if body.find("#")>=0:
+        body=_commentLine.sub("",body)
+
+    lines=body.count("\n")
+    if len(body)>0 and body[-1]!="\n":
+        lines+=1
+    end=body.find("\n")
+    if end<0:
+        end=len(body)
+    nrCols=len(body[:end].split())
+
+    if lines>0 and nrCols>0:
+        # fast path: all lines have the same length
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            data=numpy.fromstring(body,sep=" ")
+        if data.size==lines*nrCols:
+            return data.reshape(lines,nrCols),None
+
+    # lines with a different number of values (for instance because the
+    # file is currently being written) or unparsable values
+    rows=[]
+    lengths=[]
+    for l in body.splitlines():
+        v=l.split()
+        if len(v)==0:
+            continue
+        try:
+            row=[float(v[0])]
+        except ValueError:
+            continue
+        for x in v[1:]:
+            try:
+                row.append(float(x))
+            except ValueError:
+                row.append(float("nan"))
+        rows.append(row)
+        lengths.append(len(row))
+
+    if len(rows)==0:
+        return numpy.zeros((0,max(nrCols,1))),None
+
+    data=numpy.empty((len(rows),max(lengths)))
+    data.fill(float("nan"))
+    for i,r in enumerate(rows):
+        data[i,:len(r)]=r
+
+    return data,numpy.array(lengths)
+
+def cachedDataFile(fName):
+    """Get the data of a file from the cache. The file is
+    reread if the modification time or the size changed
+    @param fName: name of the file
+    @return: a dictionary with the entries data and lengths (see
+    parseDataFile)"""
+    global _cacheSize
+
+    s=stat(fName)
+    key=(s.st_mtime,s.st_size)
+
+    try:
+        entry=_dataCache.pop(fName)
+        if entry["key"]!=key:
+            _cacheSize-=entry["data"].nbytes
+            entry=None
+    except KeyError:
+        entry=None
+
+    if entry==None:
+        data,lengths=parseDataFile(fName)
+        entry={"key"     : key,
+               "data"    : data,
+               "lengths" : lengths}
+        _cacheSize+=data.nbytes
+
+    # the entry that was used last is at the end
+    _dataCache[fName]=entry
+
+    while _cacheSize>maxCacheSize and len(_dataCache)>1:
+        old=_dataCache.pop(iter(_dataCache).next())
+        _cacheSize-=old["data"].nbytes
+
+    return entry
@@ -5,6 +5,11 @@ from copy import deepcopy
 import string,math
 import re
 
+def isNumpyArray(val):
+    """Checks whether val is a numpy-array (without having to import
+    numpy if it is not)"""
+    return type(val).__name__=="ndarray" and type(val).__module__=="numpy"
+
 class FoamDataType(object):
     def __repr__(self):
         return "'"+str(self)+"'"
@@ -16,7 +21,7 @@ class Field(FoamDataType):
         self.name=name
         if self.name==None:
             self.uniform=True
-        elif type(val) in[list,UnparsedList]:
+        else:
             self.uniform=False
             
     def __str__(self):
@@ -35,6 +40,12 @@ class Field(FoamDataType):
             return cmp(self.uniform,other.uniform)
         elif self.name!=other.name:
             return cmp(self.name,other.name)
+        elif isNumpyArray(self.val) or isNumpyArray(other.val):
+            import numpy
+            if numpy.array_equal(self.val,other.val):
+                return 0
+            else:
+                return 1
         else:
             return cmp(self.val,other.val)
 
@@ -309,6 +320,117 @@ class DictProxy(dict):
         redir.useAsRedirect()
         self._redirects.append(redir)
         
+class LazyDictProxy(DictProxy):
+    """A DictProxy whose entries are only parsed when they are accessed.
+    Entries that were never accessed are written back exactly as they
+    were read. Entries that are dictionaries become LazyDictProxy
+    themselves"""
+
+    def __init__(self,content,start,end,parser):
+        """@param content: the text the dictionary is read from
+        @param start: position where the body of the dictionary starts
+        @param end: position where the body of the dictionary ends
+        @param parser: function that gets the text of a single entry and
+        returns a dictionary with the parsed entry"""
+        DictProxy.__init__(self)
+        from PyFoam.Basics.FoamFileIndex import indexDictionary
+
+        self._content=content
+        self._parser=parser
+        self._unparsed={}
+        
+        directives=0
+        for e in indexDictionary(content,start,end):
+            if e.isDirective():
+                # the same representation as the parser
+                dict.__setitem__(self,directives,e.key+"\n")
+                self._order.append(directives)
+                directives+=1
+            elif e.key[0]=='"':
+                # regular expressions are handled by the DictProxy
+                self._unparsed[e.key]=e
+                self._parseEntry(e.key)
+            else:
+                if e.key in self._unparsed:
+                    DictProxy.__delitem__(self,e.key)
+                self._unparsed[e.key]=e
+                dict.__setitem__(self,e.key,None)
+                self._order.append(e.key)
+            
+    def _parseEntry(self,key):
+        e=self._unparsed.pop(key)
+        if e.isDict():
+            val=LazyDictProxy(self._content,e.bodyStart,e.bodyEnd,self._parser)
+        else:
+            data=self._parser(self._content[e.keyStart:e.end])
+            if key in data:
+                val=data[key]
+            else:
+                val=data.getRegexpValue(key)
+        DictProxy.__setitem__(self,key,val)
+
+    def isUnparsed(self,key):
+        """Is this entry still unparsed"""
+        return key in self._unparsed
+
+    def getUnparsed(self,key):
+        """Get the original text of an unparsed entry (including the
+        comments in front of it)"""
+        e=self._unparsed[key]
+        return self._content[e.start:e.end].lstrip("\n")
+
+    def parseAll(self):
+        """Parse all the entries (on this level)"""
+        for k in self._unparsed.keys():
+            self._parseEntry(k)
+        
+    def __getitem__(self,key):
+        if key in self._unparsed:
+            self._parseEntry(key)
+        return DictProxy.__getitem__(self,key)
+
+    def __setitem__(self,key,value):
+        if key in self._unparsed:
+            del self._unparsed[key]
+        DictProxy.__setitem__(self,key,value)
+
+    def __delitem__(self,key):
+        if key in self._unparsed:
+            del self._unparsed[key]
+        DictProxy.__delitem__(self,key)
+
+    def get(self,key,default=None):
+        if key in self:
+            return self[key]
+        else:
+            return default
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return [(k,self[k]) for k in self.keys()]
+
+    def itervalues(self):
+        for k in self.keys():
+            yield self[k]
+
+    def iteritems(self):
+        for k in self.keys():
+            yield k,self[k]
+
+    def __deepcopy__(self,memo):
+        self.parseAll()
+        return DictProxy.__deepcopy__(self,memo)
+    
+    def __repr__(self):
+        self.parseAll()
+        return DictProxy.__repr__(self)
+
+    def __str__(self):
+        self.parseAll()
+        return DictProxy.__str__(self)
+    
 class TupleProxy(list):
     """Enables Tuples to be manipulated"""
 
@@ -11,6 +11,8 @@ from os import uname
 
 class DummyPlotTimelines(GeneralPlotTimelines):
     """This class doesn't open a window and plots nothing"""
+
+    threadSafe=True
     
     def __init__(self,
                  timelines,
@@ -27,9 +29,10 @@ class DummyPlotTimelines(GeneralPlotTimelines):
         
         self.redo()
 
-    def buildData(self,times,name,title,lastValid):
+    def buildData(self,times,values,name,title,lastValid):
         """Build the implementation specific data
         @param times: The vector of times for which data exists
+        @param values: The values for these times
         @param name: the name under which the data is stored in the timeline
         @param title: the title under which this will be displayed"""
 
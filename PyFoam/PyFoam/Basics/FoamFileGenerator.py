@@ -2,7 +2,9 @@
 """Transform a Python data-structure into a OpenFOAM-File-Representation"""
 
 from PyFoam.Error import error,PyFoamException
-from PyFoam.Basics.DataStructures import Vector,Field,Dimension,TupleProxy,DictProxy,Tensor,SymmTensor,Unparsed,UnparsedList,Codestream,DictRedirection
+from PyFoam.Basics.DataStructures import Vector,Field,Dimension,TupleProxy,DictProxy,Tensor,SymmTensor,Unparsed,UnparsedList,Codestream,DictRedirection,isNumpyArray,LazyDictProxy
+
+from PyFoam.Basics.BinaryFormat import archTypes,encodeList,typeFromName
 
 import string
 
@@ -27,6 +29,11 @@ class FoamFileGenerator(object):
         self.data=data
         self.header=header
         self.longListThreshold=longListThreshold
+
+        self.binaryTypes=None
+        if self.header:
+            if self.header.get("format",None)=="binary":
+                self.binaryTypes=archTypes(self.header.get("arch",None))
         
     def __str__(self):
         return self.makeString()
@@ -37,12 +44,17 @@ class FoamFileGenerator(object):
         if self.header:
             result+="FoamFile\n{\n"+self.strDict(self.header,indent=1)+"}\n\n"
 
-        if type(self.data) in [dict,DictProxy]:
+        if type(self.data) in [dict,DictProxy,LazyDictProxy]:
             result+=self.strDict(self.data,firstLevel=firstLevel)
         elif type(self.data) in [tuple,TupleProxy]:
             result+=self.strTuple(self.data)
         elif type(self.data) in [list,UnparsedList]:
             result+=self.strList(self.data)
+        elif isNumpyArray(self.data):
+            if self.binaryTypes:
+                result+=self.strBinaryList(self.data)
+            else:
+                result+=self.strNumpyArray(self.data)
         elif self.data==None:
             raise FoamFileGeneratorError("<None> found")
         else:
@@ -65,13 +77,19 @@ class FoamFileGenerator(object):
             
     def strDict(self,dic,indent=0,firstLevel=False):
         s=""
-        if type(dic)==DictProxy:
+        if type(dic) in [DictProxy,LazyDictProxy]:
             order=dic._order
         else:
             order=dic.keys()
             order.sort()
             
         for k in order:
+            if type(dic)==LazyDictProxy and dic.isUnparsed(k):
+                # write the original text
+                s+=dic.getUnparsed(k)+"\n"
+                if firstLevel:
+                    s+="\n"
+                continue
             if type(k)==DictRedirection:
                 v=k
             else:    
@@ -81,7 +99,7 @@ class FoamFileGenerator(object):
                     v=dic.getRegexpValue(k)
                 
             end="\n"
-            if type(dic)==DictProxy:
+            if type(dic) in [DictProxy,LazyDictProxy]:
                 end=dic.getDecoration(k)+"\n"
 
             if firstLevel:
@@ -97,7 +115,7 @@ class FoamFileGenerator(object):
             s+=(" "*indent)+str(k)
             if type(v)in [unicode,str]:
                 s+=" "+v+";"+end
-            elif type(v) in [dict,DictProxy]:
+            elif type(v) in [dict,DictProxy,LazyDictProxy]:
                 s+="\n"+(" "*indent)+"{\n"
                 s+=self.strDict(v,indent+2)
                 s+=(" "*indent)+"}"+end
@@ -112,6 +130,21 @@ class FoamFileGenerator(object):
                 if s[-1]=="\n":
                     s=s[:-1]
                 s+=";"+end
+            elif self.binaryTypes and (isNumpyArray(v) or (type(v)==Field and not v.isUniform() and type(v.val)!=UnparsedList)):
+                basicType=None
+                if type(v)==Field:
+                    s+=" nonuniform "+v.name
+                    tp=typeFromName(v.name)
+                    if tp:
+                        basicType=tp[0]
+                    v=v.val
+                s+=" "+self.strBinaryList(v,basicType)+";"+end
+            elif isNumpyArray(v):
+                s+="\n"
+                s+=self.strNumpyArray(v,indent+2)
+                if s[-1]=="\n":
+                    s=s[:-1]
+                s+=";"+end
             elif type(v) in [tuple,TupleProxy]:
                 s+=" "+self.strTuple(v,indent+2)+";"+end
             elif type(v) in [int,float,long]:
@@ -145,7 +178,7 @@ class FoamFileGenerator(object):
         theLen=len(lst)
         
         if len(lst)>2 and len(lst)%2==0:
-            if type(lst[0])in [unicode,str] and (type(lst[1]) in [dict,DictProxy]):
+            if type(lst[0])in [unicode,str] and (type(lst[1]) in [dict,DictProxy,LazyDictProxy]):
                 theLen=len(lst)/2
 
         isFixedType=False
@@ -167,7 +200,7 @@ class FoamFileGenerator(object):
             for v in lst:
                 if type(v)in [unicode,str]:
                     s+=(" "*(indent+2))+v+"\n"
-                elif type(v) in [dict,DictProxy]:
+                elif type(v) in [dict,DictProxy,LazyDictProxy]:
                     s+="\n"+(" "*(indent+2))+"{\n"
                     s+=self.strDict(v,indent+4)
                     s+="\n"+(" "*(indent+2))+"}\n"
@@ -183,13 +216,52 @@ class FoamFileGenerator(object):
         
         return s
 
+    def strNumpyArray(self,arr,indent=0):
+        """Writes a numpy-array as a list. All the elements are formatted
+        in one go (instead of calling str for every element). 2-dimensional
+        arrays are written as lists of vectors/tensors"""
+        s=""
+        if self.longListThreshold:
+            if len(arr)>self.longListThreshold:
+                s+=(" "*indent)+str(len(arr))+"\n"
+        s+=(" "*indent)+"(\n"
+
+        if arr.dtype.kind in "iu":
+            num="%d"
+        elif arr.ndim>1:
+            num="%g"
+        else:
+            num="%.12g"
+        if arr.ndim>1:
+            line="("+string.join([num]*arr.shape[1])+")"
+        else:
+            line=num
+        line=(" "*(indent+2))+line+"\n"
+
+        if len(arr)>0:
+            s+=(line*len(arr)) % tuple(arr.ravel().tolist())
+        s+=(" "*indent)+")\n"
+
+        return s
+
+    def strBinaryList(self,lst,basicType=None):
+        """Writes a list of numbers, vectors or tensors (or a numpy-array)
+        in binary format
+        @param basicType: write the data as 'label' or 'scalar'. If unset
+        the type of the data decides"""
+        lngth,data=encodeList(lst,
+                              self.binaryTypes[0],
+                              self.binaryTypes[1],
+                              basicType=basicType)
+        return str(lngth)+"\n("+data+")"
+        
     def strTuple(self,lst,indent=0):
         s=""
 
         for v in lst:
             if type(v)in [unicode,str]:
                 s+=v+" "
-            elif type(v) in [dict,DictProxy]:
+            elif type(v) in [dict,DictProxy,LazyDictProxy]:
                 s+="{\n"
                 s+=self.strDict(v,indent+4)
                 s+=(" "*(indent+2))+"} "
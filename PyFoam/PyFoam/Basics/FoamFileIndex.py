@@ -0,0 +1,179 @@
+"""Find the entries of an OpenFOAM-dictionary without parsing them
+
+Only matches brackets, skips strings, comments and code-streams. Used to
+parse only the parts of a file that are actually needed"""
+
+from PyFoam.Error import PyFoamException
+
+import re
+
+spaceExpr=re.compile(r'(?:\s+|//[^\n]*|/\*.*?\*/)*',re.S)
+"""Whitespace and comments"""
+
+keyExpr=re.compile(r'\$?[a-zA-Z_][+\-<>(),.\*|a-zA-Z_0-9&%:]*|"(?:[^\\"\n]|\\.)*"')
+"""Keys of dictionary entries (same as the NAME- and SCONST-tokens of
+the parser)"""
+
+stringExpr=re.compile(r'"(?:[^\\"\n]|\\.)*"')
+
+specialExpr=re.compile(r'[;{}()\[\]"/#]')
+"""Characters where something interesting can happen"""
+
+flatListExpr=re.compile(r'[^()]*(?:\([^()]*\)[^()]*)*\)')
+"""The rest of a list with sub-lists that are not nested any further"""
+
+class FoamFileEntry(object):
+    """Position of an entry in the text of a dictionary"""
+
+    def __init__(self,key,start,keyStart,end,bodyStart=None,bodyEnd=None):
+        """@param key: the key of the entry
+        @param start: start of the text that belongs to the entry (comments
+        in front of the entry included)
+        @param keyStart: start of the key
+        @param end: the position after the last character of the entry
+        @param bodyStart: if the entry is a dictionary: the position after
+        the opening brace
+        @param bodyEnd: if the entry is a dictionary: the position of the
+        closing brace"""
+        self.key=key
+        self.start=start
+        self.keyStart=keyStart
+        self.end=end
+        self.bodyStart=bodyStart
+        self.bodyEnd=bodyEnd
+
+    def isDict(self):
+        return self.bodyStart!=None
+
+    def isDirective(self):
+        return self.key[0]=="#"
+
+def skipSpace(content,pos):
+    """@return: position of the first character that is neither whitespace
+    nor part of a comment"""
+    return spaceExpr.match(content,pos).end()
+
+def findClosing(content,pos,end,stopAtSemicolon=False):
+    """Find the end of a bracketed expression or an entry
+    @param content: the text
+    @param pos: position after the opening bracket
+    @param end: the text after this is not searched
+    @param stopAtSemicolon: the end is a semicolon on the same level (and
+    not a closing bracket)
+    @return: the position of the closing bracket or the semicolon"""
+    depth=0
+    while True:
+        m=specialExpr.search(content,pos,end)
+        if m==None:
+            raise FoamFileIndexError("No end found for the expression starting at "+str(pos))
+        c=m.group()
+        p=m.start()
+        if c=='"':
+            s=stringExpr.match(content,p)
+            if s==None:
+                raise FoamFileIndexError("Unterminated string at "+str(p))
+            pos=s.end()
+        elif c=="/":
+            if content[p:p+2] in ["//","/*"]:
+                pos=skipSpace(content,p)
+            else:
+                pos=p+1
+        elif c=="#":
+            if content[p:p+2]=="#{":
+                pos=content.find("#}",p+2,end)
+                if pos<0:
+                    raise FoamFileIndexError("Unterminated code-stream at "+str(p))
+                pos+=2
+            else:
+                pos=p+1
+        elif c=="(":
+            # Long lists are usually flat. Jump over them in one go
+            flat=flatListExpr.match(content,p+1,end)
+            if flat:
+                e=flat.end()
+                for s in ['"',"/","{","#"]:
+                    if content.find(s,p,e)>=0:
+                        flat=None
+                        break
+            if flat:
+                pos=flat.end()
+            else:
+                depth+=1
+                pos=p+1
+        elif c in "[{":
+            depth+=1
+            pos=p+1
+        elif c in ")]}":
+            depth-=1
+            if depth<0:
+                if stopAtSemicolon:
+                    raise FoamFileIndexError("Unbalanced '"+c+"' at "+str(p))
+                return p
+            pos=p+1
+        elif c==";":
+            if depth==0 and stopAtSemicolon:
+                return p
+            pos=p+1
+
+def indexDictionary(content,start=0,end=None,maxEntries=None):
+    """Find the entries of a dictionary
+    @param content: the text
+    @param start: where the body of the dictionary starts
+    @param end: where the body of the dictionary ends (position of the
+    closing brace). If unset the end of content
+    @param maxEntries: stop after that many entries were found
+    @return: list of FoamFileEntry-objects in the order of the file"""
+
+    if end==None:
+        end=len(content)
+
+    entries=[]
+    pos=start
+    while maxEntries==None or len(entries)<maxEntries:
+        entryStart=pos
+        pos=skipSpace(content,pos)
+        if pos>=end:
+            break
+        if content[pos]=="#":
+            lineEnd=content.find("\n",pos,end)
+            if lineEnd<0:
+                lineEnd=end
+            entries.append(FoamFileEntry(content[pos:lineEnd].strip(),
+                                         entryStart,
+                                         pos,
+                                         lineEnd))
+            pos=lineEnd
+            continue
+
+        m=keyExpr.match(content,pos,end)
+        if m==None:
+            raise FoamFileIndexError("No key found at "+str(pos))
+        key=m.group()
+        keyEnd=m.end()
+        if key[-1]==")" and key.count(")")>key.count("("):
+            # same as the parser: the bracket belongs to a list
+            key=key[:-1]
+            keyEnd-=1
+        pos=skipSpace(content,keyEnd)
+        if pos<end and content[pos]=="{":
+            close=findClosing(content,pos+1,end)
+            entries.append(FoamFileEntry(key,
+                                         entryStart,
+                                         m.start(),
+                                         close+1,
+                                         bodyStart=pos+1,
+                                         bodyEnd=close))
+            pos=close+1
+        else:
+            semicolon=findClosing(content,pos,end,stopAtSemicolon=True)
+            entries.append(FoamFileEntry(key,
+                                         entryStart,
+                                         m.start(),
+                                         semicolon+1))
+            pos=semicolon+1
+
+    return entries
+
+class FoamFileIndexError(PyFoamException):
+    def __init__(self,descr):
+        PyFoamException.__init__(self,descr)
@@ -2,6 +2,7 @@
 """Plots a collection of timelines. General superclass for te other implementations"""
 
 from PyFoam.Basics.CustomPlotInfo import readCustomPlotInfo,CustomPlotInfo
+from PyFoam.Basics.TimelineDecimator import TimelineDecimator
 
 from PyFoam.Error import notImplemented
 
@@ -40,6 +41,16 @@ class GeneralPlotTimelines(object):
     """This class defines the interface for specific implementations of plotting
 
     This class is moedelled after the Gnuplot-class from the Gnuplot-package"""
+
+    plotResolution=640
+    """Horizontal resolution of the plots in pixels. Timelines with more
+    points are reduced to the points that are visible at this resolution
+    before they are passed to buildData. If None all the points are
+    plotted"""
+
+    threadSafe=False
+    """Whether redo may be called from a thread that is not the main
+    thread (GUI-toolkits usually don't allow this)"""
     
     def __init__(self,
                  timelines,
@@ -61,6 +72,8 @@ class GeneralPlotTimelines(object):
 
         self.showWindow=showWindow
 
+        self.decimators={}
+
         if registry==None:
             registry=allPlots()
         self.nr=registry.add(self)
@@ -102,18 +115,53 @@ class GeneralPlotTimelines(object):
             if title.find("_slave")>=0:
                 title=title[: title.find("_slave")]
                 slaveNr=int(n[n.find("_slave")+len("_slave"):])
-                lastValid=self.data.slaves[slaveNr].lastValid[title]
+                data=self.data.slaves[slaveNr]
             else:
-                lastValid=self.data.lastValid[title]
-            times=self.data.getTimes(title)
-            self.buildData(times,n,title,lastValid)
+                data=self.data
+            lastValid=data.lastValid.get(title,False)
+            times,values=self.getPlotData(data,title,n)
+            self.buildData(times,values,n,title,lastValid)
                 
         if len(names)>0 and len(times)>0:
             self.doReplot()
 
-    def buildData(self,times,name,title,lastValid):
+    def getPlotData(self,data,name,key):
+        """Get the data that is to be plotted for a timeline. If there are
+        more points than pixels then the timeline is decimated. The
+        decimated data is cached and only updated with the new points.
+        The data is copied (so the plot may be redone by another thread
+        while the timeline grows)
+        @param data: the L{TimeLineCollection} with the timeline
+        @param name: the name of the timeline in the collection
+        @param key: the name under which the data is cached
+        @return: tuple with the times and the values"""
+
+        if self.plotResolution==None or \
+               getattr(self.spec,"start",None)!=None or \
+               getattr(self.spec,"end",None)!=None:
+            # the buckets would be computed for the whole time-range
+            resolution=None
+        else:
+            resolution=self.plotResolution
+
+        if key not in self.decimators:
+            self.decimators[key]=TimelineDecimator(resolution)
+        decimator=self.decimators[key]
+        decimator.resolution=resolution
+
+        # the result is a copy. The data may be changed while it is plotted
+        data.lock.acquire()
+        try:
+            return decimator.decimate(data.getTimes(),
+                                      data.getValues(name),
+                                      generation=data.generation)
+        finally:
+            data.lock.release()
+
+    def buildData(self,times,values,name,title,lastValid):
         """Build the implementation specific data
         @param times: The vector of times for which data exists
+        @param values: The values for these times
         @param name: the name under which the data is stored in the timeline
         @param title: the title under which this will be displayed
         @param lastValid: wether the last data entry is valid"""
@@ -158,3 +206,10 @@ class GeneralPlotTimelines(object):
 
         notImplemented(self,"doHardcopy")
 
+    def finish(self):
+        """Wait until the plotting implementation has written all the
+        output (hardcopies) and free its resources. The plot can't be
+        used afterwards"""
+
+        pass
+
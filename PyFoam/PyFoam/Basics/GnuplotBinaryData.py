@@ -0,0 +1,84 @@
+"""Passes timelines to gnuplot as binary files
+
+Formatting every number as text (what Gnuplot.Data does) is expensive
+for long timelines. Instead every timeline is kept in a file of
+doubles (time and value of a point after each other). When the
+timeline changes only the points that differ from the last time are
+written. Usually these are the new points and the last point (which may
+have changed). Gnuplot is told how many points to read, so the file is
+never truncated (gnuplot may still be reading it for an older plot
+command)"""
+
+import numpy
+import os
+
+from PyFoam.ThirdParty.Gnuplot import PlotItems,gp
+from PyFoam.Basics.TimelineDecimator import asNumpy
+
+class BinaryTimelineFile(object):
+    """A file with the points of one timeline"""
+
+    recordSize=2*8
+    """Size of one point (time and value as doubles)"""
+
+    def __init__(self,filename):
+        """@param filename: the file. It is created"""
+        self.filename=filename
+        self.fh=open(filename,"wb")
+        self.written=numpy.zeros((0,2))
+        self.bytesWritten=0
+
+    def update(self,times,values):
+        """Make the file contain the timeline
+        @param times: the times
+        @param values: the values for these times
+        @return: the number of points that gnuplot should read"""
+
+        n=min(len(times),len(values))
+        new=numpy.empty((n,2))
+        new[:,0]=asNumpy(times,n)
+        new[:,1]=asNumpy(values,n)
+
+        # the points that were already written correctly
+        common=min(n,len(self.written))
+        differ=numpy.flatnonzero((self.written[:common]!=new[:common]).any(axis=1))
+        if len(differ)>0:
+            common=differ[0]
+
+        if common<n:
+            self.fh.seek(common*self.recordSize)
+            data=new[common:].tostring()
+            self.fh.write(data)
+            self.fh.flush()
+            self.bytesWritten+=len(data)
+        self.written=new
+
+        return n
+
+    def close(self):
+        """Close and remove the file"""
+        if self.fh!=None:
+            self.fh.close()
+            self.fh=None
+            try:
+                os.remove(self.filename)
+            except OSError:
+                pass
+
+class BinaryTimelineItem(PlotItems._FileItem):
+    """Plot item for a L{BinaryTimelineFile}"""
+
+    def __init__(self,filename,records,**keyw):
+        """@param filename: name of the file
+        @param records: number of points that are plotted
+        The other keyword arguments are the same as for Gnuplot.Data"""
+
+        self.records=records
+        if 'title' not in keyw:
+            # don't use the name of the file as the title
+            keyw['title']=None
+        PlotItems._FileItem.__init__(self,filename,using=(1,2),**keyw)
+
+    def get_base_command_string(self):
+        return "%s binary record=%d format=\"%%float64%%float64\"" % (gp.double_quote_string(self.filename),
+                                                                        self.records)
@@ -8,13 +8,36 @@ from PyFoam.Basics.CustomPlotInfo import readCustomPlotInfo,CustomPlotInfo
 from PyFoam.Error import warning
 
 from GeneralPlotTimelines import GeneralPlotTimelines
+from GnuplotBinaryData import BinaryTimelineFile,BinaryTimelineItem
 
-from os import uname
+from os import uname,path,rmdir
+from tempfile import mkdtemp
+import atexit,weakref
+
+_openPlots=weakref.WeakSet()
+"""The plots that were not finished yet. Weak references so that the
+plots (and their gnuplot-processes) are freed when they are not used
+anymore"""
+
+def _finishOpenPlots():
+    """Finish the plots that still exist when the program ends"""
+    for p in list(_openPlots):
+        p.finish()
+
+# make sure that gnuplot is finished before the files are removed
+atexit.register(_finishOpenPlots)
 
 class GnuplotTimelines(GeneralPlotTimelines,Gnuplot):
     """This class opens a gnuplot window and plots a timelines-collection in it"""
+
+    threadSafe=True
     
     terminalNr=1
+
+    binaryData=True
+    """Pass the data to gnuplot as binary files (only the points that
+    changed are written). Otherwise the data is formatted as text for
+    every replot"""
     
     def __init__(self,
                  timelines,
@@ -27,8 +50,12 @@ class GnuplotTimelines(GeneralPlotTimelines,Gnuplot):
         other options
         """
 
+        self.dataDir=None
+        self.dataFiles={}
+
         GeneralPlotTimelines.__init__(self,timelines,custom,showWindow=showWindow,registry=registry)
         Gnuplot.__init__(self,persist=self.spec.persist)
+        _openPlots.add(self)
 
         self.itemlist=[]
             
@@ -85,20 +112,33 @@ class GnuplotTimelines(GeneralPlotTimelines,Gnuplot):
         
         self.redo()
 
-    def buildData(self,times,name,title,lastValid):
+    def buildData(self,times,values,name,title,lastValid):
         """Build the implementation specific data
         @param times: The vector of times for which data exists
+        @param values: The values for these times
         @param name: the name under which the data is stored in the timeline
         @param title: the title under which this will be displayed"""
 
         tm=times
-        dt=self.data.getValues(name)
+        dt=values
         if len(tm)>0 and not lastValid:
             tm=tm[:-1]
             dt=dt[:-1]
 
         if len(dt)>0:
-            it=Data(tm,dt,title=title,with_=self.with_)
+            if self.binaryData:
+                if name not in self.dataFiles:
+                    if self.dataDir==None:
+                        self.dataDir=mkdtemp(suffix=".gnuplot")
+                    self.dataFiles[name]=BinaryTimelineFile(path.join(self.dataDir,
+                                                                      "data%d" % len(self.dataFiles)))
+                records=self.dataFiles[name].update(tm,dt)
+                it=BinaryTimelineItem(self.dataFiles[name].filename,
+                                      records,
+                                      title=title,
+                                      with_=self.with_)
+            else:
+                it=Data(tm,dt,title=title,with_=self.with_)
 
             if name in self.alternate:
                 it.set_option(axes="x1y2")
@@ -148,3 +188,24 @@ class GnuplotTimelines(GeneralPlotTimelines,Gnuplot):
             warning("Hardcopy format",form,"unknown. Falling back to postscript")
             self.hardcopy(filename=filename+".ps",color=True)
 
+    def finish(self):
+        """Closes the pipe to gnuplot. Returns when gnuplot has processed
+        all the commands (and written all the hardcopies). Then the data
+        files are removed"""
+
+        _openPlots.discard(self)
+        self.close()
+        for f in self.dataFiles.values():
+            f.close()
+        self.dataFiles={}
+        if self.dataDir!=None:
+            try:
+                rmdir(self.dataDir)
+            except OSError:
+                pass
+            self.dataDir=None
+
+    def __del__(self):
+        """Remove the data files when the plot is not used anymore"""
+        self.finish()
+        Gnuplot.__del__(self)
@@ -3,6 +3,8 @@
 
 from PyFoam.Infrastructure.Logging import foamLogger
 
+import os,errno
+
 class LineReader(object):
     """Read a line from a file
 
@@ -11,6 +13,8 @@ class LineReader(object):
     
     def __init__(self):
         self.line=""
+        self.lines=[]
+        self.rest=""
         self.goOn=True
         self.wasInterupted=False
         self.bytes=0L
@@ -23,6 +27,15 @@ class LineReader(object):
         """@return: whether the reader caught a Keyboard-interrupt"""
         return self.wasInterupted
     
+    def interrupted(self):
+        """A Keyboard-interrupt was caught while reading"""
+        foamLogger().warning("Keyboard Interrupt")
+        print " Interrupted by the Keyboard"
+        self.wasInterupted=True
+        self.goOn=False
+        self.line=""
+        self.lines=[]
+
     def read(self,fh):
         """reads the next line
 
@@ -38,11 +51,7 @@ class LineReader(object):
             self.line=fh.readline()
             self.bytes+=len(self.line)
         except KeyboardInterrupt,e:
-            foamLogger().warning("Keyboard Interrupt")
-            print " Interrupted by the Keyboard"
-            self.wasInterupted=True
-            self.goOn=False
-            self.line=""
+            self.interrupted()
             return False
         
         if len(self.line)>0:
@@ -52,3 +61,58 @@ class LineReader(object):
         self.line=self.line.strip()
         
         return status
+
+    def readLines(self,fh,size=65536):
+        """reads a chunk of data and splits it into lines
+
+        fh - filehandle to read from. If it is a file-object the data
+        is read directly from the file descriptor: from a pipe only the
+        data that is already there is returned (no waiting for the
+        whole chunk). This means that data that is in the buffer of the
+        file-object (from using read on the same object) is skipped
+        size - maximum number of bytes that is read
+
+        The complete lines are stripped and stored in the list
+        self.lines (it may be empty). An incomplete line at the end of
+        the chunk is kept for the next call. self.line is the last line
+
+        Return value: False if the end of the file was reached and
+        there are no more lines. True otherwise"""
+
+        if not self.goOn:
+            self.lines=[]
+            return False
+
+        try:
+            if isinstance(fh,file):
+                chunk=os.read(fh.fileno(),size)
+            else:
+                chunk=fh.read(size)
+        except KeyboardInterrupt,e:
+            self.interrupted()
+            return False
+        except OSError,e:
+            if e.errno!=errno.EINTR:
+                raise
+            # interrupted by a signal. Try again at the next call
+            self.lines=[]
+            return True
+
+        self.bytes+=len(chunk)
+
+        if len(chunk)==0:
+            if self.rest!="":
+                self.lines=[self.rest.strip()]
+                self.rest=""
+            else:
+                self.lines=[]
+                return False
+        else:
+            self.lines=(self.rest+chunk).split("\n")
+            self.rest=self.lines.pop()
+            self.lines=[l.strip() for l in self.lines]
+
+        if len(self.lines)>0:
+            self.line=self.lines[-1]
+
+        return True
@@ -76,16 +76,17 @@ class MatplotlibTimelines(GeneralPlotTimelines):
             self.with_='lines'
         self.redo()
 
-    def buildData(self,times,name,title,lastValid):
+    def buildData(self,times,values,name,title,lastValid):
         """Build the implementation specific data
         @param times: The vector of times for which data exists
+        @param values: The values for these times
         @param name: the name under which the data is stored in the timeline
         @param title: the title under which this will be displayed"""
 
         a=self.axis1
         if name in self.alternate:
             a=self.axis2
-        data=self.data.getValues(name)
+        data=values
         tm=times
         if len(tm)>0 and not lastValid:
             tm=tm[:-1]
@@ -189,4 +190,11 @@ class MatplotlibTimelines(GeneralPlotTimelines):
         @param form: String describing the format"""
 
         self.figure.savefig(filename+"."+form,format=form)
+
+    def finish(self):
+        """Frees the figure"""
+
+        if self.figure!=None:
+            plt.close(self.figure)
+            self.figure=None
         
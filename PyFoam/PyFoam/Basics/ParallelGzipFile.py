@@ -0,0 +1,131 @@
+"""Writing gzip-files with several threads"""
+
+import zlib,struct,time
+
+class ParallelGzipFile(object):
+    """Write-only file that compresses the data with gzip. The data is
+    split into blocks that are compressed independently by a number of
+    threads (zlib does not hold the interpreter lock while compressing).
+    Every block is written as a separate gzip-member. Concatenated members
+    are a valid gzip-file (gunzip, tar and the gzip-module of Python
+    read them as one stream)"""
+
+    def __init__(self,name=None,fileobj=None,compresslevel=6,
+                 blockSize=4*1024*1024,threads=1):
+        """@param name: name of the file
+        @param fileobj: file-object to write to (instead of name). Not
+        closed by close
+        @param compresslevel: the gzip compression-level
+        @param blockSize: size of the uncompressed blocks
+        @param threads: number of threads that compress. If 1 then
+        everything is done in the thread that writes"""
+
+        if fileobj==None:
+            self.fileobj=open(name,"wb")
+            self.ownFile=True
+        else:
+            self.fileobj=fileobj
+            self.ownFile=False
+        self.name=name
+
+        self.compresslevel=compresslevel
+        self.blockSize=blockSize
+        self.mtime=int(time.time())
+
+        self.buffer=[]
+        self.buffered=0
+        self.pending=[]
+        self.blocks=0
+
+        self.threads=max(1,threads)
+        self.pool=None
+        if self.threads>1:
+            from multiprocessing.pool import ThreadPool
+            self.pool=ThreadPool(self.threads)
+
+        self.closed=False
+
+    def write(self,data):
+        """Add data to the file"""
+        if self.closed:
+            raise ValueError("write to closed file")
+        if len(data)==0:
+            return
+        self.buffer.append(data)
+        self.buffered+=len(data)
+        if self.buffered>=self.blockSize:
+            data="".join(self.buffer)
+            self.buffer=[]
+            self.buffered=0
+            for start in range(0,len(data)-self.blockSize+1,self.blockSize):
+                self.addBlock(data[start:start+self.blockSize])
+            rest=len(data) % self.blockSize
+            if rest>0:
+                self.buffer=[data[-rest:]]
+                self.buffered=rest
+
+    def addBlock(self,data):
+        """Compress a block (or hand it to the threads)"""
+        self.blocks+=1
+        if self.pool==None:
+            self.fileobj.write(compressMember(data,self.compresslevel,self.mtime))
+        else:
+            self.pending.append(self.pool.apply_async(compressMember,
+                                                      (data,self.compresslevel,self.mtime)))
+            # limit the memory used by blocks that wait to be written
+            while len(self.pending)>2*self.threads:
+                self.writePending(1)
+
+    def writePending(self,nr=None):
+        """Write compressed blocks in the order they were added (waits
+        until they are ready)
+        @param nr: number of blocks. If None then all"""
+        if nr==None:
+            nr=len(self.pending)
+        for i in range(nr):
+            self.fileobj.write(self.pending.pop(0).get())
+
+    def flush(self):
+        """Compress all the data that was written so far"""
+        if len(self.buffer)>0:
+            data="".join(self.buffer)
+            self.buffer=[]
+            self.buffered=0
+            self.addBlock(data)
+        if self.blocks==0:
+            # an empty file is not a valid gzip-file
+            self.addBlock("")
+        self.writePending()
+        self.fileobj.flush()
+
+    def close(self):
+        """Write the remaining data and close the file"""
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.closed=True
+            if self.pool!=None:
+                self.pool.close()
+                self.pool.join()
+                self.pool=None
+            if self.ownFile:
+                self.fileobj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+def compressMember(data,compresslevel=6,mtime=0):
+    """Compress data to a complete gzip-member
+    @param data: the uncompressed data
+    @return: string with header, compressed data and trailer"""
+
+    comp=zlib.compressobj(compresslevel,zlib.DEFLATED,-zlib.MAX_WBITS)
+    header="\037\213\010\000"+struct.pack("<I",mtime)+"\000\377"
+    body=comp.compress(data)+comp.flush()
+    trailer=struct.pack("<II",zlib.crc32(data) & 0xffffffffL,len(data) & 0xffffffffL)
+    return header+body+trailer
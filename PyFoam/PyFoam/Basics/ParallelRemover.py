@@ -0,0 +1,170 @@
+"""Removing a lot of files and directories with several threads"""
+
+import os,stat,errno
+from os import path
+
+class ParallelRemover(object):
+    """Collects files and directory trees and removes them with a pool of
+    threads (removing is limited by the file-system, especially on
+    parallel file-systems, not by the processor). Can also just report
+    what would be removed"""
+
+    def __init__(self,jobs=None,dryRun=False,batch=16):
+        """@param jobs: number of threads. If None then 8
+        @param dryRun: don't remove anything. Only count
+        @param batch: number of paths a thread gets at once"""
+
+        if jobs==None:
+            jobs=8
+        self.jobs=max(1,jobs)
+        self.dryRun=dryRun
+        self.batch=max(1,batch)
+
+        self.paths=[]
+        self.known=set()
+
+        self.files=0
+        self.bytes=0
+
+    def add(self,name):
+        """Add a file or a directory tree that is to be removed"""
+        name=path.abspath(name)
+        if name not in self.known:
+            self.known.add(name)
+            self.paths.append(name)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def run(self):
+        """Remove everything that was added
+        @return: the number of bytes that were freed (the blocks of the
+        files that had no other hardlinks)"""
+
+        paths=self.paths
+        self.paths=[]
+        self.known=set()
+
+        # paths inside other paths are removed with them
+        known=set(paths)
+        inside=[]
+        for p in paths:
+            d=path.dirname(p)
+            while d!=path.dirname(d):
+                if d in known:
+                    inside.append(p)
+                    break
+                d=path.dirname(d)
+        if len(inside)>0:
+            paths=[p for p in paths if p not in set(inside)]
+
+        if len(paths)==0:
+            return 0
+
+        # replace big directories by their contents so that all the
+        # threads have something to do. The directories are removed later
+        expanded=[]
+        while self.jobs>1 and len(paths)<self.jobs*self.batch:
+            dirs=set([p for p in paths if path.isdir(p) and not path.islink(p)])
+            if len(dirs)==0:
+                break
+            new=[]
+            for p in paths:
+                if p in dirs:
+                    expanded.append(p)
+                    new+=[path.join(p,n) for n in os.listdir(p)]
+                else:
+                    new.append(p)
+            paths=new
+
+        jobs=min(self.jobs,(len(paths)+self.batch-1)/self.batch)
+        if jobs>1:
+            from multiprocessing.pool import ThreadPool
+            pool=ThreadPool(jobs)
+            try:
+                results=pool.map(self.removeBatch,
+                                 [paths[i:i+self.batch] for i in range(0,len(paths),self.batch)])
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results=[self.removeBatch(paths)]
+
+        freed=0
+        for f,b in results:
+            self.files+=f
+            freed+=b
+
+        for d in reversed(expanded):
+            try:
+                s=os.lstat(d)
+                if not self.dryRun:
+                    os.rmdir(d)
+            except OSError,e:
+                if e.errno==errno.ENOENT:
+                    continue
+                raise
+            self.files+=1
+            freed+=blocksFreed(s)
+        self.bytes+=freed
+
+        return freed
+
+    def removeBatch(self,paths):
+        """@return: number of removed files (and directories) and the bytes freed"""
+        files,freed=0,0
+        for p in paths:
+            f,b=removeTree(p,dryRun=self.dryRun)
+            files+=f
+            freed+=b
+        return files,freed
+
+    def report(self):
+        """@return: a string that describes what was removed"""
+        if self.dryRun:
+            what="Would remove"
+        else:
+            what="Removed"
+        return "%s %d files and directories (%.1f MB)" % (what,self.files,self.bytes/(1024.*1024.))
+
+def blocksFreed(s):
+    """@param s: result of lstat for a file that is removed
+    @return: the number of bytes that are freed"""
+    if s.st_nlink>1 and not stat.S_ISDIR(s.st_mode):
+        return 0
+    try:
+        return s.st_blocks*512
+    except AttributeError:
+        return s.st_size
+
+def removeTree(name,dryRun=False):
+    """Remove a file or a directory with its contents. Symbolic links are
+    removed, not followed. Names that don't exist (anymore) are ignored
+    @param dryRun: only count
+    @return: number of removed files (and directories) and the bytes freed"""
+
+    files,freed=0,0
+    # directories are removed after their contents
+    todo=[(name,None)]
+    while len(todo)>0:
+        f,s=todo.pop()
+        try:
+            if s==None:
+                s=os.lstat(f)
+                if stat.S_ISDIR(s.st_mode):
+                    todo.append((f,s))
+                    for n in os.listdir(f):
+                        todo.append((path.join(f,n),None))
+                    continue
+                elif not dryRun:
+                    os.unlink(f)
+            elif not dryRun:
+                os.rmdir(f)
+        except OSError,e:
+            if e.errno==errno.ENOENT:
+                continue
+            raise
+        files+=1
+        freed+=blocksFreed(s)
+
+    return files,freed
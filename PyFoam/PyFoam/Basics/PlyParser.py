@@ -13,6 +13,7 @@ import PyFoam.ThirdParty.ply.lex as lex
 import PyFoam.ThirdParty.ply.yacc as yacc
 
 import os
+import copy
 
 class PlyParser(object):
     """
@@ -21,9 +22,15 @@ class PlyParser(object):
     tokens = ()
     precedence = ()
 
+    _prebuilt = { }
+    """Lexers and parsers that were already built in this process. Indexed
+    by the class, the start symbol and the debug-level. Building the tables
+    is expensive so every new instance only gets a copy of these that is
+    bound to the instance"""
 
     def __init__(self, **kw):
-        """Constructs the parser and the lexer"""
+        """Constructs the parser and the lexer (or reuses the ones that
+        were already built for the same class and start symbol)"""
         self.debug = kw.get('debug', 2)
         self.names = { }
         try:
@@ -34,16 +41,39 @@ class PlyParser(object):
         self.tabmodule = modname + "_" + "parsetab"
         #print self.debugfile, self.tabmodule
 
-        # Build the lexer and parser
-        lex.lex(module=self, debug=self.debug)
-        yacc.yacc(module=self,
-                  debug=self.debug,
-                  debugfile=self.debugfile,
-                  tabmodule=self.tabmodule,
-                  check_recursion=self.debug)
+        key=(self.__class__,getattr(self,"start",None),self.debug)
+        try:
+            lexer,parser=PlyParser._prebuilt[key]
+        except KeyError:
+            # Build the lexer and parser
+            lexer=lex.lex(module=self, debug=self.debug)
+            parser=yacc.yacc(module=self,
+                             debug=self.debug,
+                             debugfile=self.debugfile,
+                             tabmodule=self.tabmodule,
+                             check_recursion=self.debug)
+            PlyParser._prebuilt[key]=(lexer,parser)
+
+        self._lexer=lexer.clone(object=self)
+        self._parser=self._bindParser(parser)
+        
         self.lex=lex
         self.yacc=yacc
-        
+
+    def _bindParser(self,parser):
+        """Make a copy of a parser that shares the tables with the
+        original but calls the grammar rules of this instance"""
+        bound=copy.copy(parser)
+        bound.productions=[]
+        for p in parser.productions:
+            p=copy.copy(p)
+            if p.func:
+                p.callable=getattr(self,p.func)
+            bound.productions.append(p)
+        if parser.errorfunc:
+            bound.errorfunc=getattr(self,parser.errorfunc.__name__)
+        return bound
+
     def parse(self,content):
         """Do the actual parsing
         @param content: String that is to be parsed
@@ -53,6 +83,14 @@ class PlyParser(object):
             debug=10
         else:
             debug=0
-            
-        return yacc.parse(content,debug=debug)
 
+        # the lexer might have been used before
+        self._lexer.begin('INITIAL')
+        self._lexer.lineno=1
+
+        return self._parser.parse(content,lexer=self._lexer,debug=debug)
+
+def clearPrebuiltParsers():
+    """Forget all the lexers and parsers that were built so far. The next
+    parser that is constructed builds them again"""
+    PlyParser._prebuilt.clear()
@@ -76,9 +76,10 @@ class QwtPlotTimelines(GeneralPlotTimelines):
         
         self.redo()
 
-    def buildData(self,times,name,title,lastValid):
+    def buildData(self,times,values,name,title,lastValid):
         """Build the implementation specific data
         @param times: The vector of times for which data exists
+        @param values: The values for these times
         @param name: the name under which the data is stored in the timeline
         @param title: the title under which this will be displayed"""
 
@@ -88,7 +89,7 @@ class QwtPlotTimelines(GeneralPlotTimelines):
         axis=self.axis1
         if name in self.alternate:
             a=self.axis2
-        data=self.data.getValues(name)
+        data=values
         tm=times
         if len(tm)>0 and not lastValid:
             tm=tm[:-1]
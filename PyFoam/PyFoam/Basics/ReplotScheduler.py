@@ -0,0 +1,143 @@
+"""Replots a group of plots without holding up the analysis of the log"""
+
+from threading import Thread,Condition
+from time import time
+
+from PyFoam.Error import warning
+
+class ReplotScheduler(object):
+    """Collects requests to replot the plots. Requests that arrive while
+    a replot is pending are joined with it (the frame is dropped). Not
+    more than maxFrameRate replots per second are done. If threaded the
+    plots are redone by a separate thread and request never waits for
+    the plotting. The plots get the data from their timelines
+    themselves (the lock of a timeline is only held while the data is
+    copied)"""
+
+    def __init__(self,plots,maxFrameRate=2.,threaded=True):
+        """@param plots: the plots (a dictionary or a list)
+        @param maxFrameRate: maximum number of replots per second. If None
+        or 0 there is no limit
+        @param threaded: do the plotting in a separate thread. Otherwise
+        the plotting is done by the caller of request"""
+
+        self.plots=plots
+        if maxFrameRate:
+            self.minInterval=1./maxFrameRate
+        else:
+            self.minInterval=0.
+        self.threaded=threaded
+
+        self.condition=Condition()
+        self.pending=None
+        self.stopping=False
+        self.thread=None
+        self.lastFrame=None
+
+        self.requests=0
+        self.frames=0
+        self.dropped=0
+        self.totalLatency=0.
+        self.maxLatency=0.
+
+    def request(self):
+        """Ask for a replot. Returns immediately if threaded"""
+
+        now=time()
+        self.condition.acquire()
+        try:
+            self.requests+=1
+            if self.pending!=None:
+                # joined with the replot that is already waiting
+                self.dropped+=1
+            else:
+                self.pending=now
+            if self.threaded:
+                if self.thread==None:
+                    self.thread=Thread(target=self.run,name="ReplotScheduler")
+                    self.thread.setDaemon(True)
+                    self.thread.start()
+                self.condition.notify()
+                return
+            # after stop nobody would draw a pending replot
+            drawNow=self.stopping or self.lastFrame==None or \
+                    now-self.lastFrame>=self.minInterval
+        finally:
+            self.condition.release()
+
+        if drawNow:
+            self.draw()
+
+    def draw(self):
+        """Redo the plots for the pending request"""
+
+        self.condition.acquire()
+        requested=self.pending
+        self.pending=None
+        self.condition.release()
+        if requested==None:
+            return
+
+        if hasattr(self.plots,"values"):
+            plots=self.plots.values()
+        else:
+            plots=self.plots
+        try:
+            for p in plots:
+                try:
+                    p.redo()
+                except Exception,e:
+                    warning("Replotting failed:",e)
+        finally:
+            done=time()
+            self.condition.acquire()
+            self.lastFrame=done
+            self.frames+=1
+            self.totalLatency+=done-requested
+            self.maxLatency=max(self.maxLatency,done-requested)
+            self.condition.release()
+
+    def run(self):
+        """The thread that does the plotting"""
+
+        self.condition.acquire()
+        try:
+            while True:
+                while self.pending==None and not self.stopping:
+                    self.condition.wait()
+                if self.pending==None:
+                    break
+                if not self.stopping and self.lastFrame!=None:
+                    wait=self.lastFrame+self.minInterval-time()
+                    if wait>0:
+                        self.condition.wait(wait)
+                        continue
+                self.condition.release()
+                try:
+                    self.draw()
+                finally:
+                    self.condition.acquire()
+        finally:
+            self.condition.release()
+
+    def stop(self):
+        """Do the pending replot (ignoring the frame-rate) and wait for it.
+        Requests after this are plotted immediately by the caller"""
+
+        self.condition.acquire()
+        self.stopping=True
+        self.condition.notify()
+        self.condition.release()
+        if self.thread!=None:
+            self.thread.join()
+            self.thread=None
+        self.threaded=False
+        self.draw()
+
+    def report(self):
+        """@return: a string with the statistics of the plotting"""
+        if self.frames>0:
+            average=self.totalLatency/self.frames
+        else:
+            average=0.
+        return "%d replots for %d requests (%d dropped). Latency: average %.3f s, maximum %.3f s" % (self.frames,self.requests,self.dropped,average,self.maxLatency)
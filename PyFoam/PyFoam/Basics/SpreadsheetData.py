@@ -3,18 +3,78 @@
 Data that can go into a spreadsheet (title line and rectangular data)
 """
 
-import numpy,copy
+import numpy,copy,warnings
 
 from PyFoam.Error import error,FatalErrorPyFoamException,warning
 
 class WrongDataSize(FatalErrorPyFoamException):
     def __init__(self):
         FatalErrorPyFoamException.__init__(self,"Size of the arrays differs")
-        
+
+def readColumns(fName,delimiter=None):
+    """Reads a file with a title line and columns of numbers directly into
+    one array per column. The names of the columns are the same that
+    numpy.recfromcsv (if a delimiter is given) or numpy.recfromtxt would
+    produce
+    @param fName: name of the file or a file-handle
+    @param delimiter: the delimiter between the values. If None then the
+    values are separated by whitespace
+    @return: tuple with the list of names and the list of columns. None if
+    the file can't be read this way (missing values, comments between
+    the data etc)"""
+
+    from StringIO import StringIO
+
+    if hasattr(fName,"read"):
+        txt=fName.read()
+    else:
+        txt=open(fName).read()
+
+    # the first line with text is the title line
+    start=0
+    while start<len(txt):
+        end=txt.find("\n",start)
+        if end<0:
+            end=len(txt)
+        if txt[start:end].split("#",1)[-1].strip()!="":
+            break
+        start=end+1
+    else:
+        return None
+
+    header=txt[start:end]
+    body=txt[end+1:].strip()
+    if body.find("#")>=0 or body.find('"')>=0:
+        return None
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if delimiter:
+            names=numpy.recfromcsv(StringIO(header),delimiter=delimiter).dtype.names
+            body=body.replace(delimiter," ")
+        else:
+            names=numpy.recfromtxt(StringIO(header),names=True).dtype.names
+        nrCols=len(names)
+        if body=="":
+            return list(names),[numpy.zeros(0) for n in names]
+        nrLines=body.count("\n")+1
+        data=numpy.fromstring(body,sep=" ")
+
+    if data.size!=nrLines*nrCols:
+        return None
+
+    data=data.reshape(nrLines,nrCols).transpose()
+    # every column gets contiguous memory
+    return list(names),[numpy.ascontiguousarray(d) for d in data]
+
 class SpreadsheetData(object):
     """
     Collects data that could go into a spreadsheet. The focus of this class is on
     storing all the data at once
+
+    The data is stored column by column (every column is a separate array
+    with the same length as the time column). The attribute data with all
+    the columns in one structured array is only built when it is used
     """
     def __init__(self,
                  timeName=None,
@@ -23,83 +83,177 @@ class SpreadsheetData(object):
                  txtName=None,
                  data=None,
                  names=None,
-                 title=None):
+                 title=None,
+                 columns=None):
         """Either this is constructed from a file or from the data and the column headers
 
         @param timeName: the data colum that is to be considered the time in this file
         @param validData: names of the valid data columns (all others should be discarded)
         @param csvName: name of the CSV-file the data should be constructed from,
         @param txtName: name of a file the data should be constructed from,
-        @param data: the actual data to use
+        @param data: the actual data to use. A structured array is used
+        without copying it only if all fields are float and the names stay
+        the same
         @param names: the names for the column header
-        @param title: a name that is used to make unique heades names"""
+        @param title: a name that is used to make unique heades names
+        @param columns: the data as a list of arrays (one for every name). The
+        arrays are used without copying them if they are already float"""
 
         self.title=title
-        
-        if (csvName or txtName) and data:
+        self._names=[]
+        self._columns={}
+        self._data=None
+
+        if (csvName or txtName) and (data is not None or columns is not None):
             error("SpreadsheetData is either constructed from data or from a file")
 
         if csvName:
-            try:
-                rec=numpy.recfromcsv(csvName)
-                data=[tuple(float(x) for x in i) for i in rec]
-                names=list(rec.dtype.names)
-            except AttributeError:
-                # for old numpy-versions
-                data=map(tuple,numpy.loadtxt(csvName,delimiter=',',skiprows=1))
-                names=open(csvName).readline().strip().split(',')
-                
-            # redo this to make sure that everything is float
-            self.data=numpy.array(data,dtype=zip(names,['f8']*len(names)))
+            cols=readColumns(csvName,delimiter=",")
+            if cols:
+                self._setColumns(*cols)
+            else:
+                if hasattr(csvName,"seek"):
+                    csvName.seek(0)
+                try:
+                    rec=numpy.recfromcsv(csvName)
+                    data=[tuple(float(x) for x in i) for i in rec]
+                    names=list(rec.dtype.names)
+                except AttributeError:
+                    # for old numpy-versions
+                    data=map(tuple,numpy.loadtxt(csvName,delimiter=',',skiprows=1))
+                    names=open(csvName).readline().strip().split(',')
+
+                # redo this to make sure that everything is float
+                self.data=numpy.array(data,dtype=zip(names,['f8']*len(names)))
         elif txtName:
-            try:
-                rec=numpy.recfromtxt(txtName,names=True)
-                data=[tuple(float(x) for x in i) for i in rec]
-                names=list(rec.dtype.names)
-            except AttributeError:
-                # for old numpy-versions
-                data=map(tuple,numpy.loadtxt(txtName))
-                names=open(txtName).readline().strip().split()[1:]
-                
-            # redo this to make sure that everything is float
-            self.data=numpy.array(data,dtype=zip(names,['f8']*len(names)))            
+            cols=readColumns(txtName)
+            if cols:
+                self._setColumns(*cols)
+            else:
+                if hasattr(txtName,"seek"):
+                    txtName.seek(0)
+                try:
+                    rec=numpy.recfromtxt(txtName,names=True)
+                    data=[tuple(float(x) for x in i) for i in rec]
+                    names=list(rec.dtype.names)
+                except AttributeError:
+                    # for old numpy-versions
+                    data=map(tuple,numpy.loadtxt(txtName))
+                    names=open(txtName).readline().strip().split()[1:]
+
+                # redo this to make sure that everything is float
+                self.data=numpy.array(data,dtype=zip(names,['f8']*len(names)))
+        elif columns is not None:
+            if names==None or len(names)!=len(columns):
+                error("Names",names,"do not fit the number of columns",len(columns))
+            self._setColumns(names,columns)
         else:
-            if data!=None and names==None:
+            if data is not None and names==None:
                 error("No names given for the data")
 
-            self.data=numpy.array(map(tuple,data),dtype=zip(names,['f8']*len(names)))
+            if isinstance(data,numpy.ndarray) and data.dtype.names!=None:
+                oldNames=list(data.dtype.names)
+                if len(names)!=len(oldNames):
+                    error("Names",names,"do not fit the number of fields",oldNames)
+                if list(names)==oldNames and \
+                       all([data.dtype[n]==numpy.dtype('f8') for n in oldNames]):
+                    # already in the right format. No need to copy
+                    self.data=data
+                else:
+                    # copy to leave the array of the caller untouched
+                    self._setColumns(names,
+                                     [numpy.array(data[n],dtype='f8') for n in oldNames])
+            elif isinstance(data,numpy.ndarray) and data.ndim==2 and data.shape[1]==len(names):
+                self._setColumns(names,
+                                 [numpy.array(c,dtype='f8') for c in data.transpose()])
+            else:
+                self.data=numpy.array(map(tuple,data),dtype=zip(names,['f8']*len(names)))
 
         if timeName:
-            try:
-                index=list(self.data.dtype.names).index(timeName)
-            except ValueError:
-                error("Time name",timeName,"not in",self.data.dtype.names)
+            if timeName not in self._columns:
+                error("Time name",timeName,"not in",self.names())
+            self.time=timeName
         else:
-            index=0
-        self.time=self.data.dtype.names[index]
+            self.time=self._names[0]
 
         if validData:
-            usedData=[]
-            usedNames=[]
-            
-            for n in self.data.dtype.names:
-                if n==self.time or n in validData:
-                    usedData.append(tuple(self.data[n]))
-                    usedNames.append(n)
-
-            usedData=numpy.array(usedData).transpose()
-            self.data=numpy.array(map(tuple,usedData),dtype=zip(usedNames,['f8']*len(usedNames)))
-            index=list(self.data.dtype.names).index(self.time)
-                
+            for n in self.names():
+                if n!=self.time and n not in validData:
+                    self.removeColumn(n)
+
         if self.title!=None:
-            self.data.dtype.names=map(lambda x:self.title+" "+x,self.data.dtype.names[0:index])+[self.data.dtype.names[index]]+map(lambda x:self.title+" "+x,self.data.dtype.names[index+1:])
+            newNames=[]
+            for n in self._names:
+                if n==self.time:
+                    newNames.append(n)
+                else:
+                    newNames.append(self.title+" "+n)
+            self._setColumns(newNames,[self._columns[n] for n in self._names])
+
+    def _setColumns(self,names,columns):
+        """Replace all the data
+        @param names: list with the names
+        @param columns: list with one array for every name"""
+
+        names=list(names)
+        if len(set(names))!=len(names):
+            error("Duplicate names in",names)
+        cols={}
+        for n,c in zip(names,columns):
+            c=numpy.asarray(c,dtype='f8')
+            if c.ndim!=1:
+                c=c.reshape(-1)
+            if len(cols)>0 and len(c)!=len(cols[names[0]]):
+                raise WrongDataSize()
+            cols[n]=c
+        self._names=names
+        self._columns=cols
+        self._data=None
+
+    def _getData(self):
+        """All the columns in one structured array. The array is built when
+        it is needed. After that the columns are views of this array (so
+        changes of the values show in both)"""
+        if self._data is None:
+            names=self.names()
+            data=numpy.empty(self.size(),dtype=zip(names,['f8']*len(names)))
+            for n in names:
+                data[n]=self._columns[n]
+            self._setData(data)
+        return self._data
+
+    def _setData(self,data):
+        """Set the data from a structured array. The columns are views
+        of this array"""
+        self._names=list(data.dtype.names)
+        self._columns=dict([(n,data[n]) for n in self._names])
+        self._data=data
+
+    data=property(_getData,_setData)
 
     def names(self):
-        return copy.copy(self.data.dtype.names)
+        return tuple(self._names)
 
     def size(self):
-        return self.data.size
-    
+        if len(self._names)==0:
+            return 0
+        return len(self._columns[self._names[0]])
+
+    def column(self,name):
+        """Get the data of one column
+        @param name: the name of the column
+        @return: the array with the values (the actual data. Not a copy)"""
+        return self._columns[name]
+
+    def removeColumn(self,name):
+        """Remove a column from the data
+        @param name: name of the column"""
+        if name==self.time:
+            error("The time column",name,"can't be removed")
+        del self._columns[name]
+        self._names.remove(name)
+        self._data=None
+        
     def writeCSV(self,fName,
                  delimiter=","):
         """Write data to a CSV-file
@@ -108,14 +262,17 @@ class SpreadsheetData(object):
 
         f=open(fName,"w")
         f.write(delimiter.join(self.names())+"\n")
-        numpy.savetxt(f,self.data,delimiter=delimiter)
+        numpy.savetxt(f,
+                      numpy.column_stack([self._columns[n] for n in self._names]),
+                      delimiter=delimiter)
+        f.close()
 
     def tRange(self,time=None):
         """Return the range of times
         @param time: name of the time. If None the first column is used"""
         if time==None:
             time=self.time
-        t=self.data[time]
+        t=self._columns[time]
 
         return (t[0],t[-1])
     
@@ -136,8 +293,8 @@ class SpreadsheetData(object):
             else:
                 prefix+="_"
                 
-        t1=self.data[time]
-        t2=other.data[time]
+        t1=self.column(time)
+        t2=other.column(time)
         if len(t1)!=len(t2):
             raise WrongDataSize()
         if max(abs(t1-t2))>1e-10:
@@ -147,7 +304,7 @@ class SpreadsheetData(object):
         data=[]
         for n in self.names():
             names.append(n)
-            data.append(self.data[n])
+            data.append(self.column(n).copy())
 
         for n in other.names():
             if n!=time:
@@ -155,10 +312,10 @@ class SpreadsheetData(object):
                     names.append(prefix+n)
                 else:
                     names.append(n)
-                data.append(other.data[n])
+                data.append(other.column(n).copy())
 
         return SpreadsheetData(names=names,
-                               data=numpy.array(data).transpose())
+                               columns=data)
 
     def __add__(self,other):
         """Convinience function for joining data"""
@@ -173,21 +330,23 @@ class SpreadsheetData(object):
         @param data: the actual data
         @param allowDuplicates: If the name already exists make it unique by appending _1, _2 ..."""
 
-        arr = numpy.asarray(data)
+        arr = numpy.array(data,dtype='f8')
+        if arr.shape!=(self.size(),):
+            raise WrongDataSize()
         newname=name
-        if newname in self.names() and allowDuplicates:
+        if newname in self._columns and allowDuplicates:
             cnt=1
-            while newname in self.names():
+            while newname in self._columns:
                 newname="%s_%d" % (name,cnt)
                 cnt+=1
             warning("Changing name",name,"to",newname,"bacause it already exists in the data")
-        newdtype = numpy.dtype(self.data.dtype.descr + [(newname, 'f8')])
-        newrec = numpy.empty(self.data.shape, dtype=newdtype)
-        for field in self.data.dtype.fields:
-            newrec[field] = self.data[field]
-            newrec[name] = arr
 
-        self.data=newrec
+        if newname in self._columns:
+            error("Column",newname,"already exists in the data")
+
+        self._names.append(newname)
+        self._columns[newname]=arr
+        self._data=None
         
     def __call__(self,
                  t,
@@ -206,8 +365,8 @@ class SpreadsheetData(object):
         if time==None:
             time=self.time
 
-        x=self.data[time]
-        y=self.data[name]
+        x=self._columns[time]
+        y=self._columns[name]
         
         # get extremes
         if t<x[0]:
@@ -245,11 +404,90 @@ class SpreadsheetData(object):
         else:
             return y[iLow] + (y[iHigh]-y[iLow])*(t-x[iLow])/(x[iHigh]-x[iLow])
 
+    def evaluate(self,
+                 times,
+                 name,
+                 time=None,
+                 invalidExtend=False,
+                 noInterpolation=False):
+        """'Evaluate' the data at a number of times. The result is the
+        same as calling the object for every single time (the bisection
+        is done for all the times at once)
+        @param times: the times at which the data should be evaluated
+        @param name: name of the data column to be evaluated
+        @param time: name of the time column. If none is given then the first column is assumed
+        @param invalidExtend: see __call__
+        @param noInterpolation: see __call__
+        @return: array with the values"""
+
+        if time==None:
+            time=self.time
+
+        x=self._columns[time]
+        y=self._columns[name]
+        t=numpy.asarray(times,dtype=float)
+
+        result=numpy.empty(len(t))
+
+        # get extremes
+        below=t<x[0]
+        above=t>x[-1]
+        if invalidExtend:
+            result[below]=y[0]
+            result[above]=y[-1]
+        else:
+            result[below]=float('nan')
+            result[above]=float('nan')
+        done=below | above
+
+        if noInterpolation:
+            first=~done & (t==x[0])
+            result[first]=y[0]
+            last=~done & ~first & (t==x[-1])
+            result[last]=y[-1]
+            done|=first | last
+
+        # bisection for all the times at once (the same steps as for a
+        # single time so that exact hits give the same results)
+        iLow=numpy.zeros(len(t),dtype=int)
+        iHigh=numpy.empty(len(t),dtype=int)
+        iHigh.fill(len(x)-1)
+
+        todo=numpy.nonzero(~done & ((iHigh-iLow)>1))[0]
+        while len(todo)>0:
+            low=iLow[todo]
+            iNew=low+(iHigh[todo]-low)//2
+            xNew=x[iNew]
+            tTodo=t[todo]
+
+            # we got lucky
+            hit=xNew==tTodo
+            result[todo[hit]]=y[iNew[hit]]
+            done[todo[hit]]=True
+
+            smaller=tTodo<xNew
+            iHigh[todo[~hit & smaller]]=iNew[~hit & smaller]
+            iLow[todo[~hit & ~smaller]]=iNew[~hit & ~smaller]
+
+            todo=todo[~hit]
+            todo=todo[(iHigh[todo]-iLow[todo])>1]
+
+        rest=numpy.nonzero(~done)[0]
+        if noInterpolation:
+            result[rest]=float('nan')
+        else:
+            low=iLow[rest]
+            high=iHigh[rest]
+            with numpy.errstate(divide='ignore',invalid='ignore'):
+                result[rest]=y[low] + (y[high]-y[low])*(t[rest]-x[low])/(x[high]-x[low])
+
+        return result
+
     def addTimes(self,times,time=None,interpolate=False,invalidExtend=False):
         """Extend the data so that all new times are represented (add rows
         if they are not there)
         @param time: the name of the column with the time
-        @param times: the times that shoild be there
+        @param times: the times that shoild be there (in ascending order)
         @param interpolate: interpolate the data in new rows. Otherwise
         insert 'nan'
         @param invalidExtend: if t is out of the valid range then use
@@ -258,53 +496,37 @@ class SpreadsheetData(object):
         if time==None:
             time=self.time
 
-        if len(times)==len(self.data[time]):
-            same=True
-            for i in range(len(times)):
-                if times[i]!=self.data[time][i]:
-                    same=False
-                    break
-            if same:
+        original=self._columns[time]
+        times=numpy.asarray(times,dtype=float)
+
+        if len(times)==len(original):
+            if numpy.all(times==original):
                 # No difference between the times
                 return
-        
-        newData=[]
-        otherI=0
-        originalI=0
-        while otherI<len(times):
-            goOn=originalI<len(self.data[time])
-            while goOn and times[otherI]>self.data[time][originalI]:
-                newData.append(self.data[originalI])
-                originalI+=1
-                goOn=originalI<len(self.data[time])
-
-            append=True
-            if originalI<len(self.data[time]):
-                if times[otherI]==self.data[time][originalI]:
-                    newData.append(self.data[originalI])
-                    originalI+=1
-                    otherI+=1
-                    append=False
-                
-            if append:
-                t=times[otherI]
-                newRow=[]
-                for n in self.names():
-                    if n==time:
-                        newRow.append(t)
-                    elif interpolate:
-                        newRow.append(self(t,n,time=time,invalidExtend=invalidExtend))
-                    else:
-                        newRow.append(float('nan'))
-                newData.append(newRow)
-                otherI+=1
 
-        while originalI<len(self.data[time]):
-            newData.append(self.data[originalI])
-            originalI+=1
+        # a time that is already there is only added if it occurs more
+        # often in the new times than in the data
+        occurence=numpy.arange(len(times))-numpy.searchsorted(times,times,side="left")
+        existing=numpy.searchsorted(original,times,side="right")-numpy.searchsorted(original,times,side="left")
+        newTimes=times[occurence>=existing]
+
+        # new rows go after the existing rows with the same time
+        positions=numpy.searchsorted(original,newTimes,side="right")
+        nans=numpy.empty(len(newTimes))
+        nans.fill(float('nan'))
+
+        columns=[]
+        for n in self.names():
+            if n==time:
+                values=newTimes
+            elif interpolate:
+                values=self.evaluate(newTimes,n,time=time,invalidExtend=invalidExtend)
+            else:
+                values=nans
+            columns.append(numpy.insert(self._columns[n],positions,values))
+
+        self._setColumns(self.names(),columns)
 
-        self.data=numpy.array(map(tuple,newData),dtype=self.data.dtype)
-        
     def resample(self,
                  other,
                  name,
@@ -320,59 +542,52 @@ class SpreadsheetData(object):
         @param time: name of the time column. If none is given then the first column is assumed
         @param invalidExtend: see __call__
         @param extendData: if the time range of x is bigger than the range then extend the range before resampling
-        @param noInterpolation: if t doesn't exactly fit a data-point return 'nan'"""
+        @param noInterpolation: if t doesn't exactly fit a data-point return 'nan'
+        @return: array with the values"""
         if time==None:
             time=self.time
             
         if extendData and (
-            self.data[time][0] > other.data[time][0] or \
-            self.data[time][-1] < other.data[time][-1]):
-            pre=[]
-            i=0
-            while other.data[time][i] < self.data[time][0]:
-                data=[]
-                for n in self.names():
-                    if n==time:
-                        data.append(other.data[time][i])
-                    else:
-                        data.append(float('nan'))
-                pre.append(data)
-                i+=1
-                if i>=len(other.data[time]):
-                    break
-            if len(pre)>0:
-                self.data=numpy.concatenate((numpy.array(map(tuple,pre),dtype=self.data.dtype),self.data))
-            
-            post=[]
-            i=-1
-            while other.data[time][i] > self.data[time][-1]:
-                data=[]
+            self._columns[time][0] > other.column(time)[0] or \
+            self._columns[time][-1] < other.column(time)[-1]):
+            otherTime=other.column(time)
+            myTime=self._columns[time]
+
+            before=otherTime < myTime[0]
+            if before.all():
+                nrBefore=len(before)
+            else:
+                nrBefore=before.argmin()
+
+            after=otherTime > myTime[-1]
+            if after.all():
+                nrAfter=len(after)
+            else:
+                nrAfter=after[::-1].argmin()
+
+            if nrBefore>0 or nrAfter>0:
+                columns=[]
                 for n in self.names():
                     if n==time:
-                        data.append(other.data[time][i])
+                        pre=otherTime[:nrBefore]
+                        post=otherTime[len(otherTime)-nrAfter:]
                     else:
-                        data.append(float('nan'))
-                post.append(data)
-                i-=1
-                if abs(i)>=len(other.data[time])+1:
-                    break
-                
-            post.reverse()
-            if len(post)>0:
-                self.data=numpy.concatenate((self.data,numpy.array(map(tuple,post),dtype=self.data.dtype)))
-
-        result=[]
-        
-        for t in self.data[time]:
-            nm=name
-            if otherName:
-                nm=otherName
-            result.append(other(t,nm,
-                                time=time,
-                                invalidExtend=invalidExtend,
-                                noInterpolation=noInterpolation))
-
-        return result
+                        pre=numpy.empty(nrBefore)
+                        pre.fill(float('nan'))
+                        post=numpy.empty(nrAfter)
+                        post.fill(float('nan'))
+                    columns.append(numpy.concatenate((pre,self._columns[n],post)))
+                self._setColumns(self.names(),columns)
+
+        nm=name
+        if otherName:
+            nm=otherName
+
+        return other.evaluate(self._columns[time],
+                              nm,
+                              time=time,
+                              invalidExtend=invalidExtend,
+                              noInterpolation=noInterpolation)
     
     def compare(self,other,name,otherName=None,time=None,common=False):
         """Compare this data-set with another. The time-points of this dataset are used as
@@ -388,61 +603,59 @@ class SpreadsheetData(object):
         if time==None:
             time=self.time
             
-        x=self.data[time]
-        y=self.data[name]
+        x=self._columns[time]
+        y=self._columns[name]
         y2=self.resample(other,name,otherName=otherName,time=time,invalidExtend=True)
 
         minT,maxT=None,None
         if common:
-            minTmp,maxTmp=max(x[0],other.data[time][0]),min(x[-1],other.data[time][-1])
-            for i in range(len(x)):
-                if minTmp<=x[i]:
-                    minT=x[i]
-                    break
-            for i in range(len(x)):
-                val=x[-(i+1)]
-                if maxTmp>=val:
-                    maxT=val
-                    break
+            minTmp,maxTmp=max(x[0],other.column(time)[0]),min(x[-1],other.column(time)[-1])
+            inside=numpy.nonzero(minTmp<=x)[0]
+            if len(inside)>0:
+                minT=x[inside[0]]
+            inside=numpy.nonzero(maxTmp>=x)[0]
+            if len(inside)>0:
+                maxT=x[inside[-1]]
         else:
             minT,maxT=x[0],x[-1]
 
-        if minT==None or maxT==None:
+        used=None
+        if minT!=None and maxT!=None:
+            used=numpy.nonzero(~((x<minT) | (x>maxT)))[0]
+
+        if used is None or len(used)==0:
+            # the data sets have no common time
             return { "max" : None,
                      "maxPos" : None,
                      "average" : None,
                      "wAverage" : None,
                      "tMin": None,
                      "tMax": None }
-            
-        maxDiff=0
-        maxPos=x[0]
-        sumDiff=0
-        sumWeighted=0
-        cnt=0
-        
-        for i,t in enumerate(x):
-            if t<minT or t>maxT:
-                continue
-            cnt+=1
-            
-            val1=y[i]
-            val2=y2[i]
-            diff=abs(val1-val2)
-            if diff>maxDiff:
-                maxDiff=diff
-                maxPos=x[i]
-            sumDiff+=diff
-            weight=0
-            if t>minT:
-                weight+=(t-x[i-1])/2
-            if t<maxT:
-                weight+=(x[i+1]-t)/2
-            sumWeighted+=weight*diff
+
+        t=x[used]
+        diff=abs(y[used]-y2[used])
+
+        with numpy.errstate(invalid='ignore'):
+            larger=numpy.nonzero(diff>0)[0]
+        if len(larger)>0:
+            # the first position of the maximum
+            iMax=larger[numpy.argmax(diff[larger])]
+            maxDiff=diff[iMax]
+            maxPos=t[iMax]
+        else:
+            maxDiff=0
+            maxPos=x[0]
+
+        # trapezoidal weights. The sums are accumulated in order so that
+        # the result is the same as adding up the values one by one
+        weight=numpy.where(t>minT,(t-x[used-1])/2,0.)
+        weight+=numpy.where(t<maxT,(x[numpy.minimum(used+1,len(x)-1)]-t)/2,0.)
+        sumDiff=numpy.add.accumulate(numpy.concatenate(([0.],diff)))[-1]
+        sumWeighted=numpy.add.accumulate(numpy.concatenate(([0.],weight*diff)))[-1]
 
         return { "max" : maxDiff,
                  "maxPos" : maxPos,
-                 "average" : sumDiff/cnt,
+                 "average" : sumDiff/len(used),
                  "wAverage" : sumWeighted/(maxT-minT),
                  "tMin": minT,
                  "tMax": maxT}
@@ -457,25 +670,32 @@ class SpreadsheetData(object):
         if time==None:
             time=self.time
             
-        x=self.data[time]
-        y=self.data[name]
+        x=self._columns[time]
+        y=self._columns[name]
+
+        nans=numpy.nonzero(numpy.isnan(y))[0]
+        if len(nans)==0:
+            maxVal=y.max()
+            if maxVal< -1e40:
+                maxVal=-1e40
+            minVal=y.min()
+            if minVal>1e40:
+                minVal=1e40
+        elif nans[-1]==len(y)-1:
+            maxVal=minVal=y[-1]
+        else:
+            # a 'nan' resets the extremes
+            maxVal=y[nans[-1]+1:].max()
+            minVal=y[nans[-1]+1:].min()
 
-        minVal=1e40
-        maxVal=-1e40
-        sum=0
-        sumWeighted=0
-        
-        for i,t in enumerate(x):
-            val=y[i]
-            maxVal=max(val,maxVal)
-            minVal=min(val,minVal)
-            sum+=val
-            weight=0
-            if i>0:
-                weight+=(t-x[i-1])/2
-            if i<(len(x)-1):
-                weight+=(x[i+1]-t)/2
-            sumWeighted+=weight*val
+        # trapezoidal weights
+        dx=(x[1:]-x[:-1])/2
+        weight=numpy.zeros(len(x))
+        weight[1:]+=dx
+        weight[:-1]+=dx
+
+        sum=numpy.add.accumulate(numpy.concatenate(([0.],y)))[-1]
+        sumWeighted=numpy.add.accumulate(numpy.concatenate(([0.],weight*y)))[-1]
 
         return { "max" : maxVal,
                  "min" : minVal,
@@ -483,4 +703,3 @@ class SpreadsheetData(object):
                  "wAverage" : sumWeighted/(x[-1]-x[0]),
                  "tMin": x[0],
                  "tMax": x[-1]}
-    
@@ -3,10 +3,8 @@
 
 from PyFoam.Error import error
 from math import ceil
-from copy import deepcopy
 from threading import Lock
-
-transmissionLock=Lock()
+from array import array
 
 def mean(a,b):
     """Mean value of a and b"""
@@ -19,6 +17,44 @@ def signedMax(a,b):
     else:
         return max(a,b)
 
+def numpyView(data):
+    """A numpy-array that uses the memory of an array('d'). Only valid until
+    the next time the array grows"""
+    import numpy
+    if len(data)==0:
+        return numpy.zeros(0)
+    return numpy.frombuffer(data,dtype=numpy.float64)
+
+def numpyAsDouble(val):
+    """Makes sure that a numpy-array has the memory layout of an array('d')"""
+    import numpy
+    return numpy.ascontiguousarray(val,dtype=numpy.float64)
+
+def asDoubleArray(val):
+    """@return: a copy of val as an array('d')"""
+    if isinstance(val,array) and val.typecode=='d':
+        return val[:]
+    else:
+        return array('d',val)
+
+def vectorizedSplitFunction(func):
+    """@return: a function that does the same as func for two numpy-arrays
+    (elementwise). None if func is unknown"""
+    import numpy
+
+    if func==mean:
+        return lambda a,b:0.5*(a+b)
+    elif func==min:
+        return numpy.minimum
+    elif func==max:
+        return numpy.maximum
+    elif func==signedMax:
+        return lambda a,b:numpy.where(numpy.logical_or(a<0.,b<0.),
+                                      numpy.minimum(a,b),
+                                      numpy.maximum(a,b))
+    else:
+        return None
+
 class TimeLinesRegistry(object):
     """Collects references to TimeLineCollection objects"""
 
@@ -31,7 +67,7 @@ class TimeLinesRegistry(object):
         if nr:
             if nr in self.lines:
                 error("Number",nr,"already existing")
-            TimeLinesRegistry.nr=max(nr+1,TimeLinesRegistry)    
+            TimeLinesRegistry.nr=max(nr+1,TimeLinesRegistry.nr)
         else:
             nr=TimeLinesRegistry.nr
             TimeLinesRegistry.nr+=1
@@ -46,26 +82,56 @@ class TimeLinesRegistry(object):
             error(nr,"not a known data set:",self.lines.keys())
         
     def prepareForTransfer(self):
-        """Makes sure that the data about the timelines is to be transfered via XMLRPC"""
-        
-        transmissionLock.acquire()
-        
+        """Makes sure that the data about the timelines is to be transfered via XMLRPC.
+        Every collection is only locked while its snapshot is taken"""
+
+        return self.prepareChangesForTransfer({})
+
+    def prepareChangesForTransfer(self,seen):
+        """Only the data that changed since the last transfer
+        @param seen: dictionary with the numbers of the lines (as strings)
+        as keys and lists with the generation and the number of times that
+        the receiver already has (the result of lastSeen()). Lines that
+        are not in there are transfered completely
+        @return: dictionary with the data of the lines. The data of a line
+        starts at the index 'start'"""
+
         lst={}
-        for i,p in self.lines.iteritems():
+        for i,p in self.lines.items():
             slaves=[]
             for s in p.slaves:
                 slaves.append(s.lineNr)
-                
-            lst[str(i)]={ "nr"    : i,
-                     "times" : deepcopy(p.times),
-                     "values": deepcopy(p.values),
-                     "lastValid" : deepcopy(p.lastValid),
-                     "slaves": slaves }
 
-        transmissionLock.release()
+            generation,nr=seen.get(str(i),(-1,0))
+            data=p.getChanges(generation,nr)
+            data["nr"]=i
+            data["slaves"]=slaves
+            lst[str(i)]=data
 
         return lst
 
+    def lastSeen(self):
+        """@return: what these lines contain (to be passed to
+        prepareChangesForTransfer of the registry that is the source of
+        the data)"""
+        seen={}
+        for i,p in self.lines.iteritems():
+            seen[str(i)]=[p.generation,p.nr()]
+        return seen
+
+    def applyChanges(self,lst):
+        """Updates the lines with the result of prepareChangesForTransfer.
+        Lines that don't exist yet are created
+        @param lst: the data"""
+
+        for i,data in lst.iteritems():
+            nr=int(data["nr"])
+            if nr in self.lines:
+                self.lines[nr].applyChanges(data)
+            else:
+                TimeLineCollection(preloadData=data,registry=self)
+        self.resolveSlaves()
+
     def resolveSlaves(self):
         """Looks through all the registered lines and replaces integers with
         the actual registered line"""
@@ -88,8 +154,16 @@ def allLines():
     return _allLines
 
 class TimeLineCollection(object):
+    """Collection of timelines that share the same times. The times and
+    the values are stored in arrays of doubles (array('d')). Every
+    collection has its own lock that protects the data while it is
+    modified or a snapshot is taken"""
 
     possibleAccumulations=["first", "last", "min", "max", "average", "sum","count"]
+
+    maxRewrites=100
+    """Number of rewrites of the data that are remembered for the transfer
+    of changes"""
     
     def __init__(self,
                  deflt=0.,
@@ -111,8 +185,9 @@ class TimeLineCollection(object):
         @param accumulation: if more than one value is given at any time-step, how to accumulate them (possible values: "first", "last", "min", "max", "average", "sum","count")
         """
         
+        self.lock=Lock()
         self.cTime=None
-        self.times=[]
+        self.times=array('d')
         self.values={}
         self.lastValid={}
         self.setDefault(deflt)
@@ -133,16 +208,23 @@ class TimeLineCollection(object):
                           advancedSplit=advancedSplit,
                           noEmptyTime=noEmptyTime)
 
+        # counts the rewrites of the data (by splitting)
+        self.generation=0
+        self.rewrites=[]
+
         self.lineNr=None
         if preloadData:
-            self.times=preloadData["times"]
-            self.values=preloadData["values"]
+            self.times=asDoubleArray(preloadData["times"])
+            self.values={}
+            for k,v in preloadData["values"].iteritems():
+                self.values[k]=asDoubleArray(v)
             self.slaves=preloadData["slaves"]
             self.lineNr=int(preloadData["nr"])
             if "lastValid" in preloadData:
                 self.lastValid=preloadData["lastValid"]
             else:
                 self.resetValid(val=True)
+            self.generation=preloadData.get("generation",0)
                 
         if registry==None:
             registry=allLines()
@@ -184,7 +266,7 @@ class TimeLineCollection(object):
         
         self.advancedSplit = advancedSplit
         if self.advancedSplit:
-            self.splitLevels = []
+            self.splitLevels = array('i')
         if splitThres:
             self.thres=splitThres
             if (self.thres % 2)==1:
@@ -215,119 +297,210 @@ class TimeLineCollection(object):
     def setTime(self,time,noLock=False,forceAppend=False):
         """Sets the time. If time is new all the timelines are extended
         @param time: the new current time
-        @param noLock: do not acquire the lock that ensures consistent data transmission"""
+        @param noLock: do not acquire the lock of the collection (the caller
+        already holds it)"""
         
+        append=False
+
         if not noLock:
-            transmissionLock.acquire()
+            self.lock.acquire()
 
-        dTime=float(time)
-        
-        if dTime!=self.cTime:
-            self.cTime=dTime
-            append=True
-            if self.noEmptyTime and not forceAppend:
-                if self.nrValid()==0:
-                    append=False
-            if append:
-                self.times.append(self.cTime)
-                for v in self.values.values():
-                    if len(v)>0 and self.extendCopy:
-                        val=v[-1]
-                    else:
-                        val=self.defaultValue
-                    v.append(val)
-            else:
-                if len(self.times)>0:
-                    self.times[-1]=self.cTime
+        try:
+            dTime=float(time)
+
+            if dTime!=self.cTime:
+                self.cTime=dTime
+                append=True
+                if self.noEmptyTime and not forceAppend:
+                    if self.nrValid()==0:
+                        append=False
+                if append:
+                    self.times.append(self.cTime)
+                    for v in self.values.values():
+                        if len(v)>0 and self.extendCopy:
+                            val=v[-1]
+                        else:
+                            val=self.defaultValue
+                        v.append(val)
+                else:
+                    if len(self.times)>0:
+                        self.times[-1]=self.cTime
                 
-            self.resetValid()
-            
-            if self.thres and append:
-                if len(self.times)>=self.thres:
-                    if self.advancedSplit:
-                        # Clumsy algorithm where the maximum and the minimum of a 
-                        # data-window are preserved in that order
-                        if len(self.splitLevels)<len(self.times):
-                            self.splitLevels+=[0]*(len(self.times)-len(self.splitLevels))
-                        splitTill=int(len(self.times)*0.75)
-                        if self.splitLevels[splitTill]!=0:
-                            # Shouldn't happen. But just in case
-                            splitTill=self.splitLevels.index(0)
-                        splitFrom=0
-                        maxLevel=self.splitLevels[0]
-                        for l in range(maxLevel):
-                            li=self.splitLevels.index(l)
-                            if li>=0 and li<splitTill/2:
-                                splitFrom=li
-                                break
-                        window=4
-                        if ((splitTill-splitFrom)/window)!=0:
-                            splitTill=splitFrom+window*int(ceil((splitTill-splitFrom)/float(window)))
-
-                        # prepare data that will not be split
-                        times=self.times[:splitFrom]
-                        levels=self.splitLevels[:splitFrom]
-                        values={}
-                        for k in self.values:
-                            values[k]=self.values[k][:splitFrom]
-                            
-                        for start in range(splitFrom,splitTill,window):
-                            end=start+window-1
-                            sTime=self.times[start]
-                            eTime=self.times[end]
-                            times+=[sTime,(eTime-sTime)*(2./3)+sTime]
-                            levels+=[self.splitLevels[start]+1,self.splitLevels[end]+1]
-                            for k in self.values:
-                                minV=self.values[k][start]
-                                minI=0
-                                maxV=self.values[k][start]
-                                maxI=0
-                                for j in range(1,window):
-                                    val=self.values[k][start+j]
-                                    if val>maxV:
-                                        maxV=val
-                                        maxI=j
-                                    if val<minV:
-                                        minV=val
-                                        minI=j
-                                if minI<maxI:
-                                    values[k]+=[minV,maxV]
-                                else:
-                                    values[k]+=[maxV,minV]
-                        firstUnsplit=int(splitTill/window)*window
-                        self.times=times+self.times[firstUnsplit:]
-                        self.splitLevels=levels+self.splitLevels[firstUnsplit:]
-                        # print self.splitLevels
-                        for k in self.values:
-                            self.values[k]=values[k]+self.values[k][firstUnsplit:]
-                            assert len(self.times)==len(self.values[k])
-                    else:
-                        self.times=self.split(self.times,min)
-                        for k in self.values.keys():
-                            self.values[k]=self.split(self.values[k],self.fun)
-            self.occured={}
+                self.resetValid()
             
+                if self.thres and append:
+                    if len(self.times)>=self.thres:
+                        if self.advancedSplit:
+                            self.advancedSplitData()
+                        else:
+                            self.markRewrite(0)
+                            self.times=self.split(self.times,min)
+                            for k in self.values.keys():
+                                self.values[k]=self.split(self.values[k],self.fun)
+                self.occured={}
+        finally:
+            if not noLock:
+                self.lock.release()
+
+        # the slaves have their own locks
         for s in self.slaves:
-            s.setTime(time,noLock=True,forceAppend=append)
+            s.setTime(time,forceAppend=append)
+
+    def markRewrite(self,first):
+        """Notes that data that was already there has been changed
+        @param first: the index of the first changed entry"""
+
+        self.generation+=1
+        self.rewrites.append((self.generation,first))
+        if len(self.rewrites)>self.maxRewrites:
+            del self.rewrites[0]
+
+    def getChanges(self,generation,nr):
+        """Get the data that changed since a receiver got its data
+        @param generation: the generation of the data the receiver has (-1
+        if it has no data)
+        @param nr: the number of times the receiver has
+        @return: dictionary with the data that has to be replaced at the
+        receiver starting with the index 'start' (the last entry is always
+        transfered because it may change until the next time is set)"""
+
+        self.lock.acquire()
+        try:
+            start=nr-1
+            if generation!=self.generation:
+                if len(self.rewrites)==0 or generation<self.rewrites[0][0]-1 or generation>self.generation:
+                    # too old (or not from here). Start from the beginning
+                    start=0
+                else:
+                    for g,first in self.rewrites:
+                        if g>generation:
+                            start=min(start,first)
+            start=max(0,min(start,len(self.times)))
+
+            values={}
+            for k,v in self.values.iteritems():
+                values[k]=v[start:].tolist()
+            result={ "generation" : self.generation,
+                     "start"      : start,
+                     "default"    : self.defaultValue,
+                     "times"      : self.times[start:].tolist(),
+                     "values"     : values,
+                     "lastValid"  : dict(self.lastValid) }
+        finally:
+            self.lock.release()
 
-        if not noLock:
-            transmissionLock.release()
+        return result
+
+    def applyChanges(self,data):
+        """Applies the data that getChanges of another collection returned
+        @param data: the result of getChanges"""
+
+        self.lock.acquire()
+        try:
+            start=data["start"]
+            default=data.get("default",self.defaultValue)
+            if start>len(self.times):
+                error("Changes start at",start,"but only",len(self.times),"times present")
+            del self.times[start:]
+            self.times.extend(data["times"])
+            for k,v in data["values"].iteritems():
+                if k in self.values:
+                    old=self.values[k]
+                    del old[start:]
+                else:
+                    # the line was created by the sender after our last update.
+                    # Until then it had only default values
+                    old=array('d',[default])*start
+                    self.values[k]=old
+                old.extend(v)
+            self.lastValid=data["lastValid"]
+            self.generation=data["generation"]
+        finally:
+            self.lock.release()
+
+    def advancedSplitData(self):
+        """Clumsy algorithm where the maximum and the minimum of a
+        data-window are preserved in that order"""
+
+        import numpy
 
-    def split(self,array,func):
+        if len(self.splitLevels)<len(self.times):
+            self.splitLevels.extend([0]*(len(self.times)-len(self.splitLevels)))
+        splitTill=int(len(self.times)*0.75)
+        if self.splitLevels[splitTill]!=0:
+            # Shouldn't happen. But just in case
+            splitTill=self.splitLevels.index(0)
+        splitFrom=0
+        maxLevel=self.splitLevels[0]
+        for l in range(maxLevel):
+            try:
+                li=self.splitLevels.index(l)
+            except ValueError:
+                # this level has already been split completely
+                continue
+            if li<splitTill/2:
+                splitFrom=li
+                break
+        window=4
+        if ((splitTill-splitFrom)/window)!=0:
+            splitTill=splitFrom+window*int(ceil((splitTill-splitFrom)/float(window)))
+
+        nrWindows=len(range(splitFrom,splitTill,window))
+        self.markRewrite(splitFrom)
+        firstUnsplit=int(splitTill/window)*window
+
+        # every row is one window
+        windows=numpy.arange(splitFrom,splitFrom+nrWindows*window).reshape((nrWindows,window))
+        starts=windows[:,0]
+        ends=windows[:,-1]
+
+        tm=numpyView(self.times)
+        newTimes=numpy.empty(2*nrWindows)
+        newTimes[0::2]=tm[starts]
+        newTimes[1::2]=(tm[ends]-tm[starts])*(2./3)+tm[starts]
+        self.times=self.times[:splitFrom]+array('d',newTimes.tostring())+self.times[firstUnsplit:]
+
+        lv=numpy.frombuffer(self.splitLevels,dtype=numpy.intc)
+        newLevels=numpy.empty(2*nrWindows,dtype=numpy.intc)
+        newLevels[0::2]=lv[starts]+1
+        newLevels[1::2]=lv[ends]+1
+        self.splitLevels=self.splitLevels[:splitFrom]+array('i',newLevels.tostring())+self.splitLevels[firstUnsplit:]
+
+        rows=numpy.arange(nrWindows)
+        for k in self.values:
+            vals=numpyView(self.values[k])[windows]
+            # the first occurence counts (like in a loop)
+            minI=vals.argmin(axis=1)
+            maxI=vals.argmax(axis=1)
+            minV=vals[rows,minI]
+            maxV=vals[rows,maxI]
+            minFirst=minI<maxI
+            newVals=numpy.empty(2*nrWindows)
+            newVals[0::2]=numpy.where(minFirst,minV,maxV)
+            newVals[1::2]=numpy.where(minFirst,maxV,minV)
+            self.values[k]=self.values[k][:splitFrom]+array('d',newVals.tostring())+self.values[k][firstUnsplit:]
+            assert len(self.times)==len(self.values[k])
+
+    def split(self,data,func):
         """Makes the array smaller by joining every two points
-        @param array: the field to split
+        @param data: the field to split
         @param func: The function to use for joining two points"""
 
-        newLen=len(array)/2
-        newArray=[0.]*newLen
+        newLen=len(data)/2
 
-        for i in range(newLen):
-            newArray[i]=func(array[2*i],array[2*i+1])
+        vFunc=vectorizedSplitFunction(func)
+        if vFunc:
+            vals=numpyView(data)
+            newData=array('d',numpyAsDouble(vFunc(vals[0:2*newLen:2],vals[1:2*newLen:2])).tostring())
+        else:
+            newData=array('d',[0.])*newLen
+            for i in range(newLen):
+                newData[i]=func(data[2*i],data[2*i+1])
+
+        return newData
 
-        return newArray
-    
     def getTimes(self,name=None):
-        """@return: A list of the time values"""
+        """@return: An array of the time values"""
         tm=None
         if name in self.values or name==None:
             tm=self.times
@@ -349,7 +522,7 @@ class TimeLineCollection(object):
     def getValues(self,name):
         """Gets a timeline
         @param name: Name of the timeline
-        @return: List with the values"""
+        @return: array with the values"""
         
         if not self.values.has_key(name):
             if len(self.slaves)>0:
@@ -357,7 +530,7 @@ class TimeLineCollection(object):
                     nr=int(name[-2:])
                     nm=name[:name.find("_slave")]
                     return self.slaves[nr].getValues(nm)
-            self.values[name]=self.nr()*[self.defaultValue]
+            self.values[name]=array('d',[self.defaultValue])*self.nr()
         return self.values[name]
             
     def setValue(self,name,value):
@@ -365,70 +538,93 @@ class TimeLineCollection(object):
         @param name: name of the timeline
         @param value: the last element"""
 
-        transmissionLock.acquire()
-
-        data=self.getValues(name)
-        val=float(value)
-        if len(data)>0:
-            accu=self.accumulation
-            if not self.occured.has_key(name):
-                if accu=="count":
-                    newValue=1L
-                else:
-                    newValue=val
-                self.occured[name]=1
-            else:
-                oldValue=data[-1]
-                n=self.occured[name]
-                self.occured[name]+=1
-                if name in self.accumulations:
-                    accu=self.accumulations[name]
-                if accu=="first":
-                    newValue=oldValue
-                elif accu=="last":
-                    newValue=val
-                elif accu=="max":
-                    newValue=max(val,oldValue)
-                elif accu=="min":
-                    newValue=min(val,oldValue)
-                elif accu=="sum":
-                    newValue=val+oldValue
-                elif accu=="average":
-                    newValue=(n*oldValue+val)/(n+1)
-                elif accu=="count":
-                    newValue=n+1
+        self.lock.acquire()
+        try:
+            data=self.getValues(name)
+            val=float(value)
+            if len(data)>0:
+                accu=self.accumulation
+                if not self.occured.has_key(name):
+                    if accu=="count":
+                        newValue=1L
+                    else:
+                        newValue=val
+                    self.occured[name]=1
                 else:
-                    error("Unimplemented accumulator",accu,"for",name)
+                    oldValue=data[-1]
+                    n=self.occured[name]
+                    self.occured[name]+=1
+                    if name in self.accumulations:
+                        accu=self.accumulations[name]
+                    if accu=="first":
+                        newValue=oldValue
+                    elif accu=="last":
+                        newValue=val
+                    elif accu=="max":
+                        newValue=max(val,oldValue)
+                    elif accu=="min":
+                        newValue=min(val,oldValue)
+                    elif accu=="sum":
+                        newValue=val+oldValue
+                    elif accu=="average":
+                        newValue=(n*oldValue+val)/(n+1)
+                    elif accu=="count":
+                        newValue=n+1
+                    else:
+                        error("Unimplemented accumulator",accu,"for",name)
                     
-            data[-1]=newValue
+                data[-1]=newValue
 
-        self.lastValid[name]=True
-        
-        transmissionLock.release()
+            self.lastValid[name]=True
+        finally:
+            self.lock.release()
+
+    def snapshot(self):
+        """Copies of the current data. The lock is only held while copying
+        the memory of the arrays
+        @return: tuple with the times, a dictionary with the values and a
+        dictionary with the valid-flags"""
+
+        self.lock.acquire()
+        try:
+            times=self.times[:]
+            values={}
+            for k,v in self.values.iteritems():
+                values[k]=v[:]
+            lastValid=dict(self.lastValid)
+        finally:
+            self.lock.release()
+
+        return times,values,lastValid
 
     def getData(self):
         """Return the whole current data as a SpreadsheetData-object"""
 
         from SpreadsheetData import SpreadsheetData
-        import numpy
-        
-        names=["time"]+self.values.keys()
-        data=[]
-        data.append(self.times)
-        for k in self.values.keys():
-            data.append(self.values[k])
 
-        return SpreadsheetData(names=names,data=numpy.asarray(data).transpose())
-    
+        times,values,lastValid=self.snapshot()
+
+        # the snapshot is a private copy. No need to copy it again
+        names=["time"]+values.keys()
+        columns=[numpyView(times)]
+        for k in values.keys():
+            columns.append(numpyView(values[k]))
+
+        return SpreadsheetData(names=names,columns=columns)
+
     def getLatestData(self):
         """Return a dictionary with the latest values from all data sets"""
         
         result={}
 
-        for n,d in self.values.iteritems():
-            if self.lastValid[n] or len(d)<2:
-                result[n]=d[-1]
-            else:
-                result[n]=d[-2]
+        self.lock.acquire()
+        try:
+            for n,d in self.values.iteritems():
+                if self.lastValid[n] or len(d)<2:
+                    result[n]=d[-1]
+                else:
+                    result[n]=d[-2]
+        finally:
+            self.lock.release()
 
         return result
@@ -0,0 +1,140 @@
+"""Reduces timelines to the points that are visible in a plot
+
+The time-axis is divided into buckets (about one per pixel). For every
+bucket only the first, the last, the minimal and the maximal point are
+kept (in their original order). A line through these points looks the
+same as a line through all the points. The buckets are kept between
+calls so that only the points that were added since the last call have
+to be processed"""
+
+from array import array
+
+def reduceBuckets(keys,iFirst,iLast,iMin,vMin,iMax,vMax):
+    """Joins consecutive entries with the same key. Points are buckets
+    that contain only one point
+    @return: tuple with the arrays of the joined buckets (same order as
+    the parameters)"""
+
+    import numpy
+
+    n=len(keys)
+    starts=numpy.flatnonzero(numpy.r_[True,keys[1:]!=keys[:-1]])
+    if len(starts)==n:
+        return keys,iFirst,iLast,iMin,vMin,iMax,vMax
+    ends=numpy.r_[starts[1:]-1,n-1]
+    counts=numpy.diff(numpy.r_[starts,n])
+
+    big=numpy.iinfo(numpy.int64).max
+
+    newMin=numpy.minimum.reduceat(vMin,starts)
+    newIMin=numpy.minimum.reduceat(numpy.where(vMin==numpy.repeat(newMin,counts),iMin,big),
+                                   starts)
+    newMax=numpy.maximum.reduceat(vMax,starts)
+    newIMax=numpy.minimum.reduceat(numpy.where(vMax==numpy.repeat(newMax,counts),iMax,big),
+                                   starts)
+    # buckets with NaN
+    newIMin=numpy.where(newIMin==big,iFirst[starts],newIMin)
+    newIMax=numpy.where(newIMax==big,iFirst[starts],newIMax)
+
+    return keys[starts],iFirst[starts],iLast[ends],newIMin,newMin,newIMax,newMax
+
+def asNumpy(data,n):
+    """@return: the first n elements of data as a numpy-array. For an
+    array('d') this uses the memory of the array"""
+    import numpy
+    if isinstance(data,array) and data.typecode=='d':
+        return numpy.frombuffer(data,dtype=numpy.float64,count=n)
+    else:
+        return numpy.asarray(data,dtype=numpy.float64)[:n]
+
+class TimelineDecimator(object):
+    """Decimates one timeline and remembers the buckets. Assumes that only
+    the last point of the data changes when new points are appended. If
+    the data was rewritten (the generation of the L{TimeLineCollection}
+    changes) everything is computed again"""
+
+    def __init__(self,resolution=640):
+        """@param resolution: the number of buckets the time-axis is divided
+        into (the width of the plot in pixels). Timelines with at most
+        twice this number of points are not decimated"""
+
+        self.resolution=resolution
+        self.reset()
+
+    def reset(self):
+        """Forget the buckets"""
+        self.generation=None
+        self.done=0
+        self.t0=None
+        self.width=None
+        self.buckets=None
+
+    def decimate(self,times,values,generation=0):
+        """@param times: the times of the timeline
+        @param values: the values of the timeline
+        @param generation: the generation of the data. If it differs from
+        the last call the buckets are computed again. The arrays must not
+        grow during the call (the caller holds the lock of the collection)
+        @return: tuple with the times and the values that should be plotted.
+        The last point is always the last point of the data"""
+
+        import numpy
+
+        n=min(len(times),len(values))
+        if self.resolution==None or n<=2*self.resolution:
+            self.reset()
+            return times[:n],values[:n]
+
+        if generation!=self.generation or n<=self.done:
+            self.reset()
+            self.generation=generation
+
+        tm=asNumpy(times,n)
+        vals=asNumpy(values,n)
+
+        if self.width==None:
+            span=tm[n-1]-tm[0]
+            if not span>0:
+                return times[:n],values[:n]
+            self.t0=tm[0]
+            self.width=span/self.resolution
+
+        # the last point may still change. It is not put into a bucket
+        self.add(tm,vals,self.done,n-1)
+        self.done=n-1
+
+        keys,iFirst,iLast,iMin,vMin,iMax,vMax=self.buckets
+        idx=numpy.sort(numpy.vstack((iFirst,iMin,iMax,iLast)),axis=0).T.ravel()
+        idx=idx[numpy.r_[True,idx[1:]!=idx[:-1]]]
+        idx=numpy.r_[idx,n-1]
+
+        return tm[idx],vals[idx]
+
+    def add(self,tm,vals,start,end):
+        """Put the points from start to end (exclusive) into the buckets"""
+
+        import numpy
+
+        if end<=start:
+            return
+
+        keys=numpy.floor((tm[start:end]-self.t0)/self.width).astype(numpy.int64)
+        # times that go backwards are added to the current bucket
+        if self.buckets!=None:
+            keys[0]=max(keys[0],self.buckets[0][-1])
+        keys=numpy.maximum.accumulate(keys)
+
+        pos=numpy.arange(start,end,dtype=numpy.int64)
+        v=vals[start:end]
+        new=reduceBuckets(keys,pos,pos,pos,v,pos,v)
+
+        if self.buckets==None:
+            self.buckets=new
+        else:
+            self.buckets=reduceBuckets(*[numpy.r_[o,a] for o,a in zip(self.buckets,new)])
+
+        # too many buckets: make them twice as wide
+        while len(self.buckets[0])>2*self.resolution:
+            self.width*=2
+            b=self.buckets
+            self.buckets=reduceBuckets(b[0]//2,*b[1:])
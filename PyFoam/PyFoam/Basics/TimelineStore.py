@@ -0,0 +1,202 @@
+"""Append-only file with the data of timelines (and the plots that
+show them)
+
+The file starts with a header line. After that come records. Every
+record is the length of a pickled dictionary (8 bytes), the dictionary
+and the binary data (doubles) it describes. A record for a
+L{TimeLineCollection} replaces the data of the collection from the
+index start on (the same as the changes transfered by
+L{TimeLinesRegistry.prepareChangesForTransfer}). Usually only the new
+times are appended. If too much of the file is replaced data the whole
+file is rewritten"""
+
+import cPickle as pickle
+import struct,sys,mmap
+from os import path,rename
+from array import array
+
+from PyFoam.Error import error
+
+_magic="PyFoamTimelines 1 "
+
+def isTimelineStore(fName):
+    """@return: True if the file is a timeline store"""
+    try:
+        return open(fName,"rb").read(len(_magic))==_magic
+    except IOError:
+        return False
+
+class TimelineStore(object):
+    """Writes timelines and plots to a store. Every call of write only
+    appends the data that changed since the last call"""
+
+    def __init__(self,fName,compactFactor=4,minCompactSize=1024*1024):
+        """@param fName: name of the file. An existing file is overwritten
+        @param compactFactor: if the file is more than this times as big
+        as the current data then it is rewritten
+        @param minCompactSize: files that are smaller are never rewritten"""
+
+        self.fName=fName
+        self.compactFactor=compactFactor
+        self.minCompactSize=minCompactSize
+        self.start()
+
+    def start(self):
+        """Start a new file"""
+        fh=open(self.fName,"wb")
+        fh.write(_magic+sys.byteorder+"\n")
+        fh.close()
+        self.seen={}
+        self.plots=None
+        self.size=0
+        self.dataSize=0
+        self.compactedSize=0
+
+    def write(self,registry,plots=None):
+        """Append the changes
+        @param registry: the L{TimeLinesRegistry} with the lines
+        @param plots: the description of the plots (result of
+        prepareForTransfer of the plot registry)"""
+
+        self.append(registry,plots)
+
+        if self.size>self.minCompactSize and \
+               self.size>self.compactFactor*max(self.dataSize,self.compactedSize):
+            self.compact(registry)
+
+    def append(self,registry,plots):
+        """Append the changes to the file"""
+
+        changes=registry.prepareChangesForTransfer(self.seen)
+
+        fh=open(self.fName,"ab")
+        try:
+            if plots!=None and plots!=self.plots:
+                self.size+=self.writeRecord(fh,{"plots":plots},[])
+                self.plots=plots
+
+            for k,data in changes.iteritems():
+                names=data["values"].keys()
+                header={}
+                for n in ["nr","start","generation","default","lastValid","slaves"]:
+                    header[n]=data.get(n)
+                header["names"]=names
+                header["count"]=len(data["times"])
+                self.size+=self.writeRecord(fh,header,
+                                            [data["times"]]+[data["values"][n] for n in names])
+                self.seen[k]=[data["generation"],data["start"]+len(data["times"])]
+        finally:
+            fh.close()
+
+        self.dataSize=0
+        for k,(generation,nr) in self.seen.iteritems():
+            self.dataSize+=nr*8*(1+len(changes[k]["values"]))
+
+    def compact(self,registry):
+        """Rewrite the file with only the current data"""
+        plots=self.plots
+        realName=self.fName
+        self.fName=realName+".tmp"
+        try:
+            self.start()
+            self.append(registry,plots)
+        finally:
+            self.fName=realName
+        rename(realName+".tmp",realName)
+        self.compactedSize=self.size
+
+    def writeRecord(self,fh,header,columns):
+        """Write a record
+        @param header: the dictionary
+        @param columns: lists of floats
+        @return: the number of bytes written"""
+
+        head=pickle.dumps(header,pickle.HIGHEST_PROTOCOL)
+        body="".join([array('d',c).tostring() for c in columns])
+        fh.write(struct.pack("<Q",len(head))+head+body)
+        return 8+len(head)+len(body)
+
+def readTimelineStore(fName):
+    """Read a timeline store. The file is memory mapped. An incomplete
+    record at the end (because the writer is still writing it) is ignored
+    @return: tuple with the data of the lines and the plots. The same as
+    prepareForTransfer of the L{TimeLinesRegistry} and the plot registry
+    return"""
+
+    fh=open(fName,"rb")
+    try:
+        first=fh.readline()
+        if first[:len(_magic)]!=_magic:
+            error(fName,"is not a timeline store")
+        swap=first[len(_magic):].strip()!=sys.byteorder
+
+        lines={}
+        plots={}
+
+        size=path.getsize(fName)
+        if size<=len(first):
+            return lines,plots
+        mm=mmap.mmap(fh.fileno(),size,access=mmap.ACCESS_READ)
+        try:
+            pos=len(first)
+            while pos+8<=size:
+                l=struct.unpack("<Q",mm[pos:pos+8])[0]
+                if pos+8+l>size:
+                    break
+                header=pickle.loads(mm[pos+8:pos+8+l])
+                pos+=8+l
+
+                if "plots" in header:
+                    plots=header["plots"]
+                    continue
+
+                cnt=header["count"]
+                names=header["names"]
+                end=pos+cnt*8*(1+len(names))
+                if end>size:
+                    break
+
+                columns=[]
+                for i in range(1+len(names)):
+                    a=array('d')
+                    a.fromstring(mm[pos+i*cnt*8:pos+(i+1)*cnt*8])
+                    if swap:
+                        a.byteswap()
+                    columns.append(a)
+                pos=end
+
+                applyRecord(lines,header,columns)
+        finally:
+            mm.close()
+    finally:
+        fh.close()
+
+    return lines,plots
+
+def applyRecord(lines,header,columns):
+    """Apply the data of a record to the lines that were read so far"""
+
+    k=str(header["nr"])
+    start=header["start"]
+    if k not in lines:
+        lines[k]={"nr"     : header["nr"],
+                  "times"  : array('d'),
+                  "values" : {},
+                  "start"  : 0}
+    line=lines[k]
+    for n in ["generation","default","lastValid","slaves"]:
+        line[n]=header[n]
+
+    times=line["times"]
+    if start>len(times):
+        error("Data of line",k,"starts at",start,"but only",len(times),"times present")
+    del times[start:]
+    times.extend(columns[0])
+    for n,c in zip(header["names"],columns[1:]):
+        if n in line["values"]:
+            old=line["values"][n]
+            del old[start:]
+        else:
+            old=array('d',[header["default"]])*start
+            line["values"][n]=old
+        old.extend(c)
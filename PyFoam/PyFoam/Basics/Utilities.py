@@ -10,8 +10,9 @@ if sys.version_info<(2,6):
 else:
     from subprocess import Popen,PIPE,STDOUT
 from os import listdir,path,remove as removeFile
+import os,stat
 
-import re
+import re,errno,fnmatch
 
 try:
     import shutil
@@ -19,6 +20,14 @@ except ImportError:
     # this is an old python-version without it. We'll try to work around it
     pass
 
+# ioctl of Linux that makes a file share the data of another file
+# (copy-on-write). Only supported by some file-systems (btrfs, xfs, ...)
+FICLONE=0x40049409
+
+# errors that mean that a link can't be made (and the file has to be copied)
+_noLinkErrors=[errno.EXDEV,errno.EPERM,errno.EMLINK,errno.EINVAL,
+               errno.ENOTTY,errno.EOPNOTSUPP]
+
 class Utilities(object):
     """Class with utility methods
 
@@ -92,6 +101,139 @@ class Utilities(object):
         except NameError:
             self.execute("cp "+src+" "+dst)
             
+    def linkfile(self,src,dst,mode="hardlink"):
+        """Makes dst a file with the same content as src without
+        copying the data. If that is not possible the file is copied
+        @param src: the original file
+        @param dst: the new file
+        @param mode: 'hardlink' (both names refer to the same file) or
+        'reflink' (a new file that shares the data with the original
+        until one of them is modified)
+        @return: the number of bytes that were copied (0 if the data is shared)"""
+
+        try:
+            if mode=="hardlink":
+                os.link(src,dst)
+                return 0
+            elif mode=="reflink":
+                import fcntl
+                s=open(src,"rb")
+                try:
+                    d=open(dst,"wb")
+                    try:
+                        fcntl.ioctl(d.fileno(),FICLONE,s.fileno())
+                    finally:
+                        d.close()
+                finally:
+                    s.close()
+                shutil.copystat(src,dst)
+                return 0
+            else:
+                raise ValueError("Unknown link mode "+str(mode))
+        except (OSError,IOError),e:
+            if e.errno not in _noLinkErrors:
+                raise
+        except ImportError:
+            pass
+
+        shutil.copy2(src,dst)
+        return os.stat(dst).st_size
+
+    def clonetree(self,src,dst,
+                  symlinks=False,
+                  ignore=[],
+                  link=None,
+                  linkTest=None):
+        """Copies a file or a directory tree like copytree. Can leave out
+        files and link the data of files instead of copying it
+        @param symlinks: copy symbolic links as links (not the files
+        they point to)
+        @param ignore: list with glob-patterns. Files and directories
+        whose names match them are not copied
+        @param link: 'hardlink' or 'reflink'. Files for which linkTest
+        returns True are linked (see linkfile)
+        @param linkTest: function that gets the path of a source file
+        @return: the number of bytes that were copied"""
+
+        if path.isdir(dst):
+            dst=path.join(dst,path.basename(path.abspath(src)))
+
+        if symlinks and path.islink(src):
+            os.symlink(os.readlink(src),dst)
+            return 0
+        elif not path.isdir(src):
+            if link and linkTest and linkTest(src):
+                return self.linkfile(src,dst,mode=link)
+            else:
+                shutil.copy2(src,dst)
+                return os.stat(dst).st_size
+
+        os.mkdir(dst)
+        copied=0
+        for n in listdir(src):
+            skip=False
+            for p in ignore:
+                if fnmatch.fnmatch(n,p):
+                    skip=True
+                    break
+            if not skip:
+                copied+=self.clonetree(path.join(src,n),
+                                       path.join(dst,n),
+                                       symlinks=symlinks,
+                                       ignore=ignore,
+                                       link=link,
+                                       linkTest=linkTest)
+        shutil.copystat(src,dst)
+
+        return copied
+
+    def diskUsage(self,d,stats=None):
+        """Calculates the disk-usage of a directory tree like 'du' (the
+        blocks that are allocated, files with several hardlinks are only
+        counted once). Symbolic links are not followed
+        @param d: the directory
+        @param stats: if a dictionary is passed then the lstat-results
+        of the entries directly in the directory are added to it (name
+        as the key)
+        @return: the number of bytes"""
+
+        seen=set()
+        total=0
+        todo=[d]
+        top=True
+        while len(todo)>0:
+            current=todo.pop()
+            try:
+                names=listdir(current)
+            except OSError:
+                continue
+            for n in names:
+                full=path.join(current,n)
+                try:
+                    s=os.lstat(full)
+                except OSError:
+                    continue
+                if top and stats!=None:
+                    stats[n]=s
+                if s.st_nlink>1 and not stat.S_ISDIR(s.st_mode):
+                    if (s.st_dev,s.st_ino) in seen:
+                        continue
+                    seen.add((s.st_dev,s.st_ino))
+                try:
+                    total+=s.st_blocks*512
+                except AttributeError:
+                    total+=s.st_size
+                if stat.S_ISDIR(s.st_mode):
+                    todo.append(full)
+            top=False
+
+        try:
+            total+=os.lstat(d).st_blocks*512
+        except AttributeError:
+            total+=os.lstat(d).st_size
+
+        return total
+
     def writeDictionaryHeader(self,f):
         """Writes a dummy header so OpenFOAM accepts the file as a dictionary
         @param f: The file to write to
@@ -155,6 +297,22 @@ def copytree(src,dest,symlinks=False):
     """Calls the method of the same name from the Utilites class"""
     return Utilities().copytree(src,dest,symlinks=symlinks)
 
+def clonetree(src,dest,symlinks=False,ignore=[],link=None,linkTest=None):
+    """Calls the method of the same name from the Utilites class"""
+    return Utilities().clonetree(src,dest,
+                                 symlinks=symlinks,
+                                 ignore=ignore,
+                                 link=link,
+                                 linkTest=linkTest)
+
+def linkfile(src,dest,mode="hardlink"):
+    """Calls the method of the same name from the Utilites class"""
+    return Utilities().linkfile(src,dest,mode=mode)
+
+def diskUsage(d,stats=None):
+    """Calls the method of the same name from the Utilites class"""
+    return Utilities().diskUsage(d,stats=stats)
+
 def remove(f):
     """Calls the method of the same name from the Utilites class"""
     return Utilities().remove(f)
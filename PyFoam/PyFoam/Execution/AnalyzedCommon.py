@@ -14,6 +14,7 @@ from PyFoam.Error import error
 import cPickle as pickle
 from PyFoam.Basics.GeneralPlotTimelines import allPlots
 from PyFoam.Basics.TimeLineCollection import allLines
+from PyFoam.Basics.TimelineStore import TimelineStore
 
 from threading import Lock
 
@@ -42,6 +43,7 @@ class AnalyzedCommon(object):
         self.doPickling=doPickling
         if self.doPickling:
             self.pickleLock=Lock()
+            self.timelineStore=None
             
         self.reset()
 
@@ -283,8 +285,12 @@ class AnalyzedCommon(object):
 
     def picklePlots(self,wait=False):
         """Writes the necessary information for the plots permanently to disc,
-        so that it doesn't have to be generated again
-        @param wait: wait for the lock to be allowed to pickle"""
+        so that it doesn't have to be generated again. While the run
+        goes on only the new data is appended to the timeline store
+        (timelineStore). The complete pickled file (pickledPlots) is
+        written at the end
+        @param wait: wait for the lock to be allowed to pickle. Also
+        signals the end of the run"""
 
         #        print "Putting some pickles in the jar"
         
@@ -294,14 +300,21 @@ class AnalyzedCommon(object):
             gotIt=self.pickleLock.acquire(wait)
             if not gotIt:
                 return
-            
-            pickleFile=path.join(self.logDir,"pickledPlots")
-            pick=pickle.Pickler(open(pickleFile+".tmp","w"))
-            pick.dump(lines.prepareForTransfer())
-            pick.dump(plots.prepareForTransfer())
-            move(pickleFile+".tmp",pickleFile)
 
-            self.pickleLock.release()
+            try:
+                plotInfo=plots.prepareForTransfer()
+                if self.timelineStore==None:
+                    self.timelineStore=TimelineStore(path.join(self.logDir,"timelineStore"))
+                self.timelineStore.write(lines,plotInfo)
+
+                if wait:
+                    pickleFile=path.join(self.logDir,"pickledPlots")
+                    pick=pickle.Pickler(open(pickleFile+".tmp","w"))
+                    pick.dump(lines.prepareForTransfer())
+                    pick.dump(plotInfo)
+                    move(pickleFile+".tmp",pickleFile)
+            finally:
+                self.pickleLock.release()
 
     def setDataSet(self,data):
         if hasattr(self,"data"):
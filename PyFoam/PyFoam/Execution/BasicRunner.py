@@ -215,83 +215,96 @@ class BasicRunner(object):
         self.run.start()
         interrupted=False
         
+        flushInterval=config().getfloat("Execution","logFlushInterval",default=1.)
+        lastFlush=time()
+
         while self.run.check():
             try:
-                self.run.read()
-                if not self.run.check():
-                    break
-
-                line=self.run.getLine()
-                self.data["lines"]+=1
+                self.run.readLines()
+                lines=self.run.getLines()
+                if len(lines)==0:
+                    if not self.run.check():
+                        break
+                    else:
+                        continue
+
+                self.data["lines"]+=len(lines)
                 self.lastLogLineSeen=time()
                 self.writeLastSeen()
 
-                tmp=check.getTime(line)
-                if check.controlDictRead(line):
-                    if self.writeRequested:
-                        duration=config().getfloat("Execution","controlDictRestoreWait",default=30.)
-                        warning("Preparing to reset controlDict to old glory in",duration,"seconds")
-                        Timer(duration,
-                              restoreControlDict,
-                              args=[self.controlDict,self]).start()
-                        self.writeRequested=False
+                for line in lines:
+                    tmp=check.getTime(line)
+                    if check.controlDictRead(line):
+                        if self.writeRequested:
+                            duration=config().getfloat("Execution","controlDictRestoreWait",default=30.)
+                            warning("Preparing to reset controlDict to old glory in",duration,"seconds")
+                            Timer(duration,
+                                  restoreControlDict,
+                                  args=[self.controlDict,self]).start()
+                            self.writeRequested=False
                         
-                if tmp!=None:
-                    self.data["time"]=tmp
-                    self.nowTime=tmp
-                    self.writeTheState("Running",always=False)
-                    self.writeNowTime()
-                    self.lastTimeStepSeen=time()
-                    if self.createTime==None:
-                        # necessary because interFoam reports no creation time
-                        self.createTime=tmp
-                    try:
-                        self.data["stepNr"]+=1
-                    except KeyError:
-                        self.data["stepNr"]=1L
+                    if tmp!=None:
+                        self.data["time"]=tmp
+                        self.nowTime=tmp
+                        self.writeTheState("Running",always=False)
+                        self.writeNowTime()
+                        self.lastTimeStepSeen=time()
+                        if self.createTime==None:
+                            # necessary because interFoam reports no creation time
+                            self.createTime=tmp
+                        try:
+                            self.data["stepNr"]+=1
+                        except KeyError:
+                            self.data["stepNr"]=1L
                         
-                tmp=check.getCreateTime(line)
-                if tmp!=None:
-                    self.createTime=tmp
+                    tmp=check.getCreateTime(line)
+                    if tmp!=None:
+                        self.createTime=tmp
                     
-                if not self.silent:
-                    try:
-                        print line
-                    except IOError,e:
-                        if e.errno!=32:
-                            raise e
-                        else:
-                            # Pipe was broken
-                            self.run.interrupt()
+                    if not self.silent:
+                        try:
+                            print line
+                        except IOError,e:
+                            if e.errno!=32:
+                                raise e
+                            else:
+                                # Pipe was broken
+                                self.run.interrupt()
                             
-                if line.find("FOAM FATAL ERROR")>=0 or line.find("FOAM FATAL IO ERROR")>=0:
-                    self.fatalError=True
-                if line.find("Foam::sigFpe::sigFpeHandler")>=0:
-                    self.fatalFPE=True
-                if line.find("Foam::error::printStack")>=0:
-                    self.fatalStackdump=True
+                    if line.find("FOAM FATAL ERROR")>=0 or line.find("FOAM FATAL IO ERROR")>=0:
+                        self.fatalError=True
+                    if line.find("Foam::sigFpe::sigFpeHandler")>=0:
+                        self.fatalFPE=True
+                    if line.find("Foam::error::printStack")>=0:
+                        self.fatalStackdump=True
                     
-                if self.fatalError and line!="":
-                    foamLogger().error(line)
-
-                if line.find("FOAM Warning")>=0:
-                    self.warnings+=1
-                    try:
-                        self.data["warnings"]+=1
-                    except KeyError:
-                        self.data["warnings"]=1
+                    if self.fatalError and line!="":
+                        foamLogger().error(line)
+
+                    if line.find("FOAM Warning")>=0:
+                        self.warnings+=1
+                        try:
+                            self.data["warnings"]+=1
+                        except KeyError:
+                            self.data["warnings"]=1
                         
-                if self.server!=None:
-                    self.server._insertLine(line)
+                    if self.server!=None:
+                        self.server._insertLine(line)
                 
-                self.lineHandle(line)
+                    self.lineHandle(line)
 
-                if not self.noLog:
-                    fh.write(line+"\n")
-                    fh.flush()
-                elif self.logTail:
-                    self.appendTailLine(line)
+                    if not self.noLog:
+                        fh.write(line+"\n")
+                    elif self.logTail:
+                        self.appendTailLine(line)
                     
+                if not self.noLog:
+                    # flush the log regularly and when the command is
+                    # quiet (so that the log is complete while waiting)
+                    if (self.lastLogLineSeen-lastFlush)>flushInterval or not self.run.outputPending():
+                        fh.flush()
+                        lastFlush=self.lastLogLineSeen
+
             except KeyboardInterrupt,e:
                 foamLogger().warning("Keyboard Interrupt")
                 self.run.interrupt()
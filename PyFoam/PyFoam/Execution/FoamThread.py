@@ -14,6 +14,7 @@ from time import time,sleep
 from resource import getrusage,getpagesize,RUSAGE_CHILDREN
 from os import uname,kill,path,unlink
 import signal
+import select
 
 from PyFoam.Basics.LineReader import LineReader
 from PyFoam.Infrastructure.Logging import foamLogger
@@ -86,7 +87,7 @@ class FoamThread(Thread):
     """Thread running an OpenFOAM command
 
     The output of the command can be accessed in a thread-safe manner,
-    line by line
+    line by line or in chunks of lines
 
     Designed to be used by the BasicRunner-class"""
     
@@ -126,6 +127,7 @@ class FoamThread(Thread):
         
         self.lineLock=Lock()
         self.line=""
+        self.lines=[]
 
         self.stateLock.acquire()
 
@@ -168,8 +170,9 @@ class FoamThread(Thread):
             # to give a chance to read the remaining output
             if self.hasSomethingToSay:
                 sleep(2.)
-            while self.reader.read(self.output):
-                print "Unused output:",self.reader.line
+            while self.reader.readLines(self.output):
+                for l in self.reader.lines:
+                    print "Unused output:",l
         except OSError,e:
             print "Exeption caught:",e
 
@@ -212,6 +215,31 @@ class FoamThread(Thread):
 
         return val
 
+    def readLines(self):
+        """read the data that is available from the output and split
+        it into lines"""
+        self.setState(self.reader.readLines(self.output))
+        self.lineLock.acquire()
+        self.lines=self.reader.lines
+        self.line=self.reader.line
+        self.lineLock.release()
+
+    def outputPending(self):
+        """@return: True if there is more output that can be read
+        without waiting (or if this can't be determined)"""
+        try:
+            return len(select.select([self.output],[],[],0)[0])>0
+        except (select.error,TypeError,ValueError):
+            return True
+
+    def getLines(self):
+        """gets the lines from the last call of readLines"""
+        self.lineLock.acquire()
+        val=self.lines
+        self.lineLock.release()
+
+        return val
+
     def interrupt(self):
         """A keyboard-interrupt is reported"""
         self.reader.wasInterupted=True
@@ -8,6 +8,7 @@ from BasicWatcher import BasicWatcher
 from PyFoam.LogAnalysis.BoundingLogAnalyzer import BoundingLogAnalyzer
 from PyFoam.LogAnalysis.SteadyConvergedLineAnalyzer import SteadyConvergedLineAnalyzer
 from PyFoam.Basics.TimeLineCollection import TimeLineCollection
+from PyFoam.Basics.ReplotScheduler import ReplotScheduler
 from PyFoam.Error import error
 
 from os import path
@@ -37,9 +38,16 @@ class GnuplotCommon(StepAnalyzedCommon):
                  end=None,
                  singleFile=False,
                  writePickled=True,
-                 plottingImplementation=None):
+                 plottingImplementation=None,
+                 maxFrameRate=2.,
+                 asyncPlotting=True,
+                 reportPlotting=False):
         """
         TODO: Docu
+        @param maxFrameRate: maximum number of replots per second
+        @param asyncPlotting: replot in a separate thread (if the plotting
+        implementation allows it)
+        @param reportPlotting: print statistics about the replots at the end
         """
         StepAnalyzedCommon.__init__(self,
                                     fname,
@@ -74,16 +82,28 @@ class GnuplotCommon(StepAnalyzedCommon):
         self.hardcopy=hardcopy
         self.hardcopyFormat=hardcopyFormat
         self.hardcopyPrefix=hardcopyPrefix
+
+        threaded=asyncPlotting
+        for p in self.plots.values():
+            if not p.threadSafe:
+                threaded=False
+        self.replotScheduler=ReplotScheduler(self.plots,
+                                             maxFrameRate=maxFrameRate,
+                                             threaded=threaded)
+        self.reportPlotting=reportPlotting
         
     def timeHandle(self):
         StepAnalyzedCommon.timeHandle(self)
-        
-        for p in self.plots:
-            self.plots[p].redo()
+
+        # the plots are redone later. Reading the log goes on
+        self.replotScheduler.request()
             
     def stopHandle(self):
         StepAnalyzedCommon.stopHandle(self)
         self.timeHandle()
+        self.replotScheduler.stop()
+        if self.reportPlotting:
+            print "Plotting:",self.replotScheduler.report()
         if self.hardcopy:
             if self.hardcopyPrefix:
                 prefix=self.hardcopyPrefix+"."
@@ -125,6 +145,9 @@ class GnuplotRunner(GnuplotCommon,BasicRunner):
                  singleFile=False,
                  writePickled=True,
                  plottingImplementation=None,
+                 maxFrameRate=2.,
+                 asyncPlotting=True,
+                 reportPlotting=False,
                  remark=None,
                  jobId=None):
         """@param smallestFreq: smallest Frequency of output
@@ -162,7 +185,10 @@ class GnuplotRunner(GnuplotCommon,BasicRunner):
                                progress=progress,
                                singleFile=singleFile,
                                writePickled=writePickled,
-                               plottingImplementation=plottingImplementation)
+                               plottingImplementation=plottingImplementation,
+                               maxFrameRate=maxFrameRate,
+                               asyncPlotting=asyncPlotting,
+                               reportPlotting=reportPlotting)
         self.steady=steady
         if self.steady:
             self.steadyAnalyzer=SteadyConvergedLineAnalyzer()
@@ -209,6 +235,9 @@ class GnuplotWatcher(GnuplotCommon,BasicWatcher):
                  singleFile=False,
                  writePickled=True,
                  plottingImplementation=None,
+                 maxFrameRate=2.,
+                 asyncPlotting=True,
+                 reportPlotting=False,
                  solverNotRunning=False):
         """@param smallestFreq: smallest Frequency of output
         @param persist: Gnuplot window persistst after run"""
@@ -240,7 +269,10 @@ class GnuplotWatcher(GnuplotCommon,BasicWatcher):
                                end=end,
                                singleFile=singleFile,
                                writePickled=writePickled,
-                               plottingImplementation=plottingImplementation)
+                               plottingImplementation=plottingImplementation,
+                               maxFrameRate=maxFrameRate,
+                               asyncPlotting=asyncPlotting,
+                               reportPlotting=reportPlotting)
 
         self.hasPlotted=False
         self.replotFrequency=replotFrequency
@@ -267,7 +299,6 @@ class GnuplotWatcher(GnuplotCommon,BasicWatcher):
         elif self.hasPlotted:
             plotNow=False
         if plotNow:
-            for p in self.plots:
-                self.plots[p].redo()
+            self.replotScheduler.request()
             
         
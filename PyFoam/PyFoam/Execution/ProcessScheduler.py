@@ -0,0 +1,137 @@
+"""Runs a number of tasks in separate processes. Limits the number of
+tasks that run at the same time and the number of processors that they
+use"""
+
+import multiprocessing
+from Queue import Empty
+import traceback
+import sys
+
+def nrOfCores():
+    """@return: the number of processors of this machine"""
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+def _runTask(queue,index,func,args):
+    """Executes a task in the child process and sends the result (or the
+    error) back to the parent"""
+    try:
+        result=func(*args)
+        queue.put((index,True,result))
+    except KeyboardInterrupt:
+        raise
+    except:
+        queue.put((index,False,traceback.format_exc()))
+    # make sure that the result is transfered before the process ends
+    queue.close()
+    queue.join_thread()
+
+class ProcessScheduler(object):
+    """Collects tasks (functions with arguments) and runs them in
+    separate processes (so that they can't influence each other through
+    global data like the environment). The tasks are started in the order
+    they were added. A task is only started if the processors it needs
+    are available (a task that needs more than all of them is run alone)"""
+
+    def __init__(self,maxJobs=None,maxCores=None,pollInterval=0.5):
+        """@param maxJobs: maximum number of tasks that run at the same
+        time. If None then there is no limit
+        @param maxCores: the number of processors that the running tasks
+        may use. If None the number of processors of the machine
+        @param pollInterval: how often it is checked whether a process
+        died without sending a result (in seconds)"""
+
+        if maxCores==None:
+            maxCores=nrOfCores()
+        self.maxJobs=maxJobs
+        self.maxCores=max(1,maxCores)
+        self.pollInterval=pollInterval
+        self.tasks=[]
+
+    def add(self,func,args=(),cores=1):
+        """Add a task
+        @param func: the function that is executed. Its return value must
+        be picklable because it is transfered to the parent process
+        @param args: tuple with the arguments of the function
+        @param cores: the number of processors the task needs
+        @return: the number of the task"""
+        self.tasks.append((func,tuple(args),max(1,cores)))
+        return len(self.tasks)-1
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def run(self,started=None,finished=None):
+        """Execute all the tasks. Failing tasks don't stop the others
+        @param started: function that is called with the number of a
+        task when it is started
+        @param finished: function that is called with the number of the
+        task, a flag whether it succeeded and the result (the formated
+        traceback if it failed). Called in the order of the tasks
+        @return: list with a (ok,result) tuple for every task"""
+
+        queue=multiprocessing.Queue()
+        results={}
+        running={}
+        usedCores=0
+        nextTask=0
+        nextReport=0
+
+        try:
+            while nextReport<len(self.tasks):
+                # start as many tasks as possible
+                while nextTask<len(self.tasks):
+                    func,args,cores=self.tasks[nextTask]
+                    if len(running)>0:
+                        if self.maxJobs!=None and len(running)>=self.maxJobs:
+                            break
+                        if usedCores+cores>self.maxCores:
+                            break
+                    p=multiprocessing.Process(target=_runTask,
+                                              args=(queue,nextTask,func,args))
+                    p.start()
+                    running[nextTask]=p
+                    usedCores+=cores
+                    if started:
+                        started(nextTask)
+                    nextTask+=1
+
+                # wait for the next result
+                try:
+                    received=[queue.get(timeout=self.pollInterval)]
+                except Empty:
+                    received=[]
+                    # get all results that arrived before a process ended
+                    dead=[i for i,p in running.iteritems() if not p.is_alive()]
+                    if len(dead)>0:
+                        try:
+                            while True:
+                                received.append(queue.get(timeout=0.1))
+                        except Empty:
+                            pass
+                        got=[r[0] for r in received]
+                        for i in dead:
+                            if i not in got:
+                                received.append((i,False,
+                                                 "Process ended with exit code %s without a result" % running[i].exitcode))
+
+                for index,ok,result in received:
+                    if index not in running:
+                        continue
+                    running[index].join()
+                    del running[index]
+                    usedCores-=self.tasks[index][2]
+                    results[index]=(ok,result)
+
+                while nextReport in results:
+                    if finished:
+                        finished(nextReport,*results[nextReport])
+                    nextReport+=1
+        except:
+            for p in running.values():
+                p.terminate()
+            raise
+
+        return [results[i] for i in range(len(self.tasks))]
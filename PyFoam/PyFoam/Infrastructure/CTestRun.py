@@ -19,6 +19,7 @@ from PyFoam.Applications.SamplePlot import SamplePlot
 from PyFoam.Applications.TimelinePlot import TimelinePlot
 from PyFoam.Applications.Decomposer import Decomposer
 from PyFoam.Basics.Data2DStatistics import Data2DStatistics
+from PyFoam.Basics.ParallelRemover import ParallelRemover
 
 callbackMethods=[]
 
@@ -212,7 +213,9 @@ class CTestRun(object):
         if path.exists(self.caseDir):
             if self.removeOldCase:
                 self.warn("Removing old case",self.caseDir)
-                shutil.rmtree(self.caseDir)
+                remover=ParallelRemover()
+                remover.add(self.caseDir)
+                remover.run()
             elif self.doClone:
                 self.fatalFail(self.caseDir,"already existing")
             else:
@@ -62,6 +62,7 @@ _defaults={
     },
     "Execution":{
     "controlDictRestoreWait":"60.",
+    "logFlushInterval":"1.",
     },
     "CaseBuilder":{
     "descriptionPath": eval('["'+path.curdir+'","'+path.join(userDirectory(),"caseBuilderDescriptions")+'","'+path.join(globalDirectory(),"caseBuilderDescriptions")+'"]'),
@@ -18,6 +18,7 @@ from PyFoam.RunDictionary.ParameterFile import ParameterFile
 from PyFoam.Error import warning
 from PyFoam.Basics.GeneralPlotTimelines import allPlots
 from PyFoam.Basics.TimeLineCollection import allLines
+from PyFoam.Basics.CopyOnWriteDict import plainCopy
 
 from Hardcoded import userName
 
@@ -153,7 +154,8 @@ class FoamAnswerer(object):
 
     def runnerData(self):
         """@return: the data the runner collected so far"""
-        return self._master.data
+        # XMLRPC only knows ordinary dictionaries
+        return plainCopy(self._master.data)
     
     def lastLogLineSeen(self):
         """@return: the time at which the last log-line was seen"""
@@ -355,6 +357,13 @@ class FoamAnswerer(object):
         """Get all the data for the plots"""
         return allLines().prepareForTransfer()
 
+    def getPlotDataChanges(self,seen):
+        """Get only the data for the plots that changed since the last call
+        @param seen: dictionary with the line numbers as keys and a list
+        with the generation and the number of times the caller already has
+        (an empty dictionary gets everything)"""
+        return allLines().prepareChangesForTransfer(seen)
+
     def controlDictUnmodified(self):
         """Checks whether there is a pending change to the controlDict"""
         return self._master.controlDict == None
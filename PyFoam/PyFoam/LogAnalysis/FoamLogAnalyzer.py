@@ -9,7 +9,9 @@ from PyFoam.Basics.ProgressOutput import ProgressOutput
 
 from sys import stdout
 
-from copy import deepcopy
+from PyFoam.Basics.CopyOnWriteDict import CopyOnWriteDict
+
+import re
 
 class FoamLogAnalyzer(object):
     """Base class for all analyzers
@@ -22,6 +24,8 @@ class FoamLogAnalyzer(object):
         @param progress: Print time progress on console?
         """
         self.analyzers={}
+        self.dispatch=None
+        self.useAnchors=True
         self.time=""
         self.oDir=""
         self.line=LineReader()
@@ -76,8 +80,9 @@ class FoamLogAnalyzer(object):
             data=self.collectData()
             for listener in self.timeListeners:
                 try:
-                    # make sure everyone gets a separate copy
-                    listener.setDataSet(deepcopy(data))
+                    # everyone gets a separate view. The data is only
+                    # copied if the listener modifies it
+                    listener.setDataSet(CopyOnWriteDict(data))
                 except AttributeError:
                     # seems that the listener doesn't want the data
                     pass
@@ -118,11 +123,63 @@ class FoamLogAnalyzer(object):
         
         obj.setParent(self)
         self.analyzers[name]=obj
+        self.dispatch=None
+
+    def buildDispatch(self):
+        """Builds the list with the analyzers and the strings that a line
+        has to contain to be interesting for them (anchors) and a regular
+        expression that finds all the anchors in a line in one pass. Is
+        rebuilt when an analyzer is added. Has to be called by hand if the
+        regular expression of an analyzer is changed after the analysis
+        started"""
+        self.dispatch=[(self.analyzers[nm],self.analyzers[nm].getAnchor()) for nm in self.analyzers]
+        self.dispatchCache={}
+
+        anchors=list(set([anchor for a,anchor in self.dispatch if anchor!=None]))
+        # longer anchors first: at every position the longest anchor is found
+        anchors.sort(key=len,reverse=True)
+        if len(anchors)>0:
+            self.anchorExp=re.compile("(?=(%s))" % "|".join([re.escape(a) for a in anchors]))
+        else:
+            self.anchorExp=None
+
+        # anchors that are part of longer anchors are not found by the
+        # expression if they start at the same position
+        self.subAnchors={}
+        for a in anchors:
+            sub=[b for b in anchors if b!=a and a.find(b)>=0]
+            if len(sub)>0:
+                self.subAnchors[a]=sub
 
     def analyzeLine(self,line):
-        """Calls all the anlyzers for a line"""
-        for nm in self.analyzers:
-            self.analyzers[nm].doAnalysis(line)
+        """Calls the anlyzers for a line. Analyzers whose anchor is not in
+        the line are skipped (their regular expression can't match)"""
+        if not self.useAnchors:
+            for nm in self.analyzers:
+                self.analyzers[nm].doAnalysis(line)
+            return
+
+        if self.dispatch==None:
+            self.buildDispatch()
+
+        if self.anchorExp:
+            found=set([m.group(1) for m in self.anchorExp.finditer(line)])
+            if self.subAnchors:
+                for a in list(found):
+                    found.update(self.subAnchors.get(a,[]))
+            found=frozenset(found)
+        else:
+            found=frozenset()
+
+        try:
+            todo=self.dispatchCache[found]
+        except KeyError:
+            todo=[a for a,anchor in self.dispatch if anchor==None or anchor in found]
+            if len(self.dispatchCache)<1000:
+                self.dispatchCache[found]=todo
+
+        for a in todo:
+            a.doAnalysis(line)
 
     def analyze(self,fh):
         """Analyzes a file (one line at a time)
@@ -5,6 +5,48 @@ from LogLineAnalyzer import LogLineAnalyzer
 from PyFoam.Basics.OutFileCollection import OutFileCollection
 from PyFoam.Basics.TimeLineCollection import TimeLineCollection
 
+import re,sre_parse,sre_constants
+
+def literalAnchor(exp):
+    """Find the longest string that every match of a regular expression
+    has to contain. Only the top level of the expression and groups are
+    searched
+
+    @param exp: a compiled regular expression
+    @return: the string. None if there is no such string"""
+
+    if exp.flags & (re.IGNORECASE|re.LOCALE):
+        return None
+    try:
+        parsed=sre_parse.parse(exp.pattern,exp.flags)
+    except sre_constants.error:
+        return None
+    if parsed.pattern.flags & (re.IGNORECASE|re.LOCALE):
+        return None
+
+    runs=[]
+
+    def collect(seq):
+        current=""
+        for op,av in seq:
+            if op==sre_constants.LITERAL and av<128:
+                current+=chr(av)
+                continue
+            runs.append(current)
+            current=""
+            if op==sre_constants.SUBPATTERN:
+                # the sub-expression is always the last element
+                collect(av[-1])
+        runs.append(current)
+
+    collect(parsed)
+
+    anchor=max(runs,key=len)
+    if anchor=="":
+        return None
+    else:
+        return anchor
+
 class GeneralLineAnalyzer(LogLineAnalyzer):
     """Base class for analyzers that write data to files and store time-lines
 
@@ -50,6 +92,15 @@ class GeneralLineAnalyzer(LogLineAnalyzer):
         self.didProgress=False
         self.progressTemplate=progressTemplate
         
+    def getAnchor(self):
+        """The anchor is taken from the regular expression. Subclasses that
+        implement their own doAnalysis don't have one"""
+        if self.doAnalysis.im_func is not GeneralLineAnalyzer.doAnalysis.im_func:
+            return None
+        if getattr(self,"exp",None)==None:
+            return None
+        return literalAnchor(self.exp)
+
     def getCurrentData(self):
         if self.lines:
             return self.lines.getLatestData()
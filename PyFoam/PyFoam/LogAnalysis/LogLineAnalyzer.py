@@ -20,6 +20,14 @@ class LogLineAnalyzer(object):
         This method carries the main functionality in the sub-classes"""
         pass
 
+    def getAnchor(self):
+        """A string that has to be part of every line that doAnalysis
+        can do something with. Lines that don't contain it are not passed
+        to the analyzer
+
+        @return: the string. None if every line has to be analyzed"""
+        return None
+
     def timeChanged(self):
         """The value of the time has changed in the Log-file
         
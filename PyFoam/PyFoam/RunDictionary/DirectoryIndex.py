@@ -0,0 +1,179 @@
+"""Index of the contents of case directories (time directories,
+processor directories and mesh regions). The information is kept
+between instances of SolutionDirectory and a directory is only scanned
+again if its modification time changes"""
+
+from os import listdir,stat,path
+import re
+from time import time
+
+# directories that were modified less than this many seconds before
+# they were scanned are scanned again (changes in the same tick of the
+# file-system clock would otherwise go unnoticed). The smaller interval
+# is used for file-systems with times that are more precise than seconds
+# (the clock of the kernel may still be coarser than the stored times)
+racyInterval=1.
+fineRacyInterval=0.05
+
+_index={}
+_regions={}
+
+_processorName=re.compile("processor([0-9]+)")
+
+def clearIndex():
+    """Forget everything about all directories"""
+    _index.clear()
+    _regions.clear()
+
+def statKey(name):
+    """@return: the data of a directory that changes when entries are
+    added or removed"""
+    s=stat(name)
+    return (s.st_mtime,s.st_ctime,s.st_nlink,s.st_ino)
+
+def isRacy(mtime,scanned):
+    """@return: True if a directory that was modified at mtime could have
+    been modified again after it was scanned without its modification
+    time changing"""
+    if mtime==int(mtime):
+        return mtime>=scanned-racyInterval
+    else:
+        return mtime>=scanned-fineRacyInterval
+
+def procNumber(name):
+    """@return: key for sorting the processor directories by their number"""
+    return (int(_processorName.match(name).group(1)),name)
+
+class DirectoryListing(object):
+    """The names in a directory and the times and processor directories
+    among them"""
+
+    def __init__(self,name):
+        """@param name: the directory"""
+        self.name=name
+        self.key=None
+        self.scanned=0
+        self.names=frozenset()
+        self.values={}
+        self.times=[]
+        self.processors=[]
+        # incremented every time the contents change
+        self.version=0
+
+    def isCurrent(self):
+        """@return: True if the directory did not change since the last scan"""
+        if self.key==None:
+            return False
+        try:
+            key=statKey(self.name)
+        except OSError:
+            return False
+        return key==self.key and not isRacy(key[0],self.scanned)
+
+    def update(self,force=False):
+        """Rescan the directory if it changed. Only the names that were
+        added or removed are looked at
+        @param force: scan even if the directory seems unchanged
+        @return: True if the contents changed"""
+
+        if not force and self.isCurrent():
+            return False
+
+        scanned=time()
+        key=statKey(self.name)
+        names=frozenset(listdir(self.name))
+        self.key=key
+        self.scanned=scanned
+
+        added=names-self.names
+        removed=self.names-names
+        if len(added)==0 and len(removed)==0:
+            return False
+        self.names=names
+
+        newTimes=[]
+        for f in added:
+            try:
+                val=float(f)
+                self.values[f]=val
+                newTimes.append(f)
+            except ValueError:
+                if _processorName.match(f):
+                    self.processors.append(f)
+        newTimes.sort(key=float)
+
+        removedTimes=False
+        for f in removed:
+            if f in self.values:
+                del self.values[f]
+                removedTimes=True
+            elif _processorName.match(f):
+                self.processors.remove(f)
+
+        if removedTimes:
+            self.times=[t for t in self.times if t in self.values]
+
+        if len(newTimes)>0:
+            if len(self.times)==0 or self.values[self.times[-1]]<=self.values[newTimes[0]]:
+                # the usual case: new times were written at the end
+                self.times+=newTimes
+            else:
+                self.times=sorted(self.times+newTimes,key=float)
+
+        self.processors.sort(key=procNumber)
+        self.version+=1
+
+        return True
+
+def getListing(name,force=False):
+    """Get the up-to-date contents of a directory
+    @param name: the directory
+    @param force: scan the directory even if it seems unchanged
+    @rtype: L{DirectoryListing}"""
+
+    name=path.abspath(name)
+    try:
+        lst=_index[name]
+    except KeyError:
+        lst=DirectoryListing(name)
+        _index[name]=lst
+    lst.update(force=force)
+    return lst
+
+def getRegions(constantDir):
+    """Get the mesh regions (sub-directories of the constant directory
+    that have a polyMesh)
+    @param constantDir: the constant-directory of the case
+    @return: sorted list with the names of the regions"""
+
+    constantDir=path.abspath(constantDir)
+    if not path.isdir(constantDir):
+        return []
+    lst=getListing(constantDir)
+
+    subKeys=[]
+    for d in lst.names:
+        try:
+            subKeys.append((d,statKey(path.join(constantDir,d))))
+        except OSError:
+            pass
+    key=(lst.key,frozenset(subKeys))
+
+    try:
+        oldKey,scanned,regions=_regions[constantDir]
+        racy=[d for d,k in subKeys if isRacy(k[0],scanned)]
+        if oldKey==key and len(racy)==0 and not isRacy(lst.key[0],scanned):
+            return regions
+    except KeyError:
+        pass
+
+    scanned=time()
+    regions=[]
+    for d in lst.names:
+        if path.isdir(path.join(constantDir,d)):
+            if path.exists(path.join(constantDir,d,"polyMesh")):
+                regions.append(d)
+    regions.sort()
+
+    _regions[constantDir]=(key,scanned,regions)
+    return regions
@@ -87,10 +87,23 @@ class FileBasis(Utilities):
         if content!=None:
             self.content=content
         if self.content!=None:
+            self.unshareFile()
             self.openFile(keepContent=True,mode="w")
             self.fh.write(str(self))
             self.closeFile()
 
+    def unshareFile(self):
+        """If the file is hardlinked (for instance by a cloned case) then
+        remove this name so that writing does not change the other cases"""
+        fName=self.name
+        if self.zipped:
+            fName+=".gz"
+        try:
+            if os.stat(fName).st_nlink>1:
+                os.remove(fName)
+        except OSError:
+            pass
+
     def writeFileAs(self,name):
         """ Writes a copy of the file. Extends with .gz if the original
         is zipped
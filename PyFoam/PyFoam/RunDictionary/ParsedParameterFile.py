@@ -5,12 +5,15 @@ from FileBasis import FileBasisBackup
 from PyFoam.Basics.PlyParser import PlyParser
 from PyFoam.Basics.FoamFileGenerator import FoamFileGenerator
 
-from PyFoam.Basics.DataStructures import Vector,Field,Dimension,DictProxy,TupleProxy,Tensor,SymmTensor,Unparsed,UnparsedList,Codestream,DictRedirection
+from PyFoam.Basics.DataStructures import Vector,Field,Dimension,DictProxy,TupleProxy,Tensor,SymmTensor,Unparsed,UnparsedList,Codestream,DictRedirection,LazyDictProxy
+from PyFoam.Basics.FoamFileIndex import indexDictionary,FoamFileIndexError
+from PyFoam.Basics.BinaryFormat import archTypes,typeFromName,decodeList
 
 from PyFoam.Error import error,warning,FatalErrorPyFoamException
 
 from os import path
 from copy import deepcopy
+import string,re
 
 class ParsedParameterFile(FileBasisBackup):
     """ Parameterfile whose complete representation is read into
@@ -24,6 +27,7 @@ class ParsedParameterFile(FileBasisBackup):
                  listDict=False,
                  listDictWithHeader=False,
                  listLengthUnparsed=None,
+                 listLengthNumpy=None,
                  preserveComments=True,
                  noHeader=False,
                  binaryMode=False,
@@ -32,6 +36,7 @@ class ParsedParameterFile(FileBasisBackup):
                  dontRead=False,
                  noVectorOrTensor=False,
                  createZipped=True,
+                 lazy=False,
                  longListOutputThreshold=20):
         """@param name: The name of the parameter file
         @param backup: create a backup-copy of the file
@@ -39,8 +44,10 @@ class ParsedParameterFile(FileBasisBackup):
         @param listDict: the file only contains a list
         @param listDictWithHeader: the file only contains a list and a header
         @param listLengthUnparsed: Lists longer than that length are not parsed
+        @param listLengthNumpy: Lists of numbers, vectors or tensors that are
+        longer than that are read into a numpy-array (needs numpy)
         @param binaryMode: Parse long lists in binary mode (to be overridden by
-        the settings in the header
+        the settings in the header). Binary lists are read into numpy-arrays
         @param noHeader: don't expect a header
         @param noBody: don't read the body of the file (only the header)
         @param doMacroExpansion: expand #include and $var
@@ -49,6 +56,10 @@ class ParsedParameterFile(FileBasisBackup):
         @param dontRead: Do not read the file during construction
         @param longListOutputThreshold: Lists that are longer than this are
         prefixed with a length
+        @param lazy: Only find the positions of the entries when reading the
+        file. Entries are parsed when they are accessed. Entries that were
+        never accessed are written back unchanged. Not used for binary files,
+        lists and if macros are expanded
         """
 
         self.noHeader=noHeader
@@ -62,6 +73,7 @@ class ParsedParameterFile(FileBasisBackup):
         self.listDict=listDict
         self.listDictWithHeader=listDictWithHeader
         self.listLengthUnparsed=listLengthUnparsed
+        self.listLengthNumpy=listLengthNumpy
         self.doMacros=doMacroExpansion
         self.preserveComments=preserveComments
         self.noVectorOrTensor=noVectorOrTensor        
@@ -69,12 +81,21 @@ class ParsedParameterFile(FileBasisBackup):
         self.content=None
         self.longListOutputThreshold=longListOutputThreshold
         self.binaryMode=binaryMode
+        self.lazy=lazy
         
         if not dontRead:
             self.readFile()
 
     def parse(self,content):
         """Constructs a representation of the file"""
+        if self.lazy and not (self.doMacros or self.binaryMode or self.noBody or
+                              self.boundaryDict or self.listDict or self.listDictWithHeader):
+            try:
+                return self.parseLazy(content)
+            except FoamFileIndexError:
+                # Structure too complicated for the index. Parse everything
+                pass
+            
         parser=FoamFileParser(content,
                               debug=self.debug,
                               fName=self.name,
@@ -82,6 +103,7 @@ class ParsedParameterFile(FileBasisBackup):
                               listDict=self.listDict,
                               listDictWithHeader=self.listDictWithHeader,
                               listLengthUnparsed=self.listLengthUnparsed,
+                              listLengthNumpy=self.listLengthNumpy,
                               noHeader=self.noHeader,
                               noBody=self.noBody,
                               preserveComments=self.preserveComments,
@@ -93,6 +115,39 @@ class ParsedParameterFile(FileBasisBackup):
         self.header=parser.getHeader()
         return self.content
 
+    def parseLazy(self,content):
+        """Only parse the header. The body is a LazyDictProxy that parses
+        the entries when they are needed
+        @return: the content"""
+
+        start=0
+        header=None
+        if not self.noHeader:
+            entries=indexDictionary(content,maxEntries=1)
+            if len(entries)==0 or entries[0].key!="FoamFile" or not entries[0].isDict():
+                raise FoamFileIndexError("No header found")
+            header=FoamFileParser(content[entries[0].keyStart:entries[0].end],
+                                  debug=self.debug,
+                                  fName=self.name,
+                                  noBody=True).getHeader()
+            if header.get("format","ascii")!="ascii":
+                raise FoamFileIndexError("Can't read "+str(header["format"])+" lazily")
+            start=entries[0].end
+
+        def parseEntry(text):
+            return FoamFileParser(text,
+                                  debug=self.debug,
+                                  fName=self.name,
+                                  noHeader=True,
+                                  listLengthUnparsed=self.listLengthUnparsed,
+                                  listLengthNumpy=self.listLengthNumpy,
+                                  preserveComments=self.preserveComments,
+                                  noVectorOrTensor=self.noVectorOrTensor).getData()
+
+        self.content=LazyDictProxy(content,start,len(content),parseEntry)
+        self.header=header
+        return self.content
+        
     def __contains__(self,key):
         return key in self.content
 
@@ -173,6 +228,7 @@ class FoamFileParser(PlyParser):
                  listDict=False,
                  listDictWithHeader=False,
                  listLengthUnparsed=None,
+                 listLengthNumpy=None,
                  binaryMode=False,
                  duplicateCheck=False,
                  noVectorOrTensor=False,
@@ -181,15 +237,23 @@ class FoamFileParser(PlyParser):
         @param fName: Name of the actual file (if any)
         @param debug: output debug information during parsing
         @param noHeader: switch that turns off the parsing of the header
+        @param binaryMode: Read prefixed lists as binary data (if there is
+        a header its format-entry decides)
+        @param listLengthUnparsed: Lists longer than that length are not parsed
+        @param listLengthNumpy: Lists of numbers, vectors or tensors that are
+        longer than that are read into a numpy-array
         @param duplicateCheck: Check for duplicates in dictionaries
         @param duplicateFail: Fail if a duplicate is discovered"""
 
         self.binaryMode=binaryMode
+        self.binaryTypes=archTypes()
+        self.fileClass=None
         self.fName=fName
         self.data=None
         self.header=None
         self.debug=debug
         self.listLengthUnparsed=listLengthUnparsed
+        self.listLengthNumpy=listLengthNumpy
         self.doMacros=doMacroExpansion
         self.preserveComments=preserveComments
         self.preserveNewLines=preserveNewlines
@@ -197,16 +261,8 @@ class FoamFileParser(PlyParser):
         self.duplicateFail=duplicateFail
         self.noVectorOrTensor=noVectorOrTensor        
 
-        # Make sure that the first comment is discarded
-        self.collectDecorations=False
-        self.inputMode=inputModes.merge
-        
-        self._decorationBuffer=""
-        
         startCnt=0
         
-        self.dictStack=[DictProxy()]
-        
         if noBody:
             self.start='noBody'
             startCnt+=1
@@ -214,13 +270,10 @@ class FoamFileParser(PlyParser):
         if noHeader:
             self.start='noHeader'
             startCnt+=1
-            self.collectDecorations=True
             
         if listDict:
             self.start='pureList'
             startCnt+=1
-            self.dictStack=[]
-            self.collectDecorations=True
 
         if listDictWithHeader:
             self.start='pureListWithHeader'
@@ -238,9 +291,35 @@ class FoamFileParser(PlyParser):
         #sys.setrecursionlimit(50000)
         #print sys.getrecursionlimit()
 
+        self.header,self.data=self.parse(content)
+
+    def resetState(self):
+        """Reset everything that is modified during a parse. The lexer and
+        the parser are shared with other instances so nothing may be left
+        over from a previous parse"""
+
+        start=getattr(self,"start",None)
+
+        # Make sure that the first comment is discarded
+        self.collectDecorations=start in ['noHeader','pureList']
+        self.inputMode=inputModes.merge
+        
+        self._decorationBuffer=""
+        self._binaryList=None
+        
+        if start=='pureList':
+            self.dictStack=[]
+        else:
+            self.dictStack=[DictProxy()]
+
         self.emptyCnt=0
 
-        self.header,self.data=self.parse(content)
+    def parse(self,content):
+        """Parse the content starting from a clean state
+        @param content: String that is to be parsed
+        @return: tuple with the header and the data"""
+        self.resetState()
+        return PlyParser.parse(self,content)
 
     def __contains__(self,key):
         return key in self.data
@@ -336,6 +415,133 @@ class FoamFileParser(PlyParser):
             return orig[1::2]
         else:
             return orig
+
+    unparsedListEnd=re.compile(r'[^()]*(?:\([^()]*\)[^()]*)*\)')
+    """Finds the end of a list that contains no lists nested deeper than
+    one level"""
+
+    numpyListChars=' \t\n0123456789.-+e()'
+    """Characters that may appear in a list that is read with numpy"""
+
+    bracketsToSpace=string.maketrans("()","  ")
+    
+    def unparsedIsNumpyList(self,data):
+        """Checks whether the start of data looks like a list that can be
+        read by numpyList. Stops at the end of the list"""
+        level=0
+        for c in data:
+            if c not in self.numpyListChars:
+                return False
+            elif c=="(":
+                level+=1
+            elif c==")":
+                level-=1
+                if level<0:
+                    break
+        return True
+
+    def binaryListType(self,lngth,name,data,start):
+        """Find out the type of the elements of a binary list. Uses the
+        type name in front of the list or the class of the file. If these
+        don't help the type is guessed from the position of the closing bracket.
+        Lists in binary files may also be ASCII (word lists, the patches of
+        a boundary file). Only lists with a List<...> type in front are
+        always binary
+        @param lngth: number of elements in the list
+        @param name: the symbol in front of the length (for instance List<vector>)
+        @param data: the string that is parsed
+        @param start: position of the first byte after the opening bracket
+        @return: the numpy-type, the number of components and the size in
+        bytes. None if this is not a binary list"""
+        
+        candidates=[]
+        forced=False
+        if type(name)==str and name.find("List<")==0:
+            tp=typeFromName(name)
+            if tp==None:
+                # not a list of primitive types
+                return None
+            candidates.append(tp)
+            forced=True
+        else:
+            tp=typeFromName(self.fileClass)
+            if tp:
+                candidates.append(tp)
+            candidates+=[("scalar",1),("scalar",3),("label",1),
+                         ("scalar",6),("scalar",9),("scalar",2)]
+
+        for tp,components in candidates:
+            if tp=="label":
+                dtype=self.binaryTypes[0]
+            else:
+                dtype=self.binaryTypes[1]
+            size=lngth*components*int(dtype[2:])
+            if data[start+size:start+size+1]!=")":
+                continue
+            if not forced and self.looksLikeText(data[max(start,start+size-8):start+size]):
+                # the bracket belongs to text. For instance the words of
+                # 1(wall) have the size of a label. Or the bracket is from
+                # a word list after this list
+                continue
+            return dtype,components,size
+
+        if forced:
+            raise PyFoamParserError("Could not find the end of the binary list "+name+" of length "+str(lngth)+" at position "+str(start))
+
+        return None
+
+    def looksLikeText(self,data):
+        """Checks whether data is text (tokens of an ASCII list) instead
+        of binary numbers. The last number of a binary list almost always
+        contains bytes that are not printable (zeros for instance)"""
+        return data.translate(None,string.printable)==""
+    
+    def isNumpyLength(self,lngth):
+        """Is a list of this length to be read with numpy"""
+        if self.listLengthNumpy==None or lngth<self.listLengthNumpy:
+            return False
+        if self.listLengthUnparsed!=None and lngth>=self.listLengthUnparsed:
+            return False
+        return True
+    
+    def numpyList(self,lngth,data):
+        """Reads the content of a list with numpy in one go
+        @param lngth: the number of elements the list should have
+        @param data: the unparsed content of the list (without the brackets)
+        @return: numpy-array with lngth rows. None if the data is not a
+        list of numbers or a list of vectors/tensors"""
+
+        import numpy
+
+        opening=data.count("(")
+        if opening not in [0,lngth] or data.count(")")!=opening:
+            return None
+        if opening>0 and data.lstrip()[0]!="(":
+            # prefixed sub-lists
+            return None
+
+        if data.translate(None," \t\n0123456789-+()")=="":
+            dtype=int
+        else:
+            dtype=float
+
+        if opening>0:
+            data=data.translate(self.bracketsToSpace)
+
+        values=numpy.fromstring(data,dtype=dtype,sep=" ")
+
+        if opening==0:
+            if len(values)!=lngth:
+                return None
+        else:
+            if lngth==0 or len(values)%lngth!=0:
+                return None
+            width=len(values)/lngth
+            if width not in [3,6,9]:
+                return None
+            values=values.reshape((lngth,width))
+
+        return values
         
     tokens = (
         'NAME',
@@ -561,9 +767,10 @@ class FoamFileParser(PlyParser):
     def p_header(self,p):
         'header : FOAMFILE dictionary'
         p[0] = p[2]
+        self.fileClass=p[0].get("class",None)
         if p[0]["format"]=="binary":
             self.binaryMode=True
-            raise FatalErrorPyFoamException("Can not parse binary files. It is not implemented")
+            self.binaryTypes=archTypes(p[0].get("arch",None))
         elif p[0]["format"]=="ascii":
             self.binaryMode=False
         else:
@@ -705,11 +912,36 @@ class FoamFileParser(PlyParser):
         
     def p_prelist_seen(self,p):
         '''prelist_seen : '''
-        if self.listLengthUnparsed!=None:
-            if int(p[-1])>=self.listLengthUnparsed:
+        if self.binaryMode and int(p[-1])>0:
+            self._binaryList=self.binaryListType(int(p[-1]),
+                                                 p[-2],
+                                                 p.lexer.lexdata,
+                                                 p.lexer.lexpos)
+            if self._binaryList:
+                # skip the binary data
                 p.lexer.begin('unparsed')
                 p.lexer.level=0
                 p.lexer.code_start = p.lexer.lexpos
+                p.lexer.lexpos+=self._binaryList[2]
+                return
+            
+        skipParsing=False
+        if self.listLengthUnparsed!=None:
+            if int(p[-1])>=self.listLengthUnparsed:
+                skipParsing=True
+        if self.isNumpyLength(int(p[-1])):
+            start=p.lexer.lexpos
+            if self.unparsedIsNumpyList(p.lexer.lexdata[start:start+200]):
+                skipParsing=True
+        if skipParsing:
+            p.lexer.begin('unparsed')
+            p.lexer.level=0
+            p.lexer.code_start = p.lexer.lexpos
+            m=self.unparsedListEnd.match(p.lexer.lexdata,p.lexer.lexpos)
+            if m:
+                # jump to the closing bracket instead of going through
+                # the list character by character
+                p.lexer.lexpos=m.end()-1
 
     def p_codestream(self,p):
         '''codestream : codeSeen CODESTART CODESTREAMCHUNK CODEEND '''
@@ -725,7 +957,20 @@ class FoamFileParser(PlyParser):
         '''prelist : integer prelist_seen '(' itemlist ')'
                    | integer prelist_seen '(' unparsed ')' '''
         if type(p[4])==Unparsed:
-            p[0] = UnparsedList(int(p[1]),p[4].data)
+            if self._binaryList:
+                dtype,components,size=self._binaryList
+                self._binaryList=None
+                p[0] = decodeList(p[4].data,int(p[1]),dtype,components)
+            elif self.isNumpyLength(int(p[1])):
+                p[0] = self.numpyList(int(p[1]),p[4].data)
+                if p[0] is None:
+                    # not a list numpy can handle. Parse it the usual way
+                    p[0] = self.condenseAllPreFixLists(
+                        FoamStringParser("("+p[4].data+")",
+                                         listDict=True,
+                                         noVectorOrTensor=self.noVectorOrTensor).getData())
+            else:
+                p[0] = UnparsedList(int(p[1]),p[4].data)
         else:
             p[0] = self.condenseAllPreFixLists(p[4])
 
@@ -956,9 +1201,12 @@ class FoamStringParser(FoamFileParser):
                  duplicateCheck=False,
                  listDict=False,
                  doMacroExpansion=False,
+                 listLengthNumpy=None,
                  duplicateFail=False):
         """@param content: the string to be parsed
-        @param debug: output debug information during parsing"""
+        @param debug: output debug information during parsing
+        @param listLengthNumpy: Lists of numbers, vectors or tensors that are
+        longer than that are read into a numpy-array"""
 
         FoamFileParser.__init__(self,
                                 content,
@@ -966,6 +1214,7 @@ class FoamStringParser(FoamFileParser):
                                 noHeader=not listDict,
                                 boundaryDict=False,
                                 listDict=listDict,
+                                listLengthNumpy=listLengthNumpy,
                                 noVectorOrTensor=noVectorOrTensor,
                                 duplicateCheck=duplicateCheck,
                                 doMacroExpansion=doMacroExpansion,
@@ -1,12 +1,13 @@
 #  ICE Revision: $Id:$
 """Working with a directory of samples"""
 
-from os import path,listdir
+from os import path,listdir,stat
 from PyFoam.Error import error
 import math
 import re
 
 from PyFoam.Basics.SpreadsheetData import SpreadsheetData
+from PyFoam.Basics.DataFileCache import cachedDataFile
 
 class SampleDirectory(object):
     """A directory of sampled times"""
@@ -39,22 +40,27 @@ class SampleDirectory(object):
 
         self.times.sort(self.sorttimes)
 
+        self.cache={}
+
     def __len__(self):
         return len(self.times)
 
     def __iter__(self):
         for t in self.times:
-            yield SampleTime(self.dir,
-                             t,
-                             prefixes=self.prefixes,
-                             postfixes=self.postfixes)
+            yield self[t]
 
     def __getitem__(self,time):
         if time in self:
-            return SampleTime(self.dir,
-                              time,
-                              prefixes=self.prefixes,
-                              postfixes=self.postfixes)
+            # the index of the files is only built again if the
+            # directory changed
+            mtime=stat(path.join(self.dir,time)).st_mtime
+            if time not in self.cache or self.cache[time][0]!=mtime:
+                self.cache[time]=(mtime,
+                                  SampleTime(self.dir,
+                                             time,
+                                             prefixes=self.prefixes,
+                                             postfixes=self.postfixes))
+            return self.cache[time][1]
         else:
             raise KeyError,time
 
@@ -116,10 +122,11 @@ class SampleDirectory(object):
         sets=[]
 
         for t in time:
+            st=self[t]
             for l in line:
                 for v in value:
                     try:
-                        d=self[t][(l,v)]
+                        d=st[(l,v)]
                         d.note=note
                         sets.append(d)
                     except KeyError:
@@ -150,6 +157,10 @@ class SampleTime(object):
         self.postfixes=postfixes
 
         self.__valueNames=None
+        self.__extracted={}
+
+        # the file for every combination of line and value
+        self.files={}
 
         for f in listdir(self.dir):
             if f[0]=='.' or f[-1]=='~' or f.find(".")<0:
@@ -161,6 +172,8 @@ class SampleTime(object):
             for v in vals:
                 if v not in self.values:
                     self.values.append(v)
+                if (nm,v) not in self.files:
+                    self.files[(nm,v)]=f
 
         self.lines.sort()
         self.values.sort()
@@ -174,6 +187,11 @@ class SampleTime(object):
     def extractValues(self,fName):
         """Extracts the names of the contained Values from a filename"""
 
+        if fName in self.__extracted:
+            self.__valueNames=self.__extracted[fName]
+            return self.__valueNames
+        key=fName
+
         def preUnder(m):
             return "&"+m.group(1)+m.group(2)
         def postUnder(m):
@@ -193,57 +211,62 @@ class SampleTime(object):
                 self.__valueNames.append(t.replace("&","_"))
         except IndexError:
             pass
-            
-        return self.__valueNames       
+
+        self.__extracted[key]=self.__valueNames
+
+        return self.__valueNames
 
     def __getitem__(self,key):
         """Get the data for a value on a specific line
         @param key: A tuple with the line-name and the value-name
         @returns: A SampleData-object"""
 
-        if key in self.cache:
-            return self.cache[key]
-        
         line,val=key
         if line not in self.lines or val not in self.values:
             raise KeyError,key
 
-        fName=None
+        try:
+            fName=self.files[key]
+        except KeyError:
+            error("Can't find a file for the line",line,"and the value",val,"in the directory",self.dir)
 
-        for f in listdir(self.dir):
-            if line==self.extractLine(f) and val in self.extractValues(f):
-                fName=f
-                break
+        entry=cachedDataFile(path.join(self.dir,fName))
+        # files may be rewritten without changing the directory. Only
+        # use the cached data if the file is unchanged
+        if key in self.cache and self.cache[key][0]==entry["key"]:
+            return self.cache[key][1]
+
+        data=entry["data"]
+        if len(data)==0:
+            raise KeyError(key)
+        if entry["lengths"] is None:
+            length=data.shape[1]
+        else:
+            length=entry["lengths"][0]
+        vector,index=self.determineIndex(fName,val,list(data[0,:length]))
 
-        if fName==None:
-            error("Can't find a file for the line",line,"and the value",val,"in the directory",self.dir)
+        if vector:
+            last=index+3
+        else:
+            last=index+1
+        if entry["lengths"] is not None and entry["lengths"].min()<last:
+            # not all the lines have the value
+            raise KeyError(key)
 
-        first=True
-        col0=[]
-        data=[]
-        
-        for l in open(path.join(self.dir,fName)).readlines():
-            tmp=l.split()
-            if first:
-                first=False
-                vector,index=self.determineIndex(fName,val,tmp)
-
-            col0.append(float(tmp[0]))
-            try:
-                if vector:
-                    data.append(tuple(map(float,tmp[index:index+3])))
-                else:
-                    data.append(float(tmp[index]))
-            except IndexError:
-                raise KeyError(key)
-
-        self.cache[key]=SampleData(fName=path.join(self.dir,fName),
-                                   name=val,
-                                   index=index,
-                                   col0=col0,
-                                   data=data)
-
-        return self.cache[key]
+        # no copies: the data is shared with the cache
+        if vector:
+            values=data[:,index:last]
+        else:
+            values=data[:,index]
+
+        self.cache[key]=(entry["key"],
+                         SampleData(fName=path.join(self.dir,fName),
+                                    name=val,
+                                    index=index,
+                                    col0=data[:,0],
+                                    data=values))
+
+        return self.cache[key][1]
     
     def determineIndex(self,fName,vName,data):
         """Determines the index of the data from the filename and a dataset
@@ -278,7 +301,8 @@ class SampleData(object):
         @param name: Name of the value
         @param index: Index of the data in the file
         @param col0: Values that identify the data (the location)
-        @param data: The actual data"""
+        @param data: The actual data (an array with one row per location
+        for vectors)"""
         
         self.file=fName
         self.col0=col0
@@ -305,39 +329,38 @@ class SampleData(object):
     
     def isVector(self):
         """Is this vector or scalar data?"""
-        if type(self.data[0])==tuple:
-            return True
-        else:
-            return False
+        import numpy
+        return len(numpy.shape(self.data))>1
 
     def range(self,component=None):
         """Range of the data"""
         data=self.component(component)
         
-        return (min(data),max(data))
+        return (float(data.min()),float(data.max()))
 
     def domain(self):
         """Range of the data domain"""
-        return (min(self.col0),max(self.col0))
+        import numpy
+        col0=numpy.asarray(self.col0)
+
+        return (float(col0.min()),float(col0.max()))
     
     def component(self,component=None):
         """Return the data as a number of single scalars.
         @param component: If None for vectors the absolute value is taken.
         else the number of the component"""
+        import numpy
 
+        data=numpy.asarray(self.data)
         if self.isVector():
-            data=[]
             if component==None:
-                for d in self.data:
-                    data.append(math.sqrt(d[0]*d[0]+d[1]*d[1]+d[2]*d[2]))
+                return numpy.sqrt((data*data).sum(axis=1))
             else:
-                if component<0 or component>=len(self.data[0]):
-                    error("Requested component",component,"does not fit the size of the data",len(self.data[0]))
-                for d in self.data:
-                    data.append(d[component])                    
-            return data
+                if component<0 or component>=data.shape[1]:
+                    error("Requested component",component,"does not fit the size of the data",data.shape[1])
+                return data[:,component]
         else:
-            return self.data
+            return data
 
     def __call__(self,
                  scaleX=1.,
@@ -345,22 +368,19 @@ class SampleData(object):
                  offsetData=0,
                  offsetX=0):
         """Return the data as SpreadsheetData-object"""
-        
-        data=[]
-        if self.isVector():
-            for i,c in enumerate(self.col0):
-                data.append([scaleX*c+offsetX]+[scaleData*v+offsetData for v in self.data[i]])
-        else:
-            for i,c in enumerate(self.col0):
-                data.append([scaleX*c+offsetX,scaleData*self.data[i]+offsetData])
+        import numpy
+
+        columns=[scaleX*numpy.asarray(self.col0,dtype=float)+offsetX]
+        data=scaleData*numpy.asarray(self.data,dtype=float)+offsetData
 
         names=["col0"]
         if self.isVector():
             names+=[self.name+"_x",self.name+"_y",self.name+"_z"]
+            columns+=[data[:,i].copy() for i in range(3)]
         else:
             names.append(self.name)
+            columns.append(data)
 
-        return SpreadsheetData(data=data,
+        return SpreadsheetData(columns=columns,
                                names=names,
                                title="%s_t=%s" % (self.line(),self.time()))
-
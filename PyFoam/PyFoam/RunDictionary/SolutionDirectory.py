@@ -3,15 +3,16 @@
 
 from PyFoam.Basics.Utilities import Utilities
 from PyFoam.Basics.BasicFile import BasicFile
-from PyFoam.Error import warning
+from PyFoam.Basics.ParallelRemover import ParallelRemover
+from PyFoam.Error import warning,error
 from PyFoam import configuration as conf
 
 from TimeDirectory import TimeDirectory
 from ParsedParameterFile import ParsedParameterFile,WriteParameterFile
+from DirectoryIndex import getListing,getRegions
 
-from os import listdir,path,mkdir,symlink,stat,getlogin,uname,environ
+from os import listdir,path,mkdir,symlink,getlogin,uname,environ
 from time import asctime
-from stat import ST_CTIME
 import tarfile,fnmatch,glob
 import re,os
 
@@ -49,7 +50,7 @@ class SolutionDirectory(Utilities):
 
         self.parallel=parallel
         
-        self.lastReread=0L
+        self.lastReread=None
         self.reread()
 
         self.dirPrefix=''
@@ -213,45 +214,91 @@ class SolutionDirectory(Utilities):
             if path.exists(path.join(self.name,"processor0",name)):
                 self.essential.append(path.join(self.name,name))
             
-    def cloneCase(self,name,svnRemove=True,followSymlinks=False):
+    # files in the polyMesh-directories that are copied even if the
+    # mesh is linked (because they are often modified)
+    linkExcludes=["boundary"]
+
+    def cloneCase(self,name,svnRemove=True,followSymlinks=False,link=None,jobs=None):
         """create a clone of this case directory. Remove the target directory, if it already exists
 
         @param name: Name of the new case directory
         @param svnRemove: Look for .svn-directories and remove them
         @param followSymlinks: Follow symbolic links instead of just copying them
+        @param link: If 'hardlink' or 'reflink' then the files of the
+        meshes (the polyMesh-directories) are not copied but linked (see
+        L{Utilities.linkfile}). Files that can't be linked and the files
+        in linkExcludes are copied. With hardlinks the original mesh
+        changes if the mesh of the clone is overwritten
+        @param jobs: Number of threads that copy the processor-directories.
+        If None then up to 8
         @rtype: L{SolutionDirectory} or correct subclass
         @return: The target directory"""
 
-        cpOptions="-R"
-        if followSymlinks:
-            cpOptions+=" -L"
-            
+        if link not in [None,"hardlink","reflink"]:
+            error("Unknown link mode",link)
+
+        ignore=[]
+        if svnRemove:
+            ignore.append(".svn")
+
+        def isMesh(f):
+            return path.basename(path.dirname(f))=="polyMesh" and \
+                   path.basename(f) not in self.linkExcludes
+
+        def cloneItems(items):
+            for src,dst in items:
+                self.clonetree(src,dst,
+                               symlinks=not followSymlinks,
+                               ignore=ignore,
+                               link=link,
+                               linkTest=isMesh)
+
         if path.exists(name):
             self.rmtree(name)
         mkdir(name)
+
+        procItems=[]
         if self.parallel:
             for i in range(self.nrProcs()):
+                procItems.append([])
                 mkdir(path.join(name,"processor%d" % i))
-                
+
+        items=[]
         for d in self.essential:
             if d!=None:
                 if self.parallel:
                     pth,fl=path.split(d)
                     if path.exists(path.join(pth,"processor0",fl)):
                         for i in range(self.nrProcs()):
-                            self.copytree(path.join(pth,"processor%d" % i,fl),
-                                          path.join(name,"processor%d" % i),
-                                          symlinks=not followSymlinks)
-                            
-                if path.exists(d):
-                    self.copytree(d,name,symlinks=not followSymlinks)
+                            procItems[i].append((path.join(pth,"processor%d" % i,fl),
+                                                 path.join(name,"processor%d" % i)))
 
-        if svnRemove:
-            self.execute("find "+name+" -name .svn -exec rm -rf {} \\; -prune")
+                if path.exists(d):
+                    items.append((d,name))
+
+        cloneItems(items)
+
+        if jobs==None:
+            jobs=8
+        jobs=min(jobs,len(procItems))
+        if jobs>1:
+            # copying is limited by the file-system, not the processor.
+            # So threads are sufficient
+            from multiprocessing.pool import ThreadPool
+            pool=ThreadPool(jobs)
+            try:
+                pool.map(cloneItems,procItems)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for p in procItems:
+                cloneItems(p)
 
         return self.__class__(name,archive=self.archive)
 
-    def packCase(self,tarname,last=False,exclude=[],additional=[],base=None):
+    def packCase(self,tarname,last=False,exclude=[],additional=[],base=None,
+                 threads=None,since=None,manifest=None):
         """Packs all the important files into a compressed tarfile.
         Uses the essential-list and excludes the .svn-directories.
         Also excludes files ending with ~
@@ -260,7 +307,19 @@ class SolutionDirectory(Utilities):
         @param exclude: List with additional glob filename-patterns to be excluded
         @param additional: List with additional glob filename-patterns
         that are to be added
-        @param base: Different name that is to be used as the baseName for the case inside the tar"""
+        @param base: Different name that is to be used as the baseName for the case inside the tar
+        @param threads: Number of threads that compress the data. If None
+        the number of processors
+        @param since: Manifest-file of a previous archive. Only the files
+        that were added or changed since then are packed (files that
+        were removed are not recorded)
+        @param manifest: Name of a file to which the manifest (all the
+        files that were considered with their modification times and
+        sizes) is written. To be used as since for the next archive
+        @return: the number of files that were packed"""
+
+        from PyFoam.Basics.ParallelGzipFile import ParallelGzipFile
+        from PyFoam.Execution.ProcessScheduler import nrOfCores
 
         ex=["*~",".svn"]+exclude
         members=self.essential[:]
@@ -269,18 +328,44 @@ class SolutionDirectory(Utilities):
                 members.append(self.latestDir())
         for p in additional:
             for f in listdir(self.name):
-                if (f not in members) and fnmatch.fnmatch(f,p):
-                    members.append(path.join(self.name,f))
+                f=path.join(self.name,f)
+                if (f not in members) and fnmatch.fnmatch(path.basename(f),p):
+                    members.append(f)
 
-        tar=tarfile.open(tarname,"w:gz")
+        previous={}
+        if since!=None:
+            previous=readManifest(since)
+        current={}
 
-        for m in members:
-            self.addToTar(tar,m,exclude=ex,base=base)
-            
-        tar.close()
+        if threads==None:
+            threads=nrOfCores()
+
+        gz=ParallelGzipFile(tarname,threads=threads)
+        try:
+            tar=tarfile.open(mode="w|",fileobj=gz,bufsize=self.tarBufferSize)
+
+            for m in members:
+                self.addToTar(tar,m,exclude=ex,base=base,
+                              previous=previous,current=current)
 
-    def addToTar(self,tar,name,exclude=[],base=None):
-        """The workhorse for the packCase-method"""
+            tar.close()
+        finally:
+            gz.close()
+
+        if manifest!=None:
+            writeManifest(manifest,current)
+
+        return len([f for f in current if current[f]!=previous.get(f)])
+
+    # size of the buffers used for reading the files and writing the tar
+    tarBufferSize=1024*1024
+
+    def addToTar(self,tar,name,exclude=[],base=None,previous={},current=None):
+        """The workhorse for the packCase-method
+        @param previous: dictionary with the modification times and sizes
+        of files that were already packed. These are not added again
+        @param current: dictionary to which modification time and
+        size of the files are added"""
 
         if base==None:
             base=path.basename(self.name)
@@ -291,10 +376,26 @@ class SolutionDirectory(Utilities):
             
         if path.isdir(name):
             for m in listdir(name):
-                self.addToTar(tar,path.join(name,m),exclude=exclude,base=base)
+                self.addToTar(tar,path.join(name,m),exclude=exclude,base=base,
+                              previous=previous,current=current)
         else:
-            arcname=path.join(base,name[len(self.name)+1:])
-            tar.add(name,arcname=arcname)
+            rel=name[len(self.name)+1:]
+            s=os.lstat(name)
+            key=(s.st_mtime,s.st_size)
+            if current!=None:
+                current[rel]=key
+            if previous.get(rel)==key:
+                return
+
+            info=tar.gettarinfo(name,arcname=path.join(base,rel))
+            if info.isreg():
+                f=open(name,"rb",self.tarBufferSize)
+                try:
+                    tar.addfile(info,f)
+                finally:
+                    f.close()
+            else:
+                tar.addfile(info)
 
     def getParallelTimes(self):
         """Get a list of the times in the processor0-directory"""
@@ -302,58 +403,39 @@ class SolutionDirectory(Utilities):
 
         proc0=path.join(self.name,"processor0")
         if path.exists(proc0):
-            for f in listdir(proc0):
-                try:
-                    val=float(f)
-                    result.append(f)
-                except ValueError:
-                    pass
-        result.sort(self.sorttimes)    
+            result=list(getListing(proc0).times)
         return result
     
     def reread(self,force=False):
-        """Rescan the directory for the time directories"""
+        """Rescan the directory for the time directories. The contents
+        of the directories are kept in an index (shared by all instances)
+        and only scanned again if a directory was modified"""
 
-        if not force and stat(self.name)[ST_CTIME]<=self.lastReread:
-            return
-        
-        self.times=[]
-        self.first=None
-        self.last=None
-        procDirs = self.processorDirs()
-        self.procNr=len(procDirs)
+        caseDir=getListing(self.name,force=force)
+        procDirs=caseDir.processors
         
         if procDirs and self.parallel:
-            timesDir = path.join(self.name, procDirs[0])
+            timesDir=getListing(path.join(self.name, procDirs[0]),force=force)
         else:
-            timesDir = self.name
-        
-        for f in listdir(timesDir):
-            try:
-                val=float(f)
-                self.times.append(f)
-            except ValueError:
-                pass
+            timesDir=caseDir
 
-        self.lastReread=stat(self.name)[ST_CTIME]
+        key=(caseDir.version,timesDir.name,timesDir.version)
+        if not force and key==self.lastReread:
+            return
         
-        self.times.sort(self.sorttimes)
+        self.procNr=len(procDirs)
+        self.times=list(timesDir.times)
+        self.first=None
+        self.last=None
         if self.times:
             self.first = self.times[0]
             self.last = self.times[-1]
 
+        self.lastReread=key
+
     def processorDirs(self):
-        """List with the processor directories"""
-        try:
-            return self.procDirs
-        except:
-            pass
-        self.procDirs=[]
-        for f in listdir(self.name):
-            if re.compile("processor[0-9]+").match(f):
-                self.procDirs.append(f)
-        
-        return self.procDirs
+        """List with the processor directories (sorted by the processor number)"""
+        return list(getListing(self.name).processors)
             
     def nrProcs(self):
         """The number of directories with processor-data"""
@@ -415,7 +497,8 @@ class SolutionDirectory(Utilities):
                      keepLast=False,
                      vtk=True,
                      keepRegular=False,
-                     functionObjectData=False):
+                     functionObjectData=False,
+                     remover=None):
         """remove all time-directories after a certain time. If not time ist
         set the initial time is used
         @param after: time after which directories ar to be removed
@@ -425,43 +508,47 @@ class SolutionDirectory(Utilities):
         @param keepLast: Keep the data from the last timestep
         @param vtk: Remove the VTK-directory if it exists
         @param keepRegular: keep all the times (only remove processor and other stuff)
-        @param functionObjectData: tries do determine which data was written by function obejects and removes it"""
+        @param functionObjectData: tries do determine which data was written by function obejects and removes it
+        @param remover: a L{ParallelRemover}. If set the directories are
+        only added to it and removed when it is run. Otherwise they are
+        removed before the method returns
+        @return: the remover that was used (run already if none was passed)"""
 
         self.reread()
 
         last=self.getLast()
         
+        doRemove=False
+        if remover==None:
+            remover=ParallelRemover()
+            doRemove=True
+
         if after==None:
             try:
                 time=float(self.first)
             except TypeError:
                 warning("The first timestep in",self.name," is ",self.first,"not a number. Doing nothing")
-                return
+                return remover
         else:
             time=float(after)
 
         if not keepRegular:
             for f in self.times:
                 if float(f)>time and not (keepLast and f==last):
-                    self.rmtree(path.join(self.name,f))
+                    remover.add(path.join(self.name,f))
 
         if path.exists(path.join(self.name,"VTK")) and vtk:
-            self.rmtree(path.join(self.name,"VTK"))
+            remover.add(path.join(self.name,"VTK"))
             
-        if self.nrProcs():
-            for f in listdir(self.name):
-                if re.compile("processor[0-9]+").match(f):
-                    if removeProcs:
-                        self.rmtree(path.join(self.name,f))
-                    else:
-                        pDir=path.join(self.name,f)
-                        for t in listdir(pDir):
-                            try:
-                                val=float(t)
-                                if val>time:
-                                    self.rmtree(path.join(pDir,t))
-                            except ValueError:
-                                pass
+        for f in self.processorDirs():
+            pDir=path.join(self.name,f)
+            if removeProcs:
+                remover.add(pDir)
+            else:
+                pTimes=getListing(pDir)
+                for t in pTimes.times:
+                    if pTimes.values[t]>time:
+                        remover.add(path.join(pDir,t))
                             
         if functionObjectData:
             cd=ParsedParameterFile(self.controlDict())
@@ -469,33 +556,45 @@ class SolutionDirectory(Utilities):
                 for f in cd["functions"][0::2]:
                     pth=path.join(self.name,f)
                     if path.exists(pth):
-                        self.rmtree(pth)
+                        remover.add(pth)
 
         additional=eval(conf().get("Clearing","additionalpatterns"))
         for a in additional:
-            self.clearPattern(a)
+            self.clearPattern(a,remover=remover)
+
+        if doRemove:
+            remover.run()
+
+        return remover
                     
-    def clearPattern(self,globPat):
+    def clearPattern(self,globPat,remover=None):
         """Clear all files that fit a certain shell (glob) pattern
-        @param glob: the pattern which the files are going to fit"""
+        @param glob: the pattern which the files are going to fit
+        @param remover: if set the files are only added to this
+        L{ParallelRemover}"""
 
         for f in glob.glob(path.join(self.name,globPat)):
-            if path.isdir(f):
+            if remover!=None:
+                remover.add(f)
+            elif path.isdir(f):
                 self.rmtree(f,ignore_errors=False)
             else:
                 os.unlink(f)
 
     def clearOther(self,
                    pyfoam=True,
-                   clearHistory=False):
+                   clearHistory=False,
+                   remover=None):
         """Remove additional directories
-        @param pyfoam: rremove all directories typically created by PyFoam"""
+        @param pyfoam: rremove all directories typically created by PyFoam
+        @param remover: if set the files are only added to this
+        L{ParallelRemover}"""
 
         if pyfoam:
-            self.clearPattern("PyFoam.?*")
-            self.clearPattern("*?.analyzed")
+            self.clearPattern("PyFoam.?*",remover=remover)
+            self.clearPattern("*?.analyzed",remover=remover)
         if clearHistory:
-            self.clearPattern("PyFoamHistory")
+            self.clearPattern("PyFoamHistory",remover=remover)
             
     def clear(self,
               after=None,
@@ -505,21 +604,33 @@ class SolutionDirectory(Utilities):
               vtk=True,
               keepRegular=False,
               clearHistory=False,
-              functionObjectData=False):
+              functionObjectData=False,
+              jobs=None,
+              dryRun=False):
         """One-stop-shop to remove data
         @param after: time after which directories ar to be removed
         @param processor: remove the processorXX directories
         @param pyfoam: rremove all directories typically created by PyFoam
         @param keepLast: Keep the last time-step
-        @param additional: list with additional patterns to clear"""
+        @param additional: list with additional patterns to clear
+        @param jobs: number of threads that remove the files
+        @param dryRun: don't remove anything. Only find out how much
+        would be removed
+        @return: the L{ParallelRemover} that did the work (its report-method
+        tells what was removed)"""
+        remover=ParallelRemover(jobs=jobs,dryRun=dryRun)
         self.clearResults(after=after,
                           removeProcs=processor,
                           keepLast=keepLast,
                           vtk=vtk,
                           keepRegular=keepRegular,
-                          functionObjectData=functionObjectData)
+                          functionObjectData=functionObjectData,
+                          remover=remover)
         self.clearOther(pyfoam=pyfoam,
-                        clearHistory=clearHistory)
+                        clearHistory=clearHistory,
+                        remover=remover)
+        remover.run()
+        return remover
             
     def initialDir(self):
         """@return: the name of the first time-directory (==initial
@@ -636,11 +747,11 @@ class SolutionDirectory(Utilities):
         """Gets a list of all the available mesh regions by checking all
         directories in constant and using all those that have a polyMesh-subdirectory
         @param defaultRegion: should the default region also be added (as None)"""
+        excludes=map(re.compile,self.excludeNames)
         lst=[]
-        for d in self.listDirectory(self.constantDir()):
-            if path.isdir(path.join(self.constantDir(),d)):
-                if path.exists(self.polyMeshDir(region=d)):
-                    lst.append(d)
+        for d in getRegions(path.join(self.name,"constant")):
+            if not [e for e in excludes if e.search(d)]:
+                lst.append(d)
 
         if defaultRegion:
             if path.exists(self.polyMeshDir()):
@@ -787,3 +898,29 @@ class NoTouchSolutionDirectory(SolutionDirectory):
                                   archive=None,
                                   paraviewLink=False,
                                   region=region)
+
+def writeManifest(fName,files):
+    """Write the manifest of an archive
+    @param fName: the name of the manifest-file
+    @param files: dictionary with the file-names (relative to the case)
+    as keys and (modification time,size)-tuples as values"""
+
+    f=open(fName,"w")
+    f.write("# PyFoam archive manifest: modification time, size, file\n")
+    for n in sorted(files.keys()):
+        mtime,size=files[n]
+        f.write("%r\t%d\t%s\n" % (mtime,size,n))
+    f.close()
+
+def readManifest(fName):
+    """Read a manifest written by writeManifest
+    @return: dictionary with the file-names as keys and (modification
+    time,size)-tuples as values"""
+
+    files={}
+    for l in open(fName):
+        if l[0]=="#":
+            continue
+        mtime,size,n=l.rstrip("\n").split("\t",2)
+        files[n]=(float(mtime),int(size))
+    return files
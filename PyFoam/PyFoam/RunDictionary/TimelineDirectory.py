@@ -1,13 +1,16 @@
 #  ICE Revision: $Id:$
 """Working with a directory of timelines
 
-Currently not optimal as it reads the files more often than necessary"""
+The data of the timeline-files is read once and kept in a cache (until
+the file changes)"""
 
 from os import path,listdir
 from glob import glob
 from PyFoam.Error import error
 import math
 
+from PyFoam.Basics.DataFileCache import cachedDataFile
+
 from PyFoam.Basics.SpreadsheetData import SpreadsheetData
 
 class TimelineDirectory(object):
@@ -238,8 +241,6 @@ class TimelineValue(object):
                     self.positions.append(poses[i])
                     self.positionIndex.append(i)
 
-        self.cache={}
-
     def __repr__(self):
         if self.isVector:
             vect=" (vector)"
@@ -252,61 +253,80 @@ class TimelineValue(object):
         """Is this a probe-file"""
         return self._isProbe
 
+    def _data(self):
+        """@return: the cached data of the file"""
+        return cachedDataFile(self.file)
+
+    def _rowValues(self,entry,row):
+        """@return: the values (without the time) in a row"""
+        vals=entry["data"][row]
+        if entry["lengths"] is not None:
+            vals=vals[:entry["lengths"][row]]
+        return vals[1:]
+
     def timeRange(self):
         """Range of times"""
-        lines=open(self.file).readlines()
-        for l in lines:
-            v=l.split()
-            if v[0][0]!='#':
-                minRange=float(v[0])
-                break
-        lines.reverse()
-        for l in lines:
-            v=l.split()
-            if len(v)>=len(self.positions)+1:
-                maxRange=float(v[0])
-                break
-
-        return minRange,maxRange
-    
+        import numpy
+
+        entry=self._data()
+        data=entry["data"]
+        if len(data)==0:
+            error("No data in",self.file)
+        minRange=data[0,0]
+        if entry["lengths"] is None:
+            maxRange=data[-1,0]
+        else:
+            # the last line may be incomplete
+            complete=numpy.nonzero(entry["lengths"]>=len(self.positions)+1)[0]
+            if len(complete)==0:
+                error("No complete line in",self.file)
+            maxRange=data[complete[-1],0]
+
+        return float(minRange),float(maxRange)
+
+    def nearestRows(self,times):
+        """Find the rows in the data whose times are nearest to the times.
+        If two rows are equally far away the one that comes first in the
+        file is used
+        @param times: a list with times
+        @return: array with the indices of the rows"""
+        import numpy
+
+        entry=self._data()
+        if "uniqueTimes" not in entry:
+            entry["uniqueTimes"],entry["firstRow"]=numpy.unique(entry["data"][:,0],
+                                                                 return_index=True)
+        uniq=entry["uniqueTimes"]
+        first=entry["firstRow"]
+
+        times=numpy.asarray(times,dtype=float)
+        upper=numpy.clip(numpy.searchsorted(uniq,times),0,len(uniq)-1)
+        lower=numpy.clip(upper-1,0,len(uniq)-1)
+        dUpper=numpy.abs(uniq[upper]-times)
+        dLower=numpy.abs(times-uniq[lower])
+        useUpper=(dUpper<dLower) | ((dUpper==dLower) & (first[upper]<first[lower]))
+
+        return numpy.where(useUpper,first[upper],first[lower])
+
     def getData(self,times):
         """Get the data values that are nearest to the actual times"""
-        dist=len(times)*[1e80]
-        data=len(times)*[len(self.positions)*[1e80]]
-        
-        lines=open(self.file).readlines()
-        
-        for l in lines:
-            v=l.split()
-            if v[0][0]!='#':
-                try:
-                    time=float(v[0])
-                    vals=v[1:]
-                    for i,t in enumerate(times):
-                        if abs(t-time)<dist[i]:
-                            dist[i]=abs(t-time)
-                            data[i]=vals
-                except ValueError:
-                    pass
+        import numpy
+
+        entry=self._data()
+        if len(entry["data"])==0:
+            return [[] for t in times]
+
         result=[]
-        for d in data:
-            tmp=[]
-            for v in d:
-                if abs(float(v))<1e40:
-                    tmp.append(float(v))
-            result.append(tmp)
+        for row in self.nearestRows(times):
+            vals=self._rowValues(entry,row)
+            result.append(vals[numpy.abs(vals)<1e40].tolist())
 
         return result
 
     def __call__(self):
         """Return the data as a SpreadsheetData-object"""
-        
-        lines=open(self.file).readlines()
-        data=[]
-        for l in lines:
-            v=l.split()
-            if v[0][0]!='#':
-                data.append(map(lambda x:float(x.replace('(','').replace(')','')),v))
+        import numpy
+
         names=["time"]
         if self.isVector:
             for p in self.positions:
@@ -314,6 +334,16 @@ class TimelineValue(object):
         else:
             names+=self.positions
 
-        return SpreadsheetData(data=data,
+        entry=self._data()
+        if entry["lengths"] is None and entry["data"].shape[1]==len(names):
+            # a copy because the cached data must not be changed
+            columns=entry["data"].transpose().copy()
+        else:
+            data=[]
+            for i in range(len(entry["data"])):
+                data.append([entry["data"][i,0]]+list(self._rowValues(entry,i)))
+            columns=numpy.array(data).reshape(-1,len(names)).transpose().copy()
+
+        return SpreadsheetData(columns=columns,
                                names=names,
                                title="%s_t=%s" % (self.val,self.time))
@@ -0,0 +1,54 @@
+"""Times clearing a synthetic decomposed case with a lot of written
+times. Usage:
+
+benchmarkClearCase.py [<nr of processors> [<nr of times>]]"""
+
+from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path,mkdir
+import sys,time
+
+nrProcs=256
+nrTimes=50
+if len(sys.argv)>1:
+    nrProcs=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrTimes=int(sys.argv[2])
+
+base=mkdtemp()
+case=path.join(base,"case")
+
+def makeCase():
+    mkdir(case)
+    for d in ["system","constant"]:
+        mkdir(path.join(case,d))
+    open(path.join(case,"system","controlDict"),"w").close()
+    for p in ["."]+["processor%d" % i for i in range(nrProcs)]:
+        pDir=path.join(case,p)
+        if not path.exists(pDir):
+            mkdir(pDir)
+        for t in range(nrTimes):
+            tDir=path.join(pDir,"%g" % (t*0.1))
+            mkdir(tDir)
+            for f in ["U","p","phi"]:
+                open(path.join(tDir,f),"w").write("x"*1000)
+
+for name,kwargs in [("Dry run",{"dryRun":True}),
+                    ("Serial",{"jobs":1}),
+                    ("8 threads",{"jobs":8})]:
+    makeCase()
+    sol=SolutionDirectory(case,archive=None,paraviewLink=False)
+    start=time.time()
+    try:
+        remover=sol.clear(processor=False,**kwargs)
+        report=remover.report()
+    except TypeError:
+        # old version without the parameters
+        sol.clear(processor=False)
+        report=""
+    print "%-10s %8.3f s %s" % (name,time.time()-start,report)
+    rmtree(case)
+
+rmtree(base)
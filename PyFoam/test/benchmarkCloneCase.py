@@ -0,0 +1,79 @@
+"""Times the cloning of a synthetic decomposed case and measures how
+much data is written by the different clone modes. Usage:
+
+benchmarkCloneCase.py [<nr of processors> [<MB of mesh per processor>]]"""
+
+from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path,mkdir,walk,lstat,statvfs
+import sys,time
+
+nrProcs=64
+meshMB=4
+if len(sys.argv)>1:
+    nrProcs=int(sys.argv[1])
+if len(sys.argv)>2:
+    meshMB=float(sys.argv[2])
+
+base=mkdtemp()
+case=path.join(base,"case")
+
+def makeMesh(d,size):
+    mkdir(d)
+    block="x"*(1024*1024)
+    for f,part in [("points",0.3),("faces",0.4),("owner",0.15),("neighbour",0.15)]:
+        fh=open(path.join(d,f),"w")
+        for i in range(int(size*part)):
+            fh.write(block)
+        fh.write(block[:int((size*part-int(size*part))*len(block))])
+        fh.close()
+    open(path.join(d,"boundary"),"w").write("boundary\n")
+
+def makeCase(d,size):
+    mkdir(d)
+    for s in ["system","constant","0"]:
+        mkdir(path.join(d,s))
+    open(path.join(d,"system","controlDict"),"w").write("controlDict\n")
+    open(path.join(d,"constant","transportProperties"),"w").write("nu 1e-5;\n")
+    open(path.join(d,"0","U"),"w").write("U\n"*1000)
+    makeMesh(path.join(d,"constant","polyMesh"),size)
+
+start=time.time()
+makeCase(case,meshMB*nrProcs)
+for p in range(nrProcs):
+    makeCase(path.join(case,"processor%d" % p),meshMB)
+print "Creating case with %d processors and %g MB of mesh: %.2f s" % (nrProcs,2*nrProcs*meshMB,time.time()-start)
+
+def newData(d):
+    """Size of the files that don't share their data with the original"""
+    total=0
+    for root,dirs,files in walk(d):
+        for f in files:
+            s=lstat(path.join(root,f))
+            if s.st_nlink==1:
+                total+=s.st_size
+    return total
+
+def freeSpace():
+    s=statvfs(base)
+    return s.f_bfree*s.f_frsize
+
+sol=SolutionDirectory(case,archive=None,paraviewLink=False,parallel=True)
+
+for name,link,jobs in [("copy",None,1),
+                       ("copy (threads)",None,None),
+                       ("hardlink","hardlink",None),
+                       ("reflink","reflink",None)]:
+    dest=path.join(base,"clone")
+    free=freeSpace()
+    start=time.time()
+    sol.cloneCase(dest,link=link,jobs=jobs)
+    used=time.time()-start
+    print "%-15s %8.3f s  new data: %8.1f MB  less free space: %8.1f MB" % (name,used,
+                                                                            newData(dest)/1024.**2,
+                                                                            (free-freeSpace())/1024.**2)
+    rmtree(dest)
+
+rmtree(base)
@@ -0,0 +1,56 @@
+"""Compares the cost of passing the data of growing timelines to
+gnuplot: formatting it as text (Gnuplot.Data) against writing the
+changed points to binary files. No gnuplot-process is needed. Usage:
+
+benchmarkGnuplotData.py [<nr of replots> [<nr of lines> [<new points per replot>]]]"""
+
+from PyFoam.ThirdParty.Gnuplot import Data
+from PyFoam.Basics.GnuplotBinaryData import BinaryTimelineFile,BinaryTimelineItem
+
+from array import array
+from math import sin
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path
+import sys,time
+
+nrReplots=50
+nrLines=24
+nrNew=200
+if len(sys.argv)>1:
+    nrReplots=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrLines=int(sys.argv[2])
+if len(sys.argv)>3:
+    nrNew=int(sys.argv[3])
+
+tmpDir=mkdtemp()
+
+def run(binary):
+    times=array('d')
+    values=[array('d') for i in range(nrLines)]
+    files=[BinaryTimelineFile(path.join(tmpDir,"data%d" % i)) for i in range(nrLines)]
+    used=0.
+    for r in range(nrReplots):
+        for i in range(nrNew):
+            t=len(times)
+            times.append(t)
+            for j,v in enumerate(values):
+                v.append(sin(t*0.001*(j+1)))
+        start=time.time()
+        for j,v in enumerate(values):
+            if binary:
+                records=files[j].update(times,v)
+                BinaryTimelineItem(files[j].filename,records,title="l%d" % j).command()
+            else:
+                Data(times,v,title="l%d" % j,inline=True).command()
+        used+=time.time()-start
+    for f in files:
+        f.close()
+    return used
+
+print "%d replots, %d lines, %d new points per replot (%d points at the end)" % (nrReplots,nrLines,nrNew,nrReplots*nrNew)
+print "Text (Gnuplot.Data): %8.3f s" % run(False)
+print "Binary files:        %8.3f s" % run(True)
+
+rmtree(tmpDir)
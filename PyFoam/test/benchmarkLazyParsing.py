@@ -0,0 +1,60 @@
+"""Compares reading a large field-file completely with reading only the
+boundary conditions of it in lazy mode"""
+
+from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path
+import sys,time
+
+nr=100000
+if len(sys.argv)>1:
+    nr=int(sys.argv[1])
+
+content="""FoamFile
+{
+    version     2.0;
+    format      ascii;
+    class       volVectorField;
+    object      U;
+}
+
+dimensions      [0 1 -1 0 0 0 0];
+
+internalField   nonuniform List<vector> %d
+(
+""" % nr
+content+="(1.5 -2e-3 3.25)\n"*nr
+content+=""")
+;
+
+boundaryField
+{
+    inlet
+    {
+        type            fixedValue;
+        value           uniform (1 0 0);
+    }
+    outlet
+    {
+        type            zeroGradient;
+    }
+}
+"""
+
+tmpDir=mkdtemp()
+fName=path.join(tmpDir,"U")
+open(fName,"w").write(content)
+
+for name,lazy in [("Full",False),("Lazy",True)]:
+    start=time.time()
+    f=ParsedParameterFile(fName,lazy=lazy)
+    f["boundaryField"]["inlet"]["type"]="slip"
+    read=time.time()-start
+    start=time.time()
+    f.writeFile()
+    write=time.time()-start
+    print "%-5s: reading %8.3f s  writing %8.3f s (%d cells)" % (name,read,write,nr)
+
+rmtree(tmpDir)
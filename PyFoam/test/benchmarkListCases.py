@@ -0,0 +1,58 @@
+"""Times pyFoamListCases.py for a directory with a lot of synthetic
+cases. Usage:
+
+benchmarkListCases.py [<nr of cases> [<nr of times per case>]]"""
+
+from PyFoam.Applications.ListCases import ListCases
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path,mkdir,environ
+import sys,time
+
+nrCases=300
+nrTimes=20
+if len(sys.argv)>1:
+    nrCases=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrTimes=int(sys.argv[2])
+
+base=mkdtemp()
+# so that the cache is not written to the real home
+environ["HOME"]=base
+cases=path.join(base,"cases")
+mkdir(cases)
+
+for c in range(nrCases):
+    case=path.join(cases,"case%d" % c)
+    mkdir(case)
+    for d in ["system","constant",path.join("constant","polyMesh")]:
+        mkdir(path.join(case,d))
+    open(path.join(case,"system","controlDict"),"w").close()
+    for t in range(nrTimes):
+        tDir=path.join(case,"%g" % (t*0.1))
+        mkdir(tDir)
+        for f in ["U","p","k"]:
+            open(path.join(tDir,f),"w").write("x"*10000)
+    for p in range(2):
+        pDir=path.join(case,"processor%d" % p)
+        mkdir(pDir)
+        mkdir(path.join(pDir,"0"))
+
+def listCases(*args):
+    out=sys.stdout
+    sys.stdout=open("/dev/null","w")
+    start=time.time()
+    try:
+        ListCases(args=["--parallel-info","--disk-usage"]+list(args)+[cases])
+    finally:
+        sys.stdout=out
+    return time.time()-start
+
+print "%d cases with %d times each" % (nrCases,nrTimes)
+print "Serial:        %8.3f s" % listCases("--jobs=1")
+print "8 threads:     %8.3f s" % listCases("--jobs=8")
+print "Filling cache: %8.3f s" % listCases("--cache")
+print "From cache:    %8.3f s" % listCases("--cache")
+
+rmtree(base)
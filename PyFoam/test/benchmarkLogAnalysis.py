@@ -0,0 +1,58 @@
+"""Measures how many lines per second the standard log analyzer with a
+number of additional regular expressions (like the ones from a
+customRegexp-file) processes. Compares analyzing every line with every
+analyzer to only passing the lines that contain the anchor of the
+analyzer"""
+
+from PyFoam.LogAnalysis.StandardLogAnalyzer import StandardLogAnalyzer
+from PyFoam.LogAnalysis.RegExpLineAnalyzer import RegExpLineAnalyzer
+
+import sys,time
+
+steps=2000
+if len(sys.argv)>1:
+    steps=int(sys.argv[1])
+nrCustom=25
+if len(sys.argv)>2:
+    nrCustom=int(sys.argv[2])
+
+lines=[]
+for i in range(steps):
+    lines+=["Courant Number mean: 0.1 max: 0.5",
+            "deltaT = 0.01",
+            "Time = %g" % (0.01*(i+1)),
+            ""]
+    for v in ["Ux","Uy","Uz","k","epsilon"]:
+        lines.append("DILUPBiCG:  Solving for %s, Initial residual = 0.01, Final residual = 1e-05, No Iterations 2" % v)
+    for j in range(3):
+        lines.append("DICPCG:  Solving for p, Initial residual = 0.1, Final residual = 0.0001, No Iterations 20")
+        lines.append("time step continuity errors : sum local = 1e-05, global = 1e-18, cumulative = 1e-18")
+    lines+=["bounding epsilon, min: -1 max: 10 average: 1",
+            "ExecutionTime = 0.1 s  ClockTime = 0 s",
+            ""]
+
+def makeAnalyzer():
+    an=StandardLogAnalyzer(doTimelines=True,doFiles=False)
+    for i in range(nrCustom):
+        an.addAnalyzer("custom%d" % i,
+                       RegExpLineAnalyzer("custom%d" % i,
+                                          "^Custom value %d: min (%%f%%) max (%%f%%)$" % i,
+                                          doTimelines=True,
+                                          doFiles=False))
+    return an
+
+def timeIt(dispatch):
+    an=makeAnalyzer()
+    an.useAnchors=dispatch
+    start=time.time()
+    for l in lines:
+        an.analyzeLine(l)
+    return len(lines)/(time.time()-start)
+
+allLines=timeIt(False)
+anchored=timeIt(True)
+
+print "Lines analyzed:",len(lines),"Analyzers:",len(makeAnalyzer().listAnalyzers())
+print "Every analyzer:     %10.0f lines/s" % allLines
+print "Anchored dispatch:  %10.0f lines/s" % anchored
+print "Speedup: %.1f" % (anchored/allLines)
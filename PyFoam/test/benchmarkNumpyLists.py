@@ -0,0 +1,24 @@
+"""Compares reading and writing a large nonuniform vector field with the
+parser and with the numpy-reader for long lists"""
+
+from PyFoam.RunDictionary.ParsedParameterFile import FoamStringParser
+from PyFoam.Basics.FoamFileGenerator import makeString
+
+import sys,time
+
+nr=100000
+if len(sys.argv)>1:
+    nr=int(sys.argv[1])
+
+content="internalField nonuniform List<vector> %d\n(\n" % nr
+content+="(1.5 -2e-3 3.25)\n"*nr
+content+=");\n"
+
+for name,threshold in [("Parser",None),("Numpy",1000)]:
+    start=time.time()
+    data=FoamStringParser(content,listLengthNumpy=threshold)
+    read=time.time()-start
+    start=time.time()
+    out=makeString(data.getData())
+    write=time.time()-start
+    print "%-8s: reading %8.3f s  writing %8.3f s (%d cells)" % (name,read,write,nr)
@@ -0,0 +1,58 @@
+"""Times packCase for a synthetic case with a number of time
+directories: with different numbers of compression threads and as an
+incremental archive after a new time directory was written. Usage:
+
+benchmarkPackCase.py [<nr of times> [<MB per time>]]"""
+
+from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
+from PyFoam.Execution.ProcessScheduler import nrOfCores
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path,mkdir
+import sys,time,random
+
+nrTimes=10
+sizeMB=10.
+if len(sys.argv)>1:
+    nrTimes=int(sys.argv[1])
+if len(sys.argv)>2:
+    sizeMB=float(sys.argv[2])
+
+base=mkdtemp()
+case=path.join(base,"case")
+tarName=path.join(base,"case.tgz")
+manifest=path.join(base,"case.manifest")
+
+r=random.Random(1)
+# a field that compresses like an ASCII-field of OpenFOAM
+line="".join(["(%g %g %g)\n" % (r.random(),r.random(),r.random()) for i in range(10000)])
+
+def writeTime(t):
+    d=path.join(case,t)
+    mkdir(d)
+    f=open(path.join(d,"U"),"w")
+    for i in range(int(sizeMB*1024*1024/len(line))):
+        f.write(line)
+    f.close()
+
+mkdir(case)
+for d in ["system","constant"]:
+    mkdir(path.join(case,d))
+open(path.join(case,"system","controlDict"),"w").close()
+for t in range(nrTimes):
+    writeTime(str(t))
+
+sol=SolutionDirectory(case,archive=None,paraviewLink=False)
+
+for threads in sorted(set([1,2,nrOfCores()])):
+    start=time.time()
+    sol.packCase(tarName,additional=["[0-9]*"],threads=threads,manifest=manifest)
+    print "%2d threads:  %8.3f s  (%d processors)" % (threads,time.time()-start,nrOfCores())
+
+writeTime(str(nrTimes))
+start=time.time()
+nr=sol.packCase(tarName,additional=["[0-9]*"],since=manifest)
+print "Incremental: %8.3f s  (%d files)" % (time.time()-start,nr)
+
+rmtree(base)
@@ -0,0 +1,74 @@
+"""Measures the cost of reading a dictionary with and without reusing
+the lexer/parser-tables of earlier instances"""
+
+from PyFoam.RunDictionary.ParsedParameterFile import ParsedParameterFile,FoamStringParser
+from PyFoam.Basics.PlyParser import clearPrebuiltParsers
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path
+import sys,time
+
+nr=200
+if len(sys.argv)>1:
+    nr=int(sys.argv[1])
+
+content="""FoamFile
+{
+    version     2.0;
+    format      ascii;
+    class       dictionary;
+    object      fvSchemes;
+}
+
+ddtSchemes
+{
+    default         steadyState;
+}
+
+gradSchemes
+{
+    default         Gauss linear;
+    grad(p)         Gauss linear;
+    grad(U)         cellLimited Gauss linear 1;
+}
+
+divSchemes
+{
+    default         none;
+    div(phi,U)      bounded Gauss linearUpwind grad(U);
+    div(phi,k)      bounded Gauss upwind;
+    div(phi,epsilon) bounded Gauss upwind;
+}
+
+laplacianSchemes
+{
+    default         Gauss linear corrected;
+}
+"""
+
+tmpDir=mkdtemp()
+fName=path.join(tmpDir,"fvSchemes")
+open(fName,"w").write(content)
+
+def timeIt(clear):
+    start=time.time()
+    for i in range(nr):
+        if clear:
+            clearPrebuiltParsers()
+        ParsedParameterFile(fName)
+        FoamStringParser("a %d;" % i)
+    return (time.time()-start)/nr
+
+# make sure that the table-files exist
+ParsedParameterFile(fName)
+
+uncached=timeIt(True)
+cached=timeIt(False)
+
+rmtree(tmpDir)
+
+print "Files read:",nr
+print "Rebuilding lexer/parser: %8.3f ms per file" % (uncached*1e3)
+print "Reusing lexer/parser:    %8.3f ms per file" % (cached*1e3)
+print "Speedup: %.1f" % (uncached/cached)
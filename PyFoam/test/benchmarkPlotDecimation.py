@@ -0,0 +1,51 @@
+"""Times the replots of a timeline that grows (like during a long run)
+with and without the decimation of the plotted data. The backend work is
+the construction of the Gnuplot-data (without a gnuplot-process).
+Usage:
+
+benchmarkPlotDecimation.py [<nr of replots> [<times between replots>]]"""
+
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry
+from PyFoam.Basics.DummyPlotTimelines import DummyPlotTimelines
+from PyFoam.Basics.GeneralPlotTimelines import PlotLinesRegistry
+from PyFoam.Basics.CustomPlotInfo import CustomPlotInfo
+from PyFoam.ThirdParty.Gnuplot import Data
+
+from math import sin
+import sys,time
+
+nrReplots=100
+nrTimes=2000
+if len(sys.argv)>1:
+    nrReplots=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrTimes=int(sys.argv[2])
+
+names=["Ux","Uy","Uz","p","k","epsilon"]
+
+class GnuplotDataPlot(DummyPlotTimelines):
+    def buildData(self,times,values,name,title,lastValid):
+        self.points+=len(times)
+        Data(times,values,title=title)
+
+def run(resolution):
+    GnuplotDataPlot.plotResolution=resolution
+    col=TimeLineCollection(registry=TimeLinesRegistry())
+    plot=GnuplotDataPlot(col,CustomPlotInfo(),registry=PlotLinesRegistry())
+    plot.points=0
+    used=0.
+    t=0
+    for r in range(nrReplots):
+        for i in range(nrTimes):
+            col.setTime(t)
+            for j,n in enumerate(names):
+                col.setValue(n,sin(t*0.001*(j+1)))
+            t+=1
+        start=time.time()
+        plot.redo()
+        used+=time.time()-start
+    return used,plot.points
+
+print "%d replots with %d new times each" % (nrReplots,nrTimes)
+print "All points:  %8.3f s (%d points)" % run(None)
+print "Decimated:   %8.3f s (%d points)" % run(640)
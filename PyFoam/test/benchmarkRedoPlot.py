@@ -0,0 +1,71 @@
+"""Times pyFoamRedoPlot.py for a number of pickled plot files (like the
+.analyzed-directories of archived runs). The CSV-files are written and
+the plots are done with the dummy implementation (so no gnuplot is
+needed). Usage:
+
+benchmarkRedoPlot.py [<nr of runs> [<nr of plots per run>]]"""
+
+from PyFoam.Applications.RedoPlot import RedoPlot
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry
+from PyFoam.Basics.DummyPlotTimelines import DummyPlotTimelines
+from PyFoam.Basics.GeneralPlotTimelines import PlotLinesRegistry
+from PyFoam.Basics.CustomPlotInfo import CustomPlotInfo
+
+import cPickle as pickle
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path,makedirs,chdir
+from math import sin
+import sys,time
+
+nrRuns=20
+nrPlots=6
+if len(sys.argv)>1:
+    nrRuns=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrPlots=int(sys.argv[2])
+
+base=mkdtemp()
+chdir(base)
+
+files=[]
+for r in range(nrRuns):
+    reg=TimeLinesRegistry()
+    plots=PlotLinesRegistry()
+    for p in range(nrPlots):
+        col=TimeLineCollection(registry=reg)
+        for t in range(2000):
+            col.setTime(t)
+            for v in range(5):
+                col.setValue("v%d" % v,sin(t*0.01*v))
+        DummyPlotTimelines(col,CustomPlotInfo(name="plot%d" % p),registry=plots)
+    fName=path.join(base,"run%d" % r,"PyFoamRunner.foam.analyzed","pickledPlots")
+    makedirs(path.dirname(fName))
+    fh=open(fName,"w")
+    pick=pickle.Pickler(fh)
+    pick.dump(reg.prepareForTransfer())
+    pick.dump(plots.prepareForTransfer())
+    fh.close()
+    files.append(fName)
+
+def redoPlot(*args):
+    out=sys.stdout
+    sys.stdout=open("/dev/null","w")
+    start=time.time()
+    try:
+        RedoPlot(args=["--pickle-file",
+                       "--implementation=dummy",
+                       "--with-csv-files"]+list(args))
+    finally:
+        sys.stdout=out
+    return time.time()-start
+
+print "%d runs with %d plots each" % (nrRuns,nrPlots)
+old=0.
+for f in files:
+    old+=redoPlot("--sleep-time=0.1",f)
+print "One by one, sleeping (old): %8.3f s" % old
+print "Batch, 1 job:               %8.3f s" % redoPlot("--jobs=1",*files)
+print "Batch, 4 jobs:              %8.3f s" % redoPlot("--jobs=4",*files)
+
+rmtree(base)
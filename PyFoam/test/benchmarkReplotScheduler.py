@@ -0,0 +1,47 @@
+"""Times how long the analysis of a log is held up by the replots. A
+timeline gets new data and a replot is requested after every time-step
+(like GnuplotCommon.timeHandle does). The plot needs a fixed time to
+draw. Usage:
+
+benchmarkReplotScheduler.py [<nr of time-steps> [<seconds per replot>]]"""
+
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry
+from PyFoam.Basics.DummyPlotTimelines import DummyPlotTimelines
+from PyFoam.Basics.GeneralPlotTimelines import PlotLinesRegistry
+from PyFoam.Basics.CustomPlotInfo import CustomPlotInfo
+from PyFoam.Basics.ReplotScheduler import ReplotScheduler
+
+from math import sin
+import sys,time
+
+nrSteps=2000
+drawTime=0.02
+if len(sys.argv)>1:
+    nrSteps=int(sys.argv[1])
+if len(sys.argv)>2:
+    drawTime=float(sys.argv[2])
+
+class SlowPlot(DummyPlotTimelines):
+    def doReplot(self):
+        time.sleep(drawTime)
+
+def run(maxFrameRate,threaded):
+    col=TimeLineCollection(registry=TimeLinesRegistry())
+    plot=SlowPlot(col,CustomPlotInfo(),registry=PlotLinesRegistry())
+    sched=ReplotScheduler([plot],maxFrameRate=maxFrameRate,threaded=threaded)
+    start=time.time()
+    for t in range(nrSteps):
+        col.setTime(t)
+        for i in range(20):
+            col.setValue("p%d" % i,sin(t*0.01*i))
+        sched.request()
+    analysis=time.time()-start
+    sched.stop()
+    return analysis,sched.report()
+
+print "%d time-steps, %g s per replot" % (nrSteps,drawTime)
+for name,rate,threaded in [("Every step (old)",None,False),
+                           ("Synchronous, 10/s",10,False),
+                           ("Thread, no limit",None,True),
+                           ("Thread, 10/s",10,True)]:
+    print "%-20s: analysis %8.3f s, %s" % ((name,)+run(rate,threaded))
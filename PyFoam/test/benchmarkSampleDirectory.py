@@ -0,0 +1,50 @@
+"""Times reading a synthetic sample-directory the way pyFoamSamplePlot.py
+does it (all the values of all the lines for all the times). Usage:
+
+benchmarkSampleDirectory.py [<nr of times> [<nr of lines>]]"""
+
+from PyFoam.RunDictionary.SampleDirectory import SampleDirectory
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path,makedirs
+import sys,time
+
+nrTimes=1000
+nrLines=50
+if len(sys.argv)>1:
+    nrTimes=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrLines=int(sys.argv[2])
+nrPoints=20
+fields=["p","T","k","epsilon","nut","rho","alpha","mu"]
+
+tmpDir=mkdtemp()
+
+start=time.time()
+row=" ".join(["%g" % (0.1*i) for i in range(len(fields))])+"\n"
+for t in range(nrTimes):
+    tDir=path.join(tmpDir,"samples","%g" % (0.1*t))
+    makedirs(tDir)
+    for l in range(nrLines):
+        f=open(path.join(tDir,"line%d_%s.xy" % (l,"_".join(fields))),"w")
+        for i in range(nrPoints):
+            f.write("%g " % (0.01*i)+row)
+        f.close()
+print "Creating %d times with %d lines: %.2f s" % (nrTimes,nrLines,time.time()-start)
+
+def readAll():
+    samples=SampleDirectory(tmpDir)
+    nr=0
+    for l in samples.lines():
+        for d in samples.getData(line=[l]):
+            d.range()
+            nr+=1
+    return nr
+
+for name in ["First read","Second read"]:
+    start=time.time()
+    nr=readAll()
+    print "%-12s: %8.2f s for %d data sets" % (name,time.time()-start,nr)
+
+rmtree(tmpDir)
@@ -0,0 +1,55 @@
+"""Times the construction of SolutionDirectory-objects for a synthetic
+case with a lot of time and processor directories. Usage:
+
+benchmarkSolutionDirectory.py [<nr of times> [<nr of processors>]]"""
+
+from PyFoam.RunDictionary.SolutionDirectory import SolutionDirectory
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path,mkdir
+import sys,time
+
+nrTimes=20000
+nrProcs=512
+if len(sys.argv)>1:
+    nrTimes=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrProcs=int(sys.argv[2])
+
+case=mkdtemp()
+
+start=time.time()
+for d in ["system","constant",path.join("constant","polyMesh")]:
+    mkdir(path.join(case,d))
+open(path.join(case,"system","controlDict"),"w").close()
+for t in range(nrTimes):
+    mkdir(path.join(case,"%g" % (t*0.001)))
+for p in range(nrProcs):
+    mkdir(path.join(case,"processor%d" % p))
+print "Creating %d times and %d processors: %.2f s" % (nrTimes,nrProcs,time.time()-start)
+
+def construct():
+    sol=SolutionDirectory(case,archive=None,paraviewLink=False)
+    sol.getLast()
+    sol.nrProcs()
+    sol.getRegions()
+
+for name in ["First","Second","Third"]:
+    start=time.time()
+    construct()
+    print "%-8s construction: %8.4f s" % (name,time.time()-start)
+
+# give the index the chance to trust the modification times
+time.sleep(1.5)
+start=time.time()
+for i in range(10):
+    construct()
+print "After pause:           %8.4f s per construction" % ((time.time()-start)/10)
+
+mkdir(path.join(case,"%g" % (nrTimes*0.001)))
+start=time.time()
+construct()
+print "After adding a time:   %8.4f s" % (time.time()-start)
+
+rmtree(case)
@@ -0,0 +1,66 @@
+"""Measures how many lines per second of solver output the runners
+process. A recorded log (or a generated one) is replayed by a fake
+solver that just copies it to the standard output. Usage:
+
+benchmarkSolverOutput.py [<logfile>|<nr of timesteps>]"""
+
+from PyFoam.Execution.BasicRunner import BasicRunner
+from PyFoam.Execution.AnalyzedRunner import AnalyzedRunner
+from PyFoam.LogAnalysis.StandardLogAnalyzer import StandardLogAnalyzer
+from PyFoam.FoamInformation import oldAppConvention as oldApp
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path,mkdir,chmod
+import sys,time
+
+tmpDir=mkdtemp()
+caseDir=path.join(tmpDir,"case")
+mkdir(caseDir)
+
+logName=path.join(tmpDir,"recorded.log")
+steps=5000
+
+if len(sys.argv)>1 and path.exists(sys.argv[1]):
+    logName=sys.argv[1]
+else:
+    if len(sys.argv)>1:
+        steps=int(sys.argv[1])
+    f=open(logName,"w")
+    for i in range(steps):
+        f.write("Courant Number mean: 0.1 max: 0.5\ndeltaT = 0.01\nTime = %g\n\n" % (0.01*(i+1)))
+        for v in ["Ux","Uy","Uz","k","epsilon"]:
+            f.write("DILUPBiCG:  Solving for %s, Initial residual = 0.01, Final residual = 1e-05, No Iterations 2\n" % v)
+        for j in range(3):
+            f.write("DICPCG:  Solving for p, Initial residual = 0.1, Final residual = 0.0001, No Iterations 20\n")
+            f.write("time step continuity errors : sum local = 1e-05, global = 1e-18, cumulative = 1e-18\n")
+        f.write("ExecutionTime = 0.1 s  ClockTime = 0 s\n\n")
+    f.close()
+
+nrLines=len(open(logName).readlines())
+
+solver=path.join(tmpDir,"fakeSolver")
+open(solver,"w").write("#! /bin/sh\ncat %s\n" % logName)
+chmod(solver,0755)
+
+if oldApp():
+    argv=[solver,tmpDir,"case"]
+else:
+    argv=[solver,"-case",caseDir]
+
+def timeIt(name,runner):
+    start=time.time()
+    runner.start()
+    used=time.time()-start
+    print "%-15s: %10.0f lines/s (%d lines in %.2f s)" % (name,nrLines/used,runner.data["lines"],used)
+
+timeIt("BasicRunner",BasicRunner(argv=argv,
+                                 silent=True,
+                                 server=False,
+                                 writeState=False))
+timeIt("AnalyzedRunner",AnalyzedRunner(StandardLogAnalyzer(doTimelines=True,doFiles=False),
+                                       argv=argv,
+                                       silent=True,
+                                       server=False))
+
+rmtree(tmpDir)
@@ -0,0 +1,64 @@
+"""Times the methods of SpreadsheetData that are used for comparing and
+joining data sets (pyFoamCompareCSV.py, pyFoamJoinCSV.py etc). Usage:
+
+benchmarkSpreadsheetData.py [<nr of rows>]"""
+
+from PyFoam.Basics.SpreadsheetData import SpreadsheetData
+
+import numpy
+import sys,time
+
+nrRows=100000
+if len(sys.argv)>1:
+    nrRows=int(sys.argv[1])
+
+t1=numpy.linspace(0,100,nrRows)
+t2=numpy.linspace(-1,99,nrRows*3/4)
+
+def makeData(t):
+    return SpreadsheetData(data=numpy.array([t,numpy.sin(t),numpy.cos(t)]).T,
+                           names=["t","sin","cos"])
+
+data1=makeData(t1)
+data2=makeData(t2)
+
+def timeIt(name,func):
+    start=time.time()
+    func()
+    print "%-12s: %8.3f s" % (name,time.time()-start)
+
+print "Data sets with %d and %d rows" % (len(t1),len(t2))
+
+timeIt("call",lambda:[data1(t,"sin") for t in t2[:1000]])
+timeIt("resample",lambda:data1.resample(data2,"sin",extendData=True))
+timeIt("compare",lambda:data1.compare(data2,"sin"))
+timeIt("common",lambda:data1.compare(data2,"sin",common=True))
+timeIt("metrics",lambda:data1.metrics("sin"))
+timeIt("addTimes",lambda:makeData(t1).addTimes(t2,interpolate=True))
+
+# joining many probe-columns like pyFoamJoinCSV.py
+nrColumns=200
+data1=makeData(t1[::10])
+
+from tempfile import mkstemp
+from os import close,remove
+
+fd,csvName=mkstemp(suffix=".csv")
+close(fd)
+data1.writeCSV(csvName)
+
+timeIt("readCSV",lambda:SpreadsheetData(csvName=csvName))
+
+def appendColumns():
+    joined=SpreadsheetData(csvName=csvName)
+    for i in range(nrColumns):
+        joined.append("probe%d" % i,joined.resample(data2,"cos"))
+    return joined
+
+start=time.time()
+joined=appendColumns()
+print "%-12s: %8.3f s for %d columns" % ("append",time.time()-start,nrColumns)
+
+timeIt("writeCSV",lambda:joined.writeCSV(csvName))
+
+remove(csvName)
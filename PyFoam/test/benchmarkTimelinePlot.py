@@ -0,0 +1,70 @@
+
+"""Times the parts of pyFoamTimelinePlot.py that read the data of the
+probe-files (bars-mode and the metrics of the lines-mode) for a
+generated probes-directory"""
+
+from PyFoam.Applications.TimelinePlot import TimelinePlot
+from PyFoam.RunDictionary.TimelineDirectory import TimelineDirectory
+from PyFoam.Basics.DataFileCache import clearCache
+
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path,makedirs
+import sys,time
+
+nrTimes=20000
+nrProbes=50
+if len(sys.argv)>1:
+    nrTimes=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrProbes=int(sys.argv[2])
+
+tmpDir=mkdtemp()
+pDir=path.join(tmpDir,"probes","0")
+makedirs(pDir)
+
+header ="# x "+" ".join(["%d" % i for i in range(nrProbes)])+"\n"
+header+="# y "+" ".join(["0"]*nrProbes)+"\n"
+header+="# z "+" ".join(["0"]*nrProbes)+"\n"
+header+="#     Time\n"
+
+f=open(path.join(pDir,"p"),"w")
+f.write(header)
+for i in range(nrTimes):
+    f.write("%g "%(i*1e-3)+" ".join(["%g" % (i+j) for j in range(nrProbes)])+"\n")
+f.close()
+
+f=open(path.join(pDir,"U"),"w")
+f.write(header)
+for i in range(nrTimes):
+    f.write("%g "%(i*1e-3)+" ".join(["(%g 0 1)" % (i+j) for j in range(nrProbes)])+"\n")
+f.close()
+
+times=[]
+for i in range(10):
+    times+=["--time","%g" % (i*nrTimes*1e-4)]
+
+def timeIt(name,func):
+    start=time.time()
+    func()
+    print "%-30s: %8.3f s" % (name,time.time()-start)
+
+timeIt("timeRange",lambda:TimelineDirectory(tmpDir).timeRange())
+timeIt("timeRange (cached)",lambda:TimelineDirectory(tmpDir).timeRange())
+clearCache()
+timeIt("getData (10 times)",lambda:TimelineDirectory(tmpDir).getData([i*nrTimes*1e-4 for i in range(10)],value=["p"]))
+clearCache()
+timeIt("bars",lambda:TimelinePlot(args=[tmpDir,
+                                       "--basic-mode=bars",
+                                       "--fields=p",
+                                       "--gnuplot-file="+path.join(tmpDir,"bars.gnuplot")]+times))
+clearCache()
+timeIt("metrics",lambda:TimelinePlot(args=[tmpDir,
+                                          "--basic-mode=lines",
+                                          "--vector-mode=x",
+                                          "--metrics",
+                                          "--silent"]))
+
+print "%d times, %d probes" % (nrTimes,nrProbes)
+
+rmtree(tmpDir)
@@ -0,0 +1,67 @@
+"""Compares the cost of writing the timelines of a long run regularly:
+complete pickle every time (the old pickledPlots) against appending to
+a timeline store. Usage:
+
+benchmarkTimelineStore.py [<nr of writes> [<times between writes>]]"""
+
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry
+from PyFoam.Basics.TimelineStore import TimelineStore,readTimelineStore
+
+import cPickle as pickle
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path
+import sys,time
+
+nrWrites=200
+nrTimes=500
+if len(sys.argv)>1:
+    nrWrites=int(sys.argv[1])
+if len(sys.argv)>2:
+    nrTimes=int(sys.argv[2])
+
+names=["Ux","Uy","Uz","p","k","epsilon"]
+
+def run(write):
+    reg=TimeLinesRegistry()
+    col=TimeLineCollection(noEmptyTime=False,registry=reg)
+    used=0.
+    t=0
+    for w in range(nrWrites):
+        for i in range(nrTimes):
+            col.setTime(t)
+            for n in names:
+                col.setValue(n,t*0.5)
+            t+=1
+        start=time.time()
+        write(reg)
+        used+=time.time()-start
+    return used
+
+base=mkdtemp()
+pickleFile=path.join(base,"pickledPlots")
+storeFile=path.join(base,"timelineStore")
+
+def writePickle(reg):
+    pick=pickle.Pickler(open(pickleFile,"w"))
+    pick.dump(reg.prepareForTransfer())
+    pick.dump({})
+
+store=[None]
+def writeStore(reg):
+    if store[0]==None:
+        store[0]=TimelineStore(storeFile)
+    store[0].write(reg,{})
+
+print "%d writes with %d new times each" % (nrWrites,nrTimes)
+print "Complete pickle: %8.3f s" % run(writePickle)
+print "Timeline store:  %8.3f s" % run(writeStore)
+
+start=time.time()
+pickle.Unpickler(open(pickleFile)).load()
+print "Reading pickle:  %8.3f s (%.1f MB)" % (time.time()-start,path.getsize(pickleFile)/(1024.*1024.))
+start=time.time()
+readTimelineStore(storeFile)
+print "Reading store:   %8.3f s (%.1f MB)" % (time.time()-start,path.getsize(storeFile)/(1024.*1024.))
+
+rmtree(base)
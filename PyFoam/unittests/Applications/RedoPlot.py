@@ -0,0 +1,75 @@
+import unittest
+
+from PyFoam.Applications.RedoPlot import RedoPlot
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry
+from PyFoam.Basics.DummyPlotTimelines import DummyPlotTimelines
+from PyFoam.Basics.GeneralPlotTimelines import PlotLinesRegistry
+from PyFoam.Basics.CustomPlotInfo import CustomPlotInfo
+
+import cPickle as pickle
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path,makedirs,getcwd,chdir,listdir
+import sys
+
+theSuite=unittest.TestSuite()
+
+def writePickledPlots(fName,factor):
+    reg=TimeLinesRegistry()
+    col=TimeLineCollection(registry=reg)
+    for i in range(100):
+        col.setTime(i)
+        col.setValue("a",i*factor)
+    plots=PlotLinesRegistry()
+    DummyPlotTimelines(col,CustomPlotInfo(name="residuals"),registry=plots)
+    makedirs(path.dirname(fName))
+    fh=open(fName,"w")
+    pick=pickle.Pickler(fh)
+    pick.dump(reg.prepareForTransfer())
+    pick.dump(plots.prepareForTransfer())
+    fh.close()
+
+class RedoPlotTest(unittest.TestCase):
+    def setUp(self):
+        # other tests depend on the numbering of the plots
+        self.oldNr=CustomPlotInfo.nr
+        self.theDir=mkdtemp()
+        self.oldDir=getcwd()
+        chdir(self.theDir)
+        self.oldOut=sys.stdout
+        sys.stdout=open(path.join(self.theDir,"output"),"w")
+        for c in ["case1","case2"]:
+            writePickledPlots(path.join(c,"PyFoamRunner.foam.analyzed","pickledPlots"),
+                              int(c[-1]))
+
+    def tearDown(self):
+        sys.stdout.close()
+        sys.stdout=self.oldOut
+        chdir(self.oldDir)
+        rmtree(self.theDir)
+        CustomPlotInfo.nr=self.oldNr
+
+    def csvFiles(self):
+        return sorted([f for f in listdir(self.theDir) if f.endswith(".csv")])
+
+    def testSingleFile(self):
+        RedoPlot(args=["--pickle-file",
+                       "--implementation=dummy",
+                       "--with-csv-files",
+                       "case1/PyFoamRunner.foam.analyzed/pickledPlots"])
+        self.assertEqual(self.csvFiles(),["residuals.csv"])
+
+    def testBatch(self):
+        RedoPlot(args=["--pickle-file",
+                       "--implementation=dummy",
+                       "--with-csv-files",
+                       "--jobs=2",
+                       "case1/PyFoamRunner.foam.analyzed/pickledPlots",
+                       "case2/PyFoamRunner.foam.analyzed/pickledPlots"])
+        self.assertEqual(self.csvFiles(),
+                         ["case1_PyFoamRunner.foam_residuals.csv",
+                          "case2_PyFoamRunner.foam_residuals.csv"])
+        data=open("case2_PyFoamRunner.foam_residuals.csv").readlines()
+        self.assertEqual(float(data[-1].split(",")[-1]),99*2)
+
+theSuite.addTest(unittest.makeSuite(RedoPlotTest,"test"))
@@ -2,3 +2,7 @@
 import unittest
 
 theSuite=unittest.TestSuite()
+
+from RedoPlot import theSuite as RedoPlot
+
+theSuite.addTest(RedoPlot)
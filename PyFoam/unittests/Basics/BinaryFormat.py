@@ -0,0 +1,34 @@
+import unittest
+
+from PyFoam.Basics.BinaryFormat import archTypes,typeFromName,decodeList,encodeList,BinaryFormatError
+
+theSuite=unittest.TestSuite()
+
+class BinaryFormatTest(unittest.TestCase):
+    def testArchTypes(self):
+        self.assertEqual(archTypes(),("<i4","<f8"))
+        self.assertEqual(archTypes('"LSB;label=32;scalar=64"'),("<i4","<f8"))
+        self.assertEqual(archTypes("MSB;label=64;scalar=32"),(">i8",">f4"))
+        self.assertRaises(BinaryFormatError,
+                          (lambda:archTypes("LSB;label=16;scalar=64")))
+
+    def testTypeFromName(self):
+        self.assertEqual(typeFromName("List<vector>"),("scalar",3))
+        self.assertEqual(typeFromName("List<label>"),("label",1))
+        self.assertEqual(typeFromName("symmTensorField"),("scalar",6))
+        self.assertEqual(typeFromName("labelList"),("label",1))
+        self.assertEqual(typeFromName("List<word>"),None)
+        self.assertEqual(typeFromName(None),None)
+
+    def testRoundtrip(self):
+        lngth,data=encodeList([[1,2,3],[4,5,6]],">i4",">f8",basicType="scalar")
+        self.assertEqual(lngth,2)
+        self.assertEqual(len(data),2*3*8)
+        val=decodeList(data,2,">f8",3)
+        self.assertEqual(val.shape,(2,3))
+        self.assertEqual(val[1][2],6.)
+        self.assert_(val.flags.writeable)
+        lngth,data=encodeList([1,2,3],"<i4","<f8")
+        self.assertEqual(list(decodeList(data,3,"<i4")),[1,2,3])
+
+theSuite.addTest(unittest.makeSuite(BinaryFormatTest,"test"))
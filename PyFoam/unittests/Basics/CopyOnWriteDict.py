@@ -0,0 +1,65 @@
+import unittest
+import cPickle as pickle
+from copy import deepcopy
+
+from PyFoam.Basics.CopyOnWriteDict import CopyOnWriteDict,plainCopy
+
+theSuite=unittest.TestSuite()
+
+class CopyOnWriteDictTest(unittest.TestCase):
+    def setUp(self):
+        self.orig={"Linear":{"Ux":1.,"p":2.},"Continuity":{"Global":1e-5},"a":3}
+
+    def testRead(self):
+        d=CopyOnWriteDict(self.orig)
+        self.assertEqual(d["a"],3)
+        self.assertEqual(d["Linear"]["p"],2.)
+        self.assertEqual(len(d),3)
+        self.assert_("Continuity" in d)
+        self.assertEqual(d,self.orig)
+        self.assertEqual(sorted(d.keys()),sorted(self.orig.keys()))
+        self.assertEqual(dict(d.iteritems())["a"],3)
+        self.assert_(not d.isCopied())
+
+    def testNoSharedModification(self):
+        d1=CopyOnWriteDict(self.orig)
+        d2=CopyOnWriteDict(self.orig)
+        d1["a"]=4
+        d1["Linear"]["p"]=5.
+        del d1["Continuity"]
+        self.assert_(d1.isCopied())
+        self.assert_(not d2.isCopied())
+        self.assertEqual(d1["a"],4)
+        self.assertEqual(d1["Linear"]["p"],5.)
+        self.assert_("Continuity" not in d1)
+        self.assertEqual(self.orig["a"],3)
+        self.assertEqual(self.orig["Linear"]["p"],2.)
+        self.assert_("Continuity" in self.orig)
+        self.assertEqual(d2["Linear"]["p"],2.)
+
+    def testNestedOnlyCopied(self):
+        d=CopyOnWriteDict(self.orig)
+        d["Linear"]["Uy"]=3.
+        self.assert_(not d.isCopied())
+        self.assert_(d["Linear"].isCopied())
+        self.assertEqual(d.toDict()["Linear"]["Uy"],3.)
+        self.assert_("Uy" not in self.orig["Linear"])
+
+    def testPlain(self):
+        d=CopyOnWriteDict(self.orig)
+        d["Linear"]["p"]=5.
+        p=plainCopy({"analyzed":d,"lines":2})
+        self.assertEqual(type(p["analyzed"]),dict)
+        self.assertEqual(type(p["analyzed"]["Linear"]),dict)
+        self.assertEqual(p["analyzed"]["Linear"]["p"],5.)
+        self.assertEqual(type(deepcopy(d)),dict)
+
+    def testPickle(self):
+        d=CopyOnWriteDict(self.orig)
+        d["b"]=2
+        p=pickle.loads(pickle.dumps(d))
+        self.assertEqual(type(p),dict)
+        self.assertEqual(p["b"],2)
+        self.assertEqual(p["Linear"],self.orig["Linear"])
+
+theSuite.addTest(unittest.makeSuite(CopyOnWriteDictTest,"test"))
@@ -0,0 +1,63 @@
+import unittest
+
+from PyFoam.Basics import DataFileCache
+from PyFoam.Basics.DataFileCache import parseDataFile,cachedDataFile,clearCache
+
+from tempfile import mkstemp
+from os import unlink,close
+
+theSuite=unittest.TestSuite()
+
+class DataFileCacheTest(unittest.TestCase):
+    def setUp(self):
+        fd,self.fName=mkstemp()
+        close(fd)
+
+    def tearDown(self):
+        unlink(self.fName)
+        clearCache()
+
+    def write(self,txt,mode="w"):
+        open(self.fName,mode).write(txt)
+
+    def testParseComplete(self):
+        self.write("# Time p\n#\n0 (1 2 3) 4\n1 (5 6 7) 8\n")
+        data,lengths=parseDataFile(self.fName)
+        self.assertEqual(lengths,None)
+        self.assertEqual(data.tolist(),[[0,1,2,3,4],[1,5,6,7,8]])
+
+    def testParseIncomplete(self):
+        self.write("0 1 2\n# restart\n\n1 a 3\n2 4")
+        data,lengths=parseDataFile(self.fName)
+        self.assertEqual(lengths.tolist(),[3,3,2])
+        self.assertEqual(data[0].tolist(),[0,1,2])
+        self.assertEqual(data[1,2],3)
+        self.assert_(data[1,1]!=data[1,1])
+        self.assert_(data[2,2]!=data[2,2])
+
+    def testParseEmpty(self):
+        self.write("# nothing\n")
+        data,lengths=parseDataFile(self.fName)
+        self.assertEqual(len(data),0)
+
+    def testCacheFileChanged(self):
+        self.write("0 1\n")
+        first=cachedDataFile(self.fName)
+        self.assert_(cachedDataFile(self.fName) is first)
+        self.write("1 2\n","a")
+        second=cachedDataFile(self.fName)
+        self.assert_(second is not first)
+        self.assertEqual(second["data"].tolist(),[[0,1],[1,2]])
+
+    def testCacheSize(self):
+        self.write("0 1\n")
+        old=DataFileCache.maxCacheSize
+        try:
+            DataFileCache.maxCacheSize=0
+            first=cachedDataFile(self.fName)
+            # the last entry is always kept
+            self.assert_(cachedDataFile(self.fName) is first)
+        finally:
+            DataFileCache.maxCacheSize=old
+
+theSuite.addTest(unittest.makeSuite(DataFileCacheTest,"test"))
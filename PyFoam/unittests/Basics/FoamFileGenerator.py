@@ -206,6 +206,37 @@ class FoamFileGeneratorUnparsedList(unittest.TestCase):
                 
 theSuite.addTest(unittest.makeSuite(FoamFileGeneratorUnparsedList,"test"))
 
+class FoamFileGeneratorNumpyArray(unittest.TestCase):
+    def testScalarArray(self):
+        import numpy
+        g=FoamFileGenerator(numpy.array([1.5,2,3]))
+        self.assertEqual(str(g),"(\n  1.5\n  2\n  3\n)\n")
+    def testLabelArray(self):
+        import numpy
+        g=FoamFileGenerator(numpy.arange(3))
+        self.assertEqual(str(g),"(\n  0\n  1\n  2\n)\n")
+    def testVectorArray(self):
+        import numpy
+        g=FoamFileGenerator(numpy.array([[1.,2,3],[4,5,6.5]]))
+        self.assertEqual(str(g),"(\n  (1 2 3)\n  (4 5 6.5)\n)\n")
+    def testLongArray(self):
+        import numpy
+        g=FoamFileGenerator(numpy.zeros(30))
+        self.assertEqual(str(g)[:7],"30\n(\n  ")
+    def testArrayDict(self):
+        import numpy
+        g=FoamFileGenerator({"a":numpy.array([1,2]),"b":"nix"})
+        self.assertEqual(str(g),"a\n  (\n    1\n    2\n  );\nb nix;\n")
+    def testSameAsList(self):
+        import numpy
+        lst=[[1.,2,3],[4,5,6],[7,8,9],[0.5,0.25,0.125]]
+        val=FoamStringParser("a nonuniform List<vector> 4%s;" % makeString(lst))["a"]
+        aVal=FoamStringParser("a nonuniform List<vector> 4%s;" % makeString(lst),
+                              listLengthNumpy=1)["a"]
+        self.assertEqual(str(val),str(aVal))
+                
+theSuite.addTest(unittest.makeSuite(FoamFileGeneratorNumpyArray,"test"))
+
 class FoamFileGeneratorRoundtrip(unittest.TestCase):
     def setUp(self):
         self.theFile=tmpnam()
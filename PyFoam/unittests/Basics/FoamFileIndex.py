@@ -0,0 +1,47 @@
+import unittest
+
+from PyFoam.Basics.FoamFileIndex import indexDictionary,FoamFileIndexError
+
+theSuite=unittest.TestSuite()
+
+class FoamFileIndexTest(unittest.TestCase):
+    def testSimpleEntries(self):
+        txt="a 1;\nb (1 2 3);\nc { d 2; }\n"
+        e=indexDictionary(txt)
+        self.assertEqual([x.key for x in e],["a","b","c"])
+        self.assertEqual(txt[e[1].keyStart:e[1].end],"b (1 2 3);")
+        self.assert_(e[2].isDict())
+        self.assertEqual(txt[e[2].bodyStart:e[2].bodyEnd]," d 2; ")
+
+    def testSkipComments(self):
+        txt="// a 1;\n/* b {; */ c \"x;}\"; // d\n e #{ ; } #};"
+        e=indexDictionary(txt)
+        self.assertEqual([x.key for x in e],["c","e"])
+        self.assertEqual(txt[e[0].start:e[0].end],txt[:txt.find('"; //')+2])
+
+    def testNestedLists(self):
+        txt="a 2(3(1 2 3) 3(4 5 6)); div(phi,U) Gauss linear; b (x { y 1; });"
+        e=indexDictionary(txt)
+        self.assertEqual([x.key for x in e],["a","div(phi,U)","b"])
+
+    def testLongList(self):
+        txt="a 1000\n("+"(1 2 3)\n"*1000+");\nb 2;"
+        e=indexDictionary(txt)
+        self.assertEqual([x.key for x in e],["a","b"])
+
+    def testDirective(self):
+        e=indexDictionary('#include "nix"\na 1;')
+        self.assertEqual([x.key for x in e],['#include "nix"',"a"])
+        self.assert_(e[0].isDirective())
+
+    def testMaxEntries(self):
+        e=indexDictionary("a 1; b 2; c 3;",maxEntries=2)
+        self.assertEqual(len(e),2)
+        
+    def testUnbalanced(self):
+        self.assertRaises(FoamFileIndexError,
+                          (lambda:indexDictionary("a (1 2;")))
+        self.assertRaises(FoamFileIndexError,
+                          (lambda:indexDictionary("a { b 1;")))
+
+theSuite.addTest(unittest.makeSuite(FoamFileIndexTest,"test"))
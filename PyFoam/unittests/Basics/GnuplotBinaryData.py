@@ -0,0 +1,62 @@
+import unittest
+
+from PyFoam.Basics.GnuplotBinaryData import BinaryTimelineFile,BinaryTimelineItem
+
+from array import array
+from tempfile import mkdtemp
+from shutil import rmtree
+from os import path
+import numpy
+
+theSuite=unittest.TestSuite()
+
+class BinaryTimelineFileTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir=mkdtemp()
+        self.theFile=path.join(self.theDir,"data")
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def content(self):
+        return numpy.fromfile(self.theFile,dtype=numpy.float64).reshape((-1,2))
+
+    def testUpdate(self):
+        f=BinaryTimelineFile(self.theFile)
+        times=array('d',range(100))
+        values=array('d',[t*2 for t in times])
+        self.assertEqual(f.update(times,values),100)
+        self.assertEqual(list(self.content()[:,0]),list(times))
+        self.assertEqual(list(self.content()[:,1]),list(values))
+        self.assertEqual(f.bytesWritten,100*16)
+
+        # only the new points and the changed last point are written
+        values[-1]=-1
+        times.extend(range(100,110))
+        values.extend(range(10))
+        self.assertEqual(f.update(times,values),110)
+        self.assertEqual(f.bytesWritten,111*16)
+        self.assertEqual(list(self.content()[:,1]),list(values))
+
+        # nothing changed
+        f.update(times,values)
+        self.assertEqual(f.bytesWritten,111*16)
+
+        # shorter data: the file is not truncated
+        self.assertEqual(f.update(times[:50],values[:50]),50)
+        self.assertEqual(f.bytesWritten,111*16)
+        self.assertEqual(len(self.content()),110)
+        self.assertEqual(f.update(times[:50],[0]*50),50)
+        self.assertEqual(list(self.content()[:50,1]),[0]*50)
+
+        f.close()
+        self.assert_(not path.exists(self.theFile))
+
+    def testItem(self):
+        it=BinaryTimelineItem(self.theFile,42,title="p",with_="lines")
+        cmd=it.command()
+        self.assertEqual(cmd.find('"%s" binary record=42 format="%%float64%%float64"' % self.theFile),0)
+        self.assert_(cmd.find("using 1:2")>0)
+        self.assert_(cmd.find('title "p"')>0)
+
+theSuite.addTest(unittest.makeSuite(BinaryTimelineFileTest,"test"))
@@ -0,0 +1,62 @@
+import unittest
+
+from PyFoam.Basics.LineReader import LineReader
+
+from StringIO import StringIO
+from tempfile import TemporaryFile
+import os
+
+theSuite=unittest.TestSuite()
+
+class LineReaderTest(unittest.TestCase):
+    def testReadLine(self):
+        r=LineReader()
+        f=StringIO("  a line \nsecond")
+        self.assert_(r.read(f))
+        self.assertEqual(r.line,"a line")
+        self.assert_(r.read(f))
+        self.assertEqual(r.line,"second")
+        self.assert_(not r.read(f))
+        self.assertEqual(r.bytesRead(),16)
+
+    def testReadLinesChunks(self):
+        r=LineReader()
+        f=StringIO("a\n b \nc\r\nlong line without end")
+        self.assert_(r.readLines(f,size=7))
+        self.assertEqual(r.lines,["a","b"])
+        self.assertEqual(r.line,"b")
+        self.assert_(r.readLines(f,size=7))
+        self.assertEqual(r.lines,["c"])
+        lines=[]
+        while r.readLines(f,size=7):
+            lines+=r.lines
+        self.assertEqual(lines,["long line without end"])
+        self.assertEqual(r.lines,[])
+        self.assertEqual(r.bytesRead(),30)
+
+    def testReadLinesFile(self):
+        f=TemporaryFile()
+        f.write("".join(["line %d\n" % i for i in range(10000)]))
+        f.seek(0)
+        r=LineReader()
+        lines=[]
+        while r.readLines(f):
+            lines+=r.lines
+        self.assertEqual(len(lines),10000)
+        self.assertEqual(lines[-1],"line 9999")
+
+    def testReadLinesPipe(self):
+        rd,wr=os.pipe()
+        rd=os.fdopen(rd,"r",0)
+        os.write(wr,"first\nsec")
+        r=LineReader()
+        # only the data that is there is returned
+        self.assert_(r.readLines(rd))
+        self.assertEqual(r.lines,["first"])
+        os.write(wr,"ond\n")
+        os.close(wr)
+        self.assert_(r.readLines(rd))
+        self.assertEqual(r.lines,["second"])
+        self.assert_(not r.readLines(rd))
+
+theSuite.addTest(unittest.makeSuite(LineReaderTest,"test"))
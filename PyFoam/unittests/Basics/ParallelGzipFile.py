@@ -0,0 +1,63 @@
+import unittest
+
+from PyFoam.Basics.ParallelGzipFile import ParallelGzipFile,compressMember
+
+from os import path,remove,getpid
+import gzip,random
+from StringIO import StringIO
+
+theSuite=unittest.TestSuite()
+
+def someData(size):
+    r=random.Random(42)
+    words=["alpha","beta","gamma","%g","\n"]
+    result=[]
+    l=0
+    while l<size:
+        w=r.choice(words)
+        if w=="%g":
+            w=w % r.random()
+        result.append(w+" ")
+        l+=len(w)+1
+    return "".join(result)[:size]
+
+class ParallelGzipFileTest(unittest.TestCase):
+    def setUp(self):
+        self.theFile="/tmp/test.parallelGzip.%d.gz" % getpid()
+
+    def tearDown(self):
+        if path.exists(self.theFile):
+            remove(self.theFile)
+
+    def checkRoundTrip(self,threads,blockSize,pieces):
+        data=someData(100000)
+        f=ParallelGzipFile(self.theFile,threads=threads,blockSize=blockSize)
+        for i in range(0,len(data),pieces):
+            f.write(data[i:i+pieces])
+        f.close()
+        self.assertEqual(gzip.open(self.theFile).read(),data)
+
+    def testSerial(self):
+        self.checkRoundTrip(1,4096,1000)
+
+    def testThreads(self):
+        self.checkRoundTrip(3,4096,1000)
+        self.checkRoundTrip(4,1000,7777)
+        self.checkRoundTrip(2,1000000,100)
+
+    def testEmpty(self):
+        ParallelGzipFile(self.theFile,threads=2).close()
+        self.assertEqual(gzip.open(self.theFile).read(),"")
+
+    def testFileObj(self):
+        out=StringIO()
+        f=ParallelGzipFile(fileobj=out,threads=2,blockSize=10)
+        f.write("Hello world, this is more than a block")
+        f.close()
+        self.assertEqual(gzip.GzipFile(fileobj=StringIO(out.getvalue())).read(),
+                         "Hello world, this is more than a block")
+
+    def testMember(self):
+        self.assertEqual(gzip.GzipFile(fileobj=StringIO(compressMember("abc"))).read(),"abc")
+
+theSuite.addTest(unittest.makeSuite(ParallelGzipFileTest,"test"))
@@ -0,0 +1,65 @@
+import unittest
+
+from PyFoam.Basics.ParallelRemover import ParallelRemover,removeTree
+
+from os import path,mkdir,link,symlink,getpid,listdir
+from shutil import rmtree
+
+theSuite=unittest.TestSuite()
+
+class ParallelRemoverTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir="/tmp/test.parallelRemover.%d" % getpid()
+        self.keep=self.theDir+".keep"
+        for d in [self.theDir,self.keep]:
+            if path.exists(d):
+                rmtree(d)
+            mkdir(d)
+        open(path.join(self.keep,"k"),"w").write("k"*10000)
+        for i in range(20):
+            d=path.join(self.theDir,"d%d" % i)
+            mkdir(d)
+            mkdir(path.join(d,"sub"))
+            open(path.join(d,"f"),"w").write("x"*10000)
+            open(path.join(d,"sub","g"),"w").write("y"*10000)
+        link(path.join(self.keep,"k"),path.join(self.theDir,"d0","k"))
+        symlink(self.keep,path.join(self.theDir,"d1","link"))
+        open(path.join(self.theDir,"file"),"w").write("z")
+
+    def tearDown(self):
+        for d in [self.theDir,self.keep]:
+            if path.exists(d):
+                rmtree(d)
+
+    def checkRemove(self,jobs):
+        dry=ParallelRemover(jobs=jobs,dryRun=True)
+        dry.add(self.theDir)
+        freed=dry.run()
+        self.assert_(path.exists(path.join(self.theDir,"d3","sub","g")))
+        self.assertEqual(dry.files,20*4+4)
+        self.assert_(freed>=20*2*10000)
+
+        rem=ParallelRemover(jobs=jobs,batch=2)
+        rem.add(self.theDir)
+        # already removed with the directory
+        rem.add(path.join(self.theDir,"d1"))
+        rem.add(path.join(self.theDir,"doesNotExist"))
+        self.assertEqual(rem.run(),freed)
+        self.assertEqual(rem.files,dry.files)
+        self.assert_(not path.exists(self.theDir))
+        # the link is not followed and the hardlinked data is kept
+        self.assertEqual(open(path.join(self.keep,"k")).read(),"k"*10000)
+        self.assertEqual(rem.run(),0)
+
+    def testSerial(self):
+        self.checkRemove(1)
+
+    def testThreads(self):
+        self.checkRemove(4)
+
+    def testFile(self):
+        self.assertEqual(removeTree(path.join(self.theDir,"file"))[0],1)
+        self.assert_(not path.exists(path.join(self.theDir,"file")))
+        self.assertEqual(removeTree(path.join(self.theDir,"file")),(0,0))
+
+theSuite.addTest(unittest.makeSuite(ParallelRemoverTest,"test"))
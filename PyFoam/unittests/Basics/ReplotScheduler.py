@@ -0,0 +1,77 @@
+import unittest
+
+from PyFoam.Basics.ReplotScheduler import ReplotScheduler
+
+from time import time,sleep
+from threading import currentThread
+
+theSuite=unittest.TestSuite()
+
+class SlowPlot(object):
+    def __init__(self,duration=0.):
+        self.duration=duration
+        self.count=0
+        self.threads=set()
+
+    def redo(self):
+        self.threads.add(currentThread().getName())
+        sleep(self.duration)
+        self.count+=1
+
+class ReplotSchedulerTest(unittest.TestCase):
+    def testCoalesce(self):
+        plots={"a":SlowPlot(0.2),"b":SlowPlot()}
+        sched=ReplotScheduler(plots,maxFrameRate=None)
+        start=time()
+        for i in range(20):
+            sched.request()
+            sleep(0.01)
+        # the caller did not wait for the plotting
+        self.assert_(time()-start<0.2*2)
+        sched.stop()
+        self.assert_(sched.frames<=4)
+        self.assertEqual(sched.frames+sched.dropped,20)
+        self.assertEqual(plots["a"].count,sched.frames)
+        self.assertEqual(plots["b"].count,sched.frames)
+        self.assertEqual(plots["a"].threads,set(["ReplotScheduler"]))
+        self.assert_(sched.maxLatency>=0.2)
+
+    def testFrameRate(self):
+        plot=SlowPlot()
+        sched=ReplotScheduler([plot],maxFrameRate=10)
+        start=time()
+        while time()-start<0.5:
+            sched.request()
+            sleep(0.001)
+        sched.stop()
+        self.assert_(sched.frames<=8)
+        self.assert_(sched.frames>=3)
+        self.assertEqual(sched.frames+sched.dropped,sched.requests)
+
+    def testSynchronous(self):
+        plot=SlowPlot()
+        sched=ReplotScheduler([plot],maxFrameRate=1,threaded=False)
+        sched.request()
+        self.assertEqual(plot.count,1)
+        sched.request()
+        sched.request()
+        self.assertEqual(plot.count,1)
+        self.assertEqual(sched.dropped,1)
+        # the last request is not lost
+        sched.stop()
+        self.assertEqual(plot.count,2)
+        self.assertEqual(plot.threads,set([currentThread().getName()]))
+        sched.stop()
+        self.assertEqual(plot.count,2)
+
+    def testRequestAfterStop(self):
+        plot=SlowPlot()
+        sched=ReplotScheduler([plot])
+        sched.request()
+        sched.stop()
+        self.assertEqual(plot.count,1)
+        sched.request()
+        self.assertEqual(plot.count,2)
+        self.assert_(sched.report().find("2 replots for 2 requests")==0)
+
+theSuite.addTest(unittest.makeSuite(ReplotSchedulerTest,"test"))
@@ -271,3 +271,295 @@ class SpreadsheetReadFileTest(unittest.TestCase):
         self.assertEqual(len(sp.names()),4)
 
 theSuite.addTest(unittest.makeSuite(SpreadsheetReadFileTest,"test"))
+
+# Reference implementations of the evaluation (one value at a time). Used
+# to check that the vectorized methods give exactly the same results
+
+def referenceValue(x,y,t,invalidExtend=False,noInterpolation=False):
+    if t<x[0]:
+        if invalidExtend:
+            return y[0]
+        else:
+            return float('nan')
+    elif t>x[-1]:
+        if invalidExtend:
+            return y[-1]
+        else:
+            return float('nan')
+    if noInterpolation:
+        if t==x[0]:
+            return y[0]
+        elif t==x[-1]:
+            return y[-1]
+    iLow=0
+    iHigh=len(x)-1
+    while (iHigh-iLow)>1:
+        iNew = iLow + (iHigh-iLow)/2
+        if x[iNew]==t:
+            return y[iNew]
+        elif t < x[iNew]:
+            iHigh=iNew
+        else:
+            iLow=iNew
+    if noInterpolation:
+        return float('nan')
+    else:
+        return y[iLow] + (y[iHigh]-y[iLow])*(t-x[iLow])/(x[iHigh]-x[iLow])
+
+def referenceAddTimes(x,y,times,interpolate,invalidExtend):
+    newX,newY=[],[]
+    i=0
+    for t in times:
+        while i<len(x) and t>x[i]:
+            newX.append(x[i])
+            newY.append(y[i])
+            i+=1
+        if i<len(x) and t==x[i]:
+            newX.append(x[i])
+            newY.append(y[i])
+            i+=1
+        else:
+            newX.append(t)
+            if interpolate:
+                newY.append(referenceValue(x,y,t,invalidExtend=invalidExtend))
+            else:
+                newY.append(float('nan'))
+    return newX+list(x[i:]),newY+list(y[i:])
+
+def referenceCompare(x,y,y2,minT,maxT):
+    maxDiff=0
+    maxPos=x[0]
+    sumDiff=0
+    sumWeighted=0
+    cnt=0
+    for i,t in enumerate(x):
+        if t<minT or t>maxT:
+            continue
+        cnt+=1
+        diff=abs(y[i]-y2[i])
+        if diff>maxDiff:
+            maxDiff=diff
+            maxPos=x[i]
+        sumDiff+=diff
+        weight=0
+        if t>minT:
+            weight+=(t-x[i-1])/2
+        if t<maxT:
+            weight+=(x[i+1]-t)/2
+        sumWeighted+=weight*diff
+    return { "max" : maxDiff,
+             "maxPos" : maxPos,
+             "average" : sumDiff/cnt,
+             "wAverage" : sumWeighted/(maxT-minT),
+             "tMin": minT,
+             "tMax": maxT}
+
+def referenceMetrics(x,y):
+    minVal=1e40
+    maxVal=-1e40
+    sum=0
+    sumWeighted=0
+    for i,t in enumerate(x):
+        val=y[i]
+        maxVal=max(val,maxVal)
+        minVal=min(val,minVal)
+        sum+=val
+        weight=0
+        if i>0:
+            weight+=(t-x[i-1])/2
+        if i<(len(x)-1):
+            weight+=(x[i+1]-t)/2
+        sumWeighted+=weight*val
+    return { "max" : maxVal,
+             "min" : minVal,
+             "average" : sum/len(x),
+             "wAverage" : sumWeighted/(x[-1]-x[0]),
+             "tMin": x[0],
+             "tMax": x[-1]}
+
+import random
+import numpy
+
+def randomData(rnd,withNan=False):
+    n=rnd.randint(1,40)
+    # some times are integers so that there are duplicates and exact hits
+    times=sorted([rnd.choice([rnd.random()*10,float(rnd.randint(0,10))]) for i in range(n)])
+    vals=[rnd.random() for i in range(n)]
+    if withNan:
+        vals[rnd.randint(0,n-1)]=float('nan')
+    return SpreadsheetData(data=numpy.array([times,vals]).T,names=['t','val'])
+
+class SpreadsheetVectorizedTest(unittest.TestCase):
+    def assertSame(self,a,b):
+        if isinstance(a,dict):
+            self.assertEqual(sorted(a.keys()),sorted(b.keys()))
+            for k in a:
+                self.assertSame(a[k],b[k])
+            return
+        a=numpy.asarray(a,dtype=float)
+        b=numpy.asarray(b,dtype=float)
+        self.assertEqual(a.shape,b.shape)
+        self.assert_(numpy.all((a==b) | (numpy.isnan(a) & numpy.isnan(b))),"%s != %s" % (a,b))
+
+    def setUp(self):
+        self.rnd=random.Random(42)
+        self.oldErr=numpy.seterr(all="ignore")
+
+    def tearDown(self):
+        numpy.seterr(**self.oldErr)
+
+    def testEvaluate(self):
+        for i in range(100):
+            sp=randomData(self.rnd,withNan=(i%3==0))
+            x,y=sp.data['t'],sp.data['val']
+            times=list(randomData(self.rnd).data['t'])+[-1,11]+list(x)
+            for invalidExtend in [False,True]:
+                for noInterpolation in [False,True]:
+                    ref=[referenceValue(x,y,t,
+                                        invalidExtend=invalidExtend,
+                                        noInterpolation=noInterpolation) for t in times]
+                    self.assertSame(ref,sp.evaluate(times,'val',
+                                                    invalidExtend=invalidExtend,
+                                                    noInterpolation=noInterpolation))
+                    self.assertSame(ref[0],sp(times[0],'val',
+                                              invalidExtend=invalidExtend,
+                                              noInterpolation=noInterpolation))
+
+    def testResample(self):
+        for i in range(100):
+            sp=randomData(self.rnd)
+            other=randomData(self.rnd,withNan=(i%3==0))
+            ox,oy=other.data['t'],other.data['val']
+            for extendData in [False,True]:
+                sp2=SpreadsheetData(data=sp.data.copy(),names=sp.names())
+                res=sp2.resample(other,'val',invalidExtend=True,extendData=extendData)
+                ref=[referenceValue(ox,oy,t,invalidExtend=True) for t in sp2.data['t']]
+                self.assertSame(ref,res)
+                if extendData:
+                    x=sp.data['t']
+                    pre=[t for t in ox if t<x[0]]
+                    post=[t for t in ox if t>x[-1]]
+                    self.assertSame(pre+list(x)+post,sp2.data['t'])
+                    self.assertEqual(numpy.isnan(sp2.data['val']).sum(),len(pre)+len(post))
+                else:
+                    self.assertSame(sp.data['t'],sp2.data['t'])
+
+    def testAddTimes(self):
+        for i in range(100):
+            sp=randomData(self.rnd,withNan=(i%3==0))
+            times=randomData(self.rnd).data['t']
+            for interpolate in [False,True]:
+                for invalidExtend in [False,True]:
+                    sp2=SpreadsheetData(data=sp.data.copy(),names=sp.names())
+                    sp2.addTimes(times,interpolate=interpolate,invalidExtend=invalidExtend)
+                    x,y=referenceAddTimes(sp.data['t'],sp.data['val'],times,
+                                          interpolate,invalidExtend)
+                    self.assertSame(x,sp2.data['t'])
+                    self.assertSame(y,sp2.data['val'])
+
+    def testCompare(self):
+        for i in range(100):
+            sp=randomData(self.rnd,withNan=(i%3==0))
+            other=randomData(self.rnd)
+            x,y=sp.data['t'],sp.data['val']
+            y2=[referenceValue(other.data['t'],other.data['val'],t,invalidExtend=True) for t in x]
+            self.assertSame(referenceCompare(x,y,y2,x[0],x[-1]),
+                            sp.compare(other,'val'))
+            res=sp.compare(other,'val',common=True)
+            inside=[t for t in x if t>=other.data['t'][0] and t<=other.data['t'][-1]]
+            if len(inside)==0:
+                self.assertEqual(res["max"],None)
+            else:
+                self.assertSame(referenceCompare(x,y,y2,inside[0],inside[-1]),res)
+
+    def testMetrics(self):
+        for i in range(100):
+            sp=randomData(self.rnd,withNan=(i%2==0))
+            self.assertSame(referenceMetrics(sp.data['t'],sp.data['val']),
+                            sp.metrics('val'))
+
+theSuite.addTest(unittest.makeSuite(SpreadsheetVectorizedTest,"test"))
+
+from PyFoam.Basics.SpreadsheetData import readColumns,WrongDataSize
+
+class SpreadsheetColumnsTest(unittest.TestCase):
+    def testAppendDoesNotCopy(self):
+        sp=SpreadsheetData(data=data1,names=names1)
+        t=sp.column('t')
+        sp.append("test",[i*i for i in range(len(data1))])
+        self.assert_(t is sp.column('t'))
+        self.assertEqual(list(sp.names()),names1+["test"])
+        self.assertEqual(sp.data["test"][2],4)
+        self.assertRaises(WrongDataSize,sp.append,"short",[1,2])
+
+    def testAppendDuplicate(self):
+        sp=SpreadsheetData(data=data1,names=names1)
+        sp.append("p1",[-1]*len(data1),allowDuplicates=True)
+        self.assertEqual(sp.names()[-1],"p1_1")
+        self.assertEqual(sp.data["p1_1"][0],-1)
+        self.assertEqual(sp.data["p1"][1],2)
+
+    def testRemoveColumn(self):
+        sp=SpreadsheetData(data=data1,names=names1)
+        sp.data
+        sp.removeColumn("p1")
+        self.assertEqual(sp.names(),("t","p2"))
+        self.assertEqual(sp.data.dtype.names,("t","p2"))
+        self.assertEqual(sp.data["p2"][1],3)
+
+    def testColumnsConstruction(self):
+        t=numpy.arange(5.)
+        sp=SpreadsheetData(columns=[t,t*t],names=["t","sq"])
+        self.assert_(sp.column("t") is t)
+        self.assertEqual(sp.size(),5)
+        self.assertEqual(sp.data["sq"][3],9)
+        self.assertRaises(WrongDataSize,SpreadsheetData,columns=[t,t[:3]],names=["t","x"])
+
+    def testDataIsShared(self):
+        sp=SpreadsheetData(data=data1,names=names1)
+        sp.data["p1"][0]=42
+        self.assertEqual(sp.column("p1")[0],42)
+        sp.column("p2")[0]=43
+        self.assertEqual(sp.data["p2"][0],43)
+
+    def testStructuredArrayIsNotModified(self):
+        orig=numpy.array([(1,2),(3,4)],dtype=[('t','i4'),('v','i4')])
+        sp=SpreadsheetData(data=orig,names=["time","val"])
+        self.assertEqual(sp.names(),("time","val"))
+        self.assertEqual(sp.data.dtype["val"],numpy.dtype('f8'))
+        sp.data["val"][0]=99
+        self.assertEqual(orig.dtype.names,('t','v'))
+        self.assertEqual(list(orig['v']),[2,4])
+        self.assertEqual(orig.dtype['v'],numpy.dtype('i4'))
+
+        sp=SpreadsheetData(data=orig.astype([('t','f8'),('v','f8')]),names=["time","val"])
+        self.assertEqual(sp.names(),("time","val"))
+        self.assertEqual(orig.dtype.names,('t','v'))
+
+    def testJoin(self):
+        sp1=SpreadsheetData(data=data1,names=names1)
+        sp2=SpreadsheetData(data=data2,names=names2,title="nix")
+        sp=sp1+sp2
+        self.assertEqual(sp.names(),("t","p1","p2","nix p1","nix p3","nix p4"))
+        self.assertEqual(sp.data["nix p4"][1],4)
+
+    def testReadColumnsNames(self):
+        # names are the same as the ones numpy.recfromcsv produces
+        names,cols=readColumns(StringIO("Time,p (a),Return\n1,2,3\n4,5,6\n"),delimiter=",")
+        self.assertEqual(names,['time', 'p_a', 'return_'])
+        self.assertEqual(list(cols[2]),[3,6])
+        names,cols=readColumns(StringIO(filecontent))
+        self.assertEqual(names,['time','Initial','Final','Iterations'])
+        self.assertEqual(len(cols[0]),5)
+        self.assert_(cols[0].flags.c_contiguous)
+
+    def testReadColumnsFallback(self):
+        self.assertEqual(readColumns(StringIO("t,a\n1,2\n3,\n"),delimiter=","),None)
+        self.assertEqual(readColumns(StringIO("# t a\n1 2\n# no\n3 4\n")),None)
+        sp=SpreadsheetData(csvName=StringIO("t,a\n1,2.5\n3,\n"))
+        self.assertEqual(sp.size(),2)
+        self.assert_(math.isnan(sp.data["a"][1]))
+        sp=SpreadsheetData(txtName=StringIO("# t a\n1 2\n# no\n3 4\n"))
+        self.assertEqual(list(sp.data["a"]),[2,4])
+
+theSuite.addTest(unittest.makeSuite(SpreadsheetColumnsTest,"test"))
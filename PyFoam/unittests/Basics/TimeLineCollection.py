@@ -0,0 +1,194 @@
+import unittest
+from threading import Thread
+
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry,signedMax
+
+theSuite=unittest.TestSuite()
+
+def fill(col,nr,names=["a","b"]):
+    for i in range(nr):
+        col.setTime(i)
+        for j,n in enumerate(names):
+            col.setValue(n,(j+1)*i*(-1)**i)
+
+class TimeLineCollectionTest(unittest.TestCase):
+    def setUp(self):
+        self.reg=TimeLinesRegistry()
+
+    def testStore(self):
+        col=TimeLineCollection(noEmptyTime=False,registry=self.reg)
+        fill(col,10)
+        self.assertEqual(list(col.getTimes()),range(10))
+        self.assertEqual(col.getValues("b")[3],-6)
+        self.assertEqual(col.getLatestData(),{"a":-9.,"b":-18.})
+        self.assertEqual(len(col.getValues("c")),10)
+
+    def testAccumulate(self):
+        col=TimeLineCollection(noEmptyTime=False,registry=self.reg,accumulation="last")
+        col.setAccumulator("s","sum")
+        col.setTime(1)
+        for i in range(3):
+            col.setValue("c",1)
+            col.setValue("s",i)
+        self.assertEqual(col.getValues("c")[-1],1)
+        self.assertEqual(col.getValues("s")[-1],3)
+
+    def testSplit(self):
+        col=TimeLineCollection(noEmptyTime=False,registry=self.reg,splitThres=10)
+        fill(col,10)
+        self.assertEqual(list(col.getTimes()),[0,2,4,6,8])
+        # the last value was set after the splitting
+        self.assertEqual(list(col.getValues("a")),[-0.5,-0.5,-0.5,-0.5,-9])
+
+    def testSplitFunctions(self):
+        col=TimeLineCollection(noEmptyTime=False,registry=self.reg,splitThres=10,splitFun=signedMax)
+        fill(col,10)
+        self.assertEqual(list(col.getValues("b")),[-2,-6,-10,-14,-18])
+        col=TimeLineCollection(noEmptyTime=False,registry=self.reg,splitThres=10,splitFun=lambda x,y:x)
+        fill(col,10)
+        self.assertEqual(list(col.getValues("b")),[0,4,8,12,-18])
+
+    def testAdvancedSplit(self):
+        col=TimeLineCollection(noEmptyTime=False,registry=self.reg,splitThres=20,advancedSplit=True)
+        fill(col,20)
+        self.assertEqual(list(col.getTimes()),
+                         [0,2,4,6,8,10,12,14,16,17,18,19])
+        # maximum and minimum of the windows are preserved in the right order
+        self.assertEqual(list(col.getValues("a")),
+                         [2,-3,6,-7,10,-11,14,-15,16,-17,18,-19])
+        for i in range(20,200):
+            col.setTime(i)
+            col.setValue("a",i)
+        self.assertEqual(len(col.getTimes()),len(col.getValues("a")))
+        self.assert_(len(col.getTimes())<20)
+
+    def testGetData(self):
+        col=TimeLineCollection(noEmptyTime=False,registry=self.reg)
+        fill(col,5)
+        data=col.getData()
+        self.assertEqual(list(data.names()),["time","a","b"])
+        self.assertEqual(list(data.data["b"]),[0,-2,4,-6,8])
+        self.assertEqual(data.size(),5)
+
+    def testTransfer(self):
+        col=TimeLineCollection(noEmptyTime=False,registry=self.reg)
+        fill(col,5)
+        data=self.reg.prepareForTransfer()[str(col.lineNr)]
+        self.assertEqual(type(data["times"]),list)
+        self.assertEqual(type(data["values"]["a"]),list)
+        other=TimeLineCollection(registry=TimeLinesRegistry(),preloadData=data)
+        self.assertEqual(other.getTimes(),col.getTimes())
+        self.assertEqual(other.getValues("b"),col.getValues("b"))
+        other.setTime(6)
+        other.setValue("b",2)
+        self.assertEqual(other.getValues("b")[-1],2)
+
+theSuite.addTest(unittest.makeSuite(TimeLineCollectionTest,"test"))
+
+class TimeLineCollectionConcurrencyTest(unittest.TestCase):
+    def testReadWhileWriting(self):
+        reg=TimeLinesRegistry()
+        col=TimeLineCollection(noEmptyTime=False,registry=reg,splitThres=500,splitFun=min)
+        slave=TimeLineCollection(noEmptyTime=False,registry=reg)
+        col.addSlave(slave)
+        names=["v%d" % i for i in range(20)]
+        steps=3000
+        problems=[]
+
+        def writer():
+            try:
+                for i in range(steps):
+                    col.setTime(i)
+                    for n in names:
+                        col.setValue(n,i)
+                    slave.setValue("s",-i)
+            except Exception,e:
+                problems.append(e)
+
+        w=Thread(target=writer)
+        w.start()
+        reads=0
+        while w.isAlive() or reads==0:
+            for nr,data in reg.prepareForTransfer().iteritems():
+                for n,v in data["values"].iteritems():
+                    if len(v)!=len(data["times"]):
+                        problems.append("%s: %d values for %d times" % (n,len(v),len(data["times"])))
+            times,values,valid=col.snapshot()
+            for n,v in values.iteritems():
+                # the value is never bigger than the time. The entry that
+                # is current during a split is merged with the previous
+                # one, so the value written afterwards can be one step
+                # ahead of the time
+                if len(v)>1 and v[-2]>times[-2]+1:
+                    problems.append("%s: value %f after time %f" % (n,v[-2],times[-2]))
+            col.getLatestData()
+            reads+=1
+        w.join()
+
+        self.assertEqual(problems,[])
+        self.assert_(reads>0)
+        self.assertEqual(col.cTime,steps-1)
+        self.assertEqual(col.getValues("v0")[-1],steps-1)
+        self.assertEqual(slave.getValues("s")[-1],1-steps)
+
+theSuite.addTest(unittest.makeSuite(TimeLineCollectionConcurrencyTest,"test"))
+
+class TimeLineCollectionChangesTest(unittest.TestCase):
+    def checkSync(self,advanced):
+        reg=TimeLinesRegistry()
+        col=TimeLineCollection(registry=reg,splitThres=40,advancedSplit=advanced)
+        slave=TimeLineCollection(registry=reg)
+        col.addSlave(slave)
+        receiver=TimeLinesRegistry()
+        receiver.applyChanges(reg.prepareChangesForTransfer(receiver.lastSeen()))
+        transfered=0
+        for i in range(400):
+            col.setTime(i)
+            col.setValue("a",i%7)
+            if i>100:
+                # line that appears later
+                col.setValue("b",-i)
+            slave.setValue("s",i%3)
+            if i%9==0:
+                changes=reg.prepareChangesForTransfer(receiver.lastSeen())
+                transfered+=sum([len(c["times"]) for c in changes.values()])
+                receiver.applyChanges(changes)
+                full=reg.prepareForTransfer()
+                for nr,data in full.iteritems():
+                    other=receiver.get(int(nr))
+                    self.assertEqual(list(other.getTimes()),data["times"])
+                    for k,v in data["values"].iteritems():
+                        self.assertEqual(list(other.getValues(k)),v)
+                    self.assertEqual(other.lastValid,data["lastValid"])
+        self.assertEqual(receiver.get(col.lineNr).slaves,[receiver.get(slave.lineNr)])
+        return transfered
+
+    def testSimpleSplit(self):
+        self.checkSync(False)
+
+    def testAdvancedSplit(self):
+        self.checkSync(True)
+
+    def testOnlyNewData(self):
+        reg=TimeLinesRegistry()
+        col=TimeLineCollection(noEmptyTime=False,registry=reg)
+        fill(col,100)
+        receiver=TimeLinesRegistry()
+        receiver.applyChanges(reg.prepareChangesForTransfer(receiver.lastSeen()))
+        fill(col,3)
+        changes=reg.prepareChangesForTransfer(receiver.lastSeen())[str(col.lineNr)]
+        # the last entry is always sent again
+        self.assertEqual(changes["start"],99)
+        self.assertEqual(len(changes["times"]),4)
+
+    def testTooOld(self):
+        col=TimeLineCollection(registry=TimeLinesRegistry(),splitThres=10)
+        fill(col,5)
+        self.assertEqual(col.getChanges(col.generation,5)["start"],4)
+        self.assertEqual(col.getChanges(-1,5)["start"],0)
+        self.assertEqual(col.getChanges(col.generation+1,5)["start"],0)
+        for i in range(TimeLineCollection.maxRewrites+2):
+            fill(col,10)
+        self.assertEqual(col.getChanges(0,5)["start"],0)
+
+theSuite.addTest(unittest.makeSuite(TimeLineCollectionChangesTest,"test"))
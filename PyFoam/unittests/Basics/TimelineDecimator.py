@@ -0,0 +1,128 @@
+import unittest
+
+from PyFoam.Basics.TimelineDecimator import TimelineDecimator
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry
+from PyFoam.Basics.DummyPlotTimelines import DummyPlotTimelines
+from PyFoam.Basics.GeneralPlotTimelines import PlotLinesRegistry
+from PyFoam.Basics.CustomPlotInfo import CustomPlotInfo
+
+from array import array
+from math import sin
+
+theSuite=unittest.TestSuite()
+
+def makeData(n,start=0):
+    times=array('d',[0.1*i for i in range(start,start+n)])
+    values=array('d',[sin(0.01*i)*(i%13) for i in range(start,start+n)])
+    return times,values
+
+class TimelineDecimatorTest(unittest.TestCase):
+    def checkDecimated(self,times,values,tm,vals,resolution):
+        self.assert_(len(tm)<=4*(2*resolution+1)+1)
+        self.assertEqual(len(tm),len(vals))
+        self.assertEqual(tm[0],times[0])
+        self.assertEqual(tm[-1],times[-1])
+        self.assertEqual(vals[-1],values[-1])
+        self.assertEqual(min(vals),min(values))
+        self.assertEqual(max(vals),max(values))
+        # only original points in the original order
+        pos=dict([(t,i) for i,t in enumerate(times)])
+        last=-1
+        for t,v in zip(tm,vals):
+            self.assert_(pos[t]>last)
+            last=pos[t]
+            self.assertEqual(values[pos[t]],v)
+
+    def testSmallUnchanged(self):
+        times,values=makeData(100)
+        tm,vals=TimelineDecimator(100).decimate(times,values)
+        self.assertEqual(list(tm),list(times))
+        self.assertEqual(list(vals),list(values))
+
+    def testDecimate(self):
+        times,values=makeData(100000)
+        tm,vals=TimelineDecimator(100).decimate(times,values)
+        self.assert_(len(tm)<1000)
+        self.checkDecimated(times,values,tm,vals,100)
+
+    def testIncremental(self):
+        times,values=array('d'),array('d')
+        dec=TimelineDecimator(50)
+        for i in range(200):
+            t,v=makeData(237,start=len(times))
+            times.extend(t)
+            values.extend(v)
+            # the last value changes while it is written
+            values[-1]=-1000.*i
+            tm,vals=dec.decimate(times,values)
+            self.assertEqual(vals[-1],-1000.*i)
+            if i%20==19:
+                self.checkDecimated(times,values,tm,vals,50)
+            values[-1]=v[-1]
+
+    def testGeneration(self):
+        times,values=makeData(10000)
+        dec=TimelineDecimator(50)
+        dec.decimate(times,values,generation=0)
+        values=array('d',[-v for v in values])
+        tm,vals=dec.decimate(times,values,generation=1)
+        self.checkDecimated(times,values,tm,vals,50)
+
+    def testNoResolution(self):
+        times,values=makeData(10000)
+        tm,vals=TimelineDecimator(None).decimate(times,values)
+        self.assertEqual(len(tm),10000)
+
+class DecimatingPlot(DummyPlotTimelines):
+    plotResolution=50
+
+    def preparePlot(self):
+        self.built={}
+
+    def buildData(self,times,values,name,title,lastValid):
+        self.built[name]=(list(times),list(values),lastValid)
+
+class PlotDecimationTest(unittest.TestCase):
+    def testPlot(self):
+        reg=TimeLinesRegistry()
+        col=TimeLineCollection(registry=reg)
+        slave=TimeLineCollection(registry=reg)
+        col.addSlave(slave)
+        for i in range(5000):
+            col.setTime(i)
+            col.setValue("a",i%17)
+            slave.setValue("b",-(i%7))
+        plot=DecimatingPlot(col,CustomPlotInfo(),registry=PlotLinesRegistry())
+        self.assertEqual(sorted(plot.built.keys()),["a","b_slave00"])
+        tm,vals,lastValid=plot.built["a"]
+        self.assert_(len(tm)<500)
+        self.checkLine(col.getTimes(),col.getValues("a"),tm,vals)
+        tm,vals,lastValid=plot.built["b_slave00"]
+        self.assert_(len(tm)<500)
+        self.checkLine(slave.getTimes(),slave.getValues("b"),tm,vals)
+
+        for i in range(5000,6000):
+            col.setTime(i)
+            col.setValue("a",i%17)
+            slave.setValue("b",-(i%7))
+        plot.redo()
+        tm,vals,lastValid=plot.built["a"]
+        self.checkLine(col.getTimes(),col.getValues("a"),tm,vals)
+
+    def checkLine(self,times,values,tm,vals):
+        self.assertEqual(tm[-1],times[-1])
+        self.assertEqual(min(vals),min(values))
+        self.assertEqual(max(vals),max(values))
+
+    def testRangeNotDecimated(self):
+        col=TimeLineCollection(registry=TimeLinesRegistry())
+        for i in range(5000):
+            col.setTime(i)
+            col.setValue("a",i)
+        spec=CustomPlotInfo()
+        spec.start=100
+        plot=DecimatingPlot(col,spec,registry=PlotLinesRegistry())
+        self.assertEqual(len(plot.built["a"][0]),len(col.getTimes()))
+
+theSuite.addTest(unittest.makeSuite(TimelineDecimatorTest,"test"))
+theSuite.addTest(unittest.makeSuite(PlotDecimationTest,"test"))
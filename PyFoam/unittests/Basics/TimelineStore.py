@@ -0,0 +1,117 @@
+import unittest
+
+from PyFoam.Basics.TimelineStore import TimelineStore,readTimelineStore,isTimelineStore
+from PyFoam.Basics.TimeLineCollection import TimeLineCollection,TimeLinesRegistry
+
+from os import path,remove,getpid
+
+theSuite=unittest.TestSuite()
+
+class TimelineStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.theFile="/tmp/test.timelineStore.%d" % getpid()
+
+    def tearDown(self):
+        for f in [self.theFile,self.theFile+".tmp"]:
+            if path.exists(f):
+                remove(f)
+
+    def checkEqual(self,reg,lines):
+        full=reg.prepareForTransfer()
+        self.assertEqual(sorted(full.keys()),sorted(lines.keys()))
+        for nr,data in full.iteritems():
+            self.assertEqual(list(lines[nr]["times"]),data["times"])
+            self.assertEqual(sorted(lines[nr]["values"].keys()),sorted(data["values"].keys()))
+            for k,v in data["values"].iteritems():
+                self.assertEqual(list(lines[nr]["values"][k]),v)
+            self.assertEqual(lines[nr]["lastValid"],data["lastValid"])
+            self.assertEqual(lines[nr]["slaves"],data["slaves"])
+
+    def checkStore(self,advanced):
+        reg=TimeLinesRegistry()
+        col=TimeLineCollection(registry=reg,splitThres=40,advancedSplit=advanced)
+        slave=TimeLineCollection(registry=reg)
+        col.addSlave(slave)
+        store=TimelineStore(self.theFile,minCompactSize=0)
+        self.assert_(isTimelineStore(self.theFile))
+        self.assertEqual(readTimelineStore(self.theFile),({},{}))
+        for i in range(400):
+            col.setTime(i)
+            col.setValue("a",i%7)
+            if i>100:
+                # line that appears later
+                col.setValue("b",-i)
+            slave.setValue("s",i%3)
+            if i%9==0:
+                store.write(reg,{"0":{"nr":0,"data":col.lineNr}})
+                lines,plots=readTimelineStore(self.theFile)
+                self.checkEqual(reg,lines)
+                self.assertEqual(plots,{"0":{"nr":0,"data":col.lineNr}})
+        store.write(reg)
+        lines,plots=readTimelineStore(self.theFile)
+        self.checkEqual(reg,lines)
+
+        # the data can be used to build the lines again
+        other=TimeLinesRegistry()
+        for nr,data in lines.iteritems():
+            TimeLineCollection(preloadData=data,registry=other)
+        other.resolveSlaves()
+        self.assertEqual(list(other.get(col.lineNr).getValues("a")),list(col.getValues("a")))
+        self.assertEqual(other.get(col.lineNr).slaves,[other.get(slave.lineNr)])
+
+    def testSimpleSplit(self):
+        self.checkStore(False)
+
+    def testAdvancedSplit(self):
+        self.checkStore(True)
+
+    def testOnlyAppends(self):
+        reg=TimeLinesRegistry()
+        col=TimeLineCollection(noEmptyTime=False,registry=reg)
+        store=TimelineStore(self.theFile)
+        sizes=[]
+        for i in range(50):
+            for j in range(10):
+                col.setTime(i*10+j)
+                col.setValue("a",j)
+                col.setValue("b",-j)
+            store.write(reg)
+            sizes.append(path.getsize(self.theFile))
+        growth=[sizes[i+1]-sizes[i] for i in range(len(sizes)-1)]
+        # constant cost for every write
+        self.assert_(max(growth)-min(growth)<=8)
+        self.checkEqual(reg,readTimelineStore(self.theFile)[0])
+
+    def testCompact(self):
+        reg=TimeLinesRegistry()
+        col=TimeLineCollection(noEmptyTime=False,registry=reg,splitThres=100)
+        store=TimelineStore(self.theFile,minCompactSize=1000,compactFactor=2)
+        maxSize=0
+        for i in range(2000):
+            col.setTime(i)
+            col.setValue("a",i)
+            store.write(reg)
+            maxSize=max(maxSize,path.getsize(self.theFile))
+        self.assert_(maxSize<5000)
+        self.checkEqual(reg,readTimelineStore(self.theFile)[0])
+
+    def testIncompleteRecord(self):
+        reg=TimeLinesRegistry()
+        col=TimeLineCollection(noEmptyTime=False,registry=reg)
+        store=TimelineStore(self.theFile)
+        for i in range(10):
+            col.setTime(i)
+            col.setValue("a",i)
+        store.write(reg)
+        complete=readTimelineStore(self.theFile)[0]
+        col.setTime(10)
+        col.setValue("a",10)
+        store.write(reg)
+        size=path.getsize(self.theFile)
+        for cut in [1,9,30]:
+            open(self.theFile,"r+b").truncate(size-cut)
+            lines=readTimelineStore(self.theFile)[0]
+            self.assertEqual(list(lines[str(col.lineNr)]["times"]),
+                             list(complete[str(col.lineNr)]["times"]))
+
+theSuite.addTest(unittest.makeSuite(TimelineStoreTest,"test"))
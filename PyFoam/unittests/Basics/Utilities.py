@@ -0,0 +1,36 @@
+import unittest
+
+from PyFoam.Basics.Utilities import diskUsage
+
+from os import path,mkdir,link,symlink,getpid
+from shutil import rmtree
+import subprocess
+
+theSuite=unittest.TestSuite()
+
+class UtilitiesDiskUsageTest(unittest.TestCase):
+    def setUp(self):
+        self.theDir="/tmp/test.diskUsage.%d" % getpid()
+        if path.exists(self.theDir):
+            rmtree(self.theDir)
+        mkdir(self.theDir)
+        mkdir(path.join(self.theDir,"sub"))
+        open(path.join(self.theDir,"a"),"w").write("x"*100000)
+        open(path.join(self.theDir,"sub","b"),"w").write("y"*30000)
+        link(path.join(self.theDir,"a"),path.join(self.theDir,"sub","c"))
+        symlink("a",path.join(self.theDir,"d"))
+
+    def tearDown(self):
+        rmtree(self.theDir)
+
+    def testLikeDu(self):
+        du=int(subprocess.Popen(["du","-sk",self.theDir],
+                                stdout=subprocess.PIPE).communicate()[0].split()[0])
+        self.assertEqual(diskUsage(self.theDir)/1024,du)
+
+    def testStats(self):
+        stats={}
+        diskUsage(self.theDir,stats=stats)
+        self.assertEqual(sorted(stats.keys()),["a","d","sub"])
+
+theSuite.addTest(unittest.makeSuite(UtilitiesDiskUsageTest,"test"))
@@ -8,9 +8,35 @@ from DataStructures import theSuite as DataStructures
 from TemplateFile import theSuite as TemplateFile
 from CustomPlotInfo import theSuite as CustomPlotInfo
 from SpreadsheetData import theSuite as SpreadsheetData
+from BinaryFormat import theSuite as BinaryFormat
+from FoamFileIndex import theSuite as FoamFileIndex
+from CopyOnWriteDict import theSuite as CopyOnWriteDict
+from TimeLineCollection import theSuite as TimeLineCollection
+from LineReader import theSuite as LineReader
+from DataFileCache import theSuite as DataFileCache
+from ParallelGzipFile import theSuite as ParallelGzipFile
+from Utilities import theSuite as Utilities
+from ParallelRemover import theSuite as ParallelRemover
+from TimelineStore import theSuite as TimelineStore
+from TimelineDecimator import theSuite as TimelineDecimator
+from ReplotScheduler import theSuite as ReplotScheduler
+from GnuplotBinaryData import theSuite as GnuplotBinaryData
 
 theSuite.addTest(FoamFileGenerator)
 theSuite.addTest(DataStructures)
 theSuite.addTest(TemplateFile)
 theSuite.addTest(CustomPlotInfo)
 theSuite.addTest(SpreadsheetData)
+theSuite.addTest(BinaryFormat)
+theSuite.addTest(FoamFileIndex)
+theSuite.addTest(CopyOnWriteDict)
+theSuite.addTest(TimeLineCollection)
+theSuite.addTest(LineReader)
+theSuite.addTest(DataFileCache)
+theSuite.addTest(ParallelGzipFile)
+theSuite.addTest(Utilities)
+theSuite.addTest(ParallelRemover)
+theSuite.addTest(TimelineStore)
+theSuite.addTest(TimelineDecimator)
+theSuite.addTest(ReplotScheduler)
+theSuite.addTest(GnuplotBinaryData)
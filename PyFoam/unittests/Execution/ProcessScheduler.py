@@ -0,0 +1,104 @@
+import unittest
+import os,time
+
+from PyFoam.Execution.ProcessScheduler import ProcessScheduler
+
+theSuite=unittest.TestSuite()
+
+def square(x):
+    return x*x
+
+def fail(x):
+    raise ValueError("Failing for %s" % x)
+
+def crash(x):
+    os._exit(3)
+
+def sleepAndReport(t,fName):
+    f=open(fName,"a")
+    f.write("start %d\n" % os.getpid())
+    f.close()
+    time.sleep(t)
+    f=open(fName,"a")
+    f.write("end %d\n" % os.getpid())
+    f.close()
+    return os.getpid()
+
+def setEnviron(val):
+    os.environ["PYFOAM_SCHEDULER_TEST"]=val
+    return os.environ["PYFOAM_SCHEDULER_TEST"]
+
+def maxConcurrent(fName):
+    current=0
+    result=0
+    for l in open(fName).readlines():
+        if l.startswith("start"):
+            current+=1
+        else:
+            current-=1
+        result=max(result,current)
+    return result
+
+class ProcessSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.fName="/tmp/processSchedulerTest.%d" % os.getpid()
+        if os.path.exists(self.fName):
+            os.remove(self.fName)
+
+    def tearDown(self):
+        if os.path.exists(self.fName):
+            os.remove(self.fName)
+
+    def testResultsInOrder(self):
+        sched=ProcessScheduler(maxJobs=3,pollInterval=0.05)
+        for i in range(10):
+            sched.add(square,(i,))
+        order=[]
+        res=sched.run(finished=lambda i,ok,r:order.append((i,ok,r)))
+        self.assertEqual(order,[(i,True,i*i) for i in range(10)])
+        self.assertEqual(res,[(True,i*i) for i in range(10)])
+
+    def testFailuresDontStop(self):
+        sched=ProcessScheduler(maxJobs=2,pollInterval=0.05)
+        sched.add(square,(2,))
+        sched.add(fail,(3,))
+        sched.add(crash,(4,))
+        sched.add(square,(5,))
+        res=sched.run()
+        self.assertEqual(res[0],(True,4))
+        self.assertEqual(res[1][0],False)
+        self.assert_(res[1][1].find("Failing for 3")>=0)
+        self.assertEqual(res[2][0],False)
+        self.assertEqual(res[3],(True,25))
+
+    def testProcessesAreIsolated(self):
+        sched=ProcessScheduler(maxJobs=2,pollInterval=0.05)
+        sched.add(setEnviron,("a",))
+        sched.add(setEnviron,("b",))
+        self.assertEqual(sched.run(),[(True,"a"),(True,"b")])
+        self.assert_("PYFOAM_SCHEDULER_TEST" not in os.environ)
+
+    def testJobLimit(self):
+        sched=ProcessScheduler(maxJobs=2,maxCores=100,pollInterval=0.05)
+        for i in range(5):
+            sched.add(sleepAndReport,(0.2,self.fName))
+        sched.run()
+        self.assertEqual(maxConcurrent(self.fName),2)
+
+    def testCoreBudget(self):
+        sched=ProcessScheduler(maxCores=4,pollInterval=0.05)
+        sched.add(sleepAndReport,(0.2,self.fName),cores=2)
+        sched.add(sleepAndReport,(0.2,self.fName),cores=2)
+        # too big for the budget: runs alone
+        sched.add(sleepAndReport,(0.2,self.fName),cores=8)
+        sched.add(sleepAndReport,(0.2,self.fName),cores=3)
+        sched.add(sleepAndReport,(0.2,self.fName),cores=1)
+        started=[]
+        sched.run(started=started.append)
+        self.assertEqual(started,range(5))
+        lines=[l.split()[0] for l in open(self.fName).readlines()]
+        self.assertEqual(lines,["start","start","end","end",
+                                "start","end",
+                                "start","start","end","end"])
+
+theSuite.addTest(unittest.makeSuite(ProcessSchedulerTest,"test"))
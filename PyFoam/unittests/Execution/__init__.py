@@ -2,3 +2,7 @@
 import unittest
 
 theSuite=unittest.TestSuite()
+
+from ProcessScheduler import theSuite as ProcessScheduler
+
+theSuite.addTest(ProcessScheduler)
@@ -0,0 +1,125 @@
+
+import unittest
+import re
+
+from PyFoam.LogAnalysis.StandardLogAnalyzer import StandardLogAnalyzer
+from PyFoam.LogAnalysis.RegExpLineAnalyzer import RegExpLineAnalyzer
+from PyFoam.LogAnalysis.ValueLineAnalyzer import ValueLineAnalyzer
+from PyFoam.LogAnalysis.GeneralLineAnalyzer import literalAnchor
+
+theSuite=unittest.TestSuite()
+
+logText="""Starting time loop
+
+Time = 0.01
+
+Courant Number mean: 0.1 max: 0.5
+deltaT = 0.01
+DILUPBiCG:  Solving for Ux, Initial residual = 1, Final residual = 0.001, No Iterations 2
+DILUPBiCG:  Solving for Uy, Initial residual = 0.5, Final residual = 0.002, No Iterations 3
+DICPCG:  Solving for p, Initial residual = 0.9, Final residual = 0.0001, No Iterations 20
+time step continuity errors : sum local = 1e-05, global = 1e-18, cumulative = 1e-18
+ExecutionTime = 0.1 s  ClockTime = 0 s
+
+Time = 0.03
+
+Courant Number mean: 0.2 max: 0.7
+deltaT = 0.02
+DILUPBiCG:  Solving for Ux, Initial residual = 0.1, Final residual = 0.0001, No Iterations 1
+DILUPBiCG:  Solving for Uy, Initial residual = 0.05, Final residual = 0.0002, No Iterations 2
+DICPCG:  Solving for p, Initial residual = 0.09, Final residual = 0.00001, No Iterations 18
+time step continuity errors : sum local = 2e-05, global = 2e-18, cumulative = 3e-18
+ExecutionTime = 0.2 s  ClockTime = 1 s
+
+End
+"""
+
+def makeAnalyzer():
+    an=StandardLogAnalyzer(doTimelines=True,doFiles=False)
+    an.addAnalyzer("Courant",
+                   RegExpLineAnalyzer("courant",
+                                      "^Courant Number mean: (%f%) max: (%f%)$",
+                                      titles=["mean","max"],
+                                      doTimelines=True,
+                                      doFiles=False))
+    an.addAnalyzer("pIter",
+                   RegExpLineAnalyzer("pIter",
+                                      "^.+:  Solving for p, .+ No Iterations (%f%)$",
+                                      doTimelines=True,
+                                      doFiles=False))
+    return an
+
+def runLog(an):
+    for l in logText.split("\n"):
+        an.analyzeLine(l)
+    result={}
+    for nm in an.listAnalyzers():
+        lines=getattr(an.getAnalyzer(nm),"lines",None)
+        if lines:
+            result[nm]=dict([(v,lines.getValues(v)) for v in lines.getValueNames()])
+    return result
+
+class LiteralAnchorTest(unittest.TestCase):
+    def testAnchors(self):
+        self.assertEqual(literalAnchor(re.compile("^bounding (.+), min: (.+) max: (.+) average: (.+)$")),
+                         " average: ")
+        self.assertEqual(literalAnchor(re.compile("^(ab)c(d|e)")),"ab")
+        self.assertEqual(literalAnchor(re.compile(r"a\.b+")),"a.")
+
+    def testNoAnchor(self):
+        self.assertEqual(literalAnchor(re.compile("^(.+)$")),None)
+        self.assertEqual(literalAnchor(re.compile("Time|Iteration")),None)
+        self.assertEqual(literalAnchor(re.compile("time",re.I)),None)
+        self.assertEqual(literalAnchor(re.compile("(?i)time")),None)
+
+class FoamLogAnalyzerDispatchTest(unittest.TestCase):
+    def testAnalyzerAnchors(self):
+        an=makeAnalyzer()
+        an.addAnalyzer("Value",ValueLineAnalyzer("courant","Courant Number"))
+        self.assertEqual(an.getAnalyzer("Courant").getAnchor(),"Courant Number mean: ")
+        self.assertEqual(an.getAnalyzer("Time").getAnchor(),None)
+        self.assertEqual(an.getAnalyzer("Value").getAnchor(),None)
+
+    def testSameResult(self):
+        an=makeAnalyzer()
+        dispatched=runLog(an)
+
+        an=makeAnalyzer()
+        an.useAnchors=False
+        allLines=runLog(an)
+
+        self.assertEqual(dispatched,allLines)
+        self.assertEqual(dispatched["Linear"]["p"][-1],0.09)
+        self.assertEqual(dispatched["Courant"]["max"][-1],0.7)
+        self.assertEqual(dispatched["pIter"]["value 0"][-1],18)
+
+    def testSubAnchors(self):
+        an=makeAnalyzer()
+        an.addAnalyzer("solving",
+                       RegExpLineAnalyzer("solving",
+                                          "^.+Solving for (.+), .+ = (%f%), Final.+$",
+                                          idNr=1,
+                                          doTimelines=True,
+                                          doFiles=False))
+        an.addAnalyzer("solvingP",
+                       RegExpLineAnalyzer("solvingP",
+                                          "^.+Solving for p.+Iterations (%f%)$",
+                                          doTimelines=True,
+                                          doFiles=False))
+        self.assertEqual(an.getAnalyzer("solving").getAnchor(),"Solving for ")
+        self.assertEqual(an.getAnalyzer("solvingP").getAnchor(),"Solving for p")
+        dispatched=runLog(an)
+        self.assertEqual(dispatched["solvingP"]["value 0"][-1],18)
+        self.assertEqual(dispatched["solving"]["p_value 0"][-1],0.09)
+        self.assertEqual(dispatched["solving"]["Ux_value 0"][-1],0.1)
+
+    def testAddAnalyzerResetsDispatch(self):
+        an=makeAnalyzer()
+        an.analyzeLine("Time = 1")
+        self.assertNotEqual(an.dispatch,None)
+        an.addAnalyzer("Other",
+                       RegExpLineAnalyzer("other","^Other (%f%)$",doFiles=False))
+        self.assertEqual(an.dispatch,None)
+
+theSuite.addTest(unittest.makeSuite(LiteralAnchorTest,"test"))
+theSuite.addTest(unittest.makeSuite(FoamLogAnalyzerDispatchTest,"test"))
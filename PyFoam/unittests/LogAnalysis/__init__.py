@@ -4,5 +4,7 @@ import unittest
 theSuite=unittest.TestSuite()
 
 from TimeLineAnalyzer import theSuite as TimeLineAnalyzer
+from FoamLogAnalyzer import theSuite as FoamLogAnalyzer
 
 theSuite.addTest(TimeLineAnalyzer)
+theSuite.addTest(FoamLogAnalyzer)
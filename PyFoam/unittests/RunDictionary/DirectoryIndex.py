@@ -0,0 +1,76 @@
+import unittest
+
+from PyFoam.RunDictionary import DirectoryIndex
+from PyFoam.RunDictionary.DirectoryIndex import getListing,getRegions,clearIndex
+
+from os import path,mkdir,rename,getpid
+from shutil import rmtree
+
+theSuite=unittest.TestSuite()
+
+class DirectoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.dir="/tmp/test.directoryIndex.%d" % getpid()
+        if path.exists(self.dir):
+            rmtree(self.dir)
+        mkdir(self.dir)
+        for t in ["0","0.5","10","2","1e-3"]:
+            mkdir(path.join(self.dir,t))
+        for n in ["system","constant","processor10","processor2","0.org"]:
+            mkdir(path.join(self.dir,n))
+        clearIndex()
+
+    def tearDown(self):
+        rmtree(self.dir)
+        clearIndex()
+
+    def testListing(self):
+        lst=getListing(self.dir)
+        self.assertEqual(lst.times,["0","1e-3","0.5","2","10"])
+        self.assertEqual(lst.processors,["processor2","processor10"])
+        self.assert_("0.org" in lst.names)
+
+    def testChanges(self):
+        lst=getListing(self.dir)
+        version=lst.version
+        mkdir(path.join(self.dir,"20"))
+        mkdir(path.join(self.dir,"processor0"))
+        self.assert_(getListing(self.dir) is lst)
+        self.assertEqual(lst.times,["0","1e-3","0.5","2","10","20"])
+        self.assertEqual(lst.processors,["processor0","processor2","processor10"])
+        self.assert_(lst.version>version)
+        mkdir(path.join(self.dir,"1"))
+        rmtree(path.join(self.dir,"0.5"))
+        rename(path.join(self.dir,"processor10"),path.join(self.dir,"processor1"))
+        getListing(self.dir)
+        self.assertEqual(lst.times,["0","1e-3","1","2","10","20"])
+        self.assertEqual(lst.processors,["processor0","processor1","processor2"])
+
+    def testUnchanged(self):
+        oldIntervals=DirectoryIndex.racyInterval,DirectoryIndex.fineRacyInterval
+        try:
+            # trust the modification times of the directories
+            DirectoryIndex.racyInterval=-1e10
+            DirectoryIndex.fineRacyInterval=-1e10
+            lst=getListing(self.dir)
+            version=lst.version
+            self.assertEqual(lst.update(),False)
+            self.assertEqual(lst.version,version)
+            # forcing only rescans, but the contents are the same
+            self.assertEqual(lst.update(force=True),False)
+        finally:
+            DirectoryIndex.racyInterval,DirectoryIndex.fineRacyInterval=oldIntervals
+
+    def testRegions(self):
+        const=path.join(self.dir,"constant")
+        self.assertEqual(getRegions(const),[])
+        mkdir(path.join(const,"solid"))
+        mkdir(path.join(const,"fluid"))
+        mkdir(path.join(const,"fluid","polyMesh"))
+        self.assertEqual(getRegions(const),["fluid"])
+        mkdir(path.join(const,"solid","polyMesh"))
+        self.assertEqual(getRegions(const),["fluid","solid"])
+        rmtree(path.join(const,"fluid","polyMesh"))
+        self.assertEqual(getRegions(const),["solid"])
+
+theSuite.addTest(unittest.makeSuite(DirectoryIndexTest,"test"))
@@ -2,11 +2,12 @@
 import unittest
 
 from PyFoam.FoamInformation import oldTutorialStructure,foamTutorials,foamVersionNumber
-from os import path,environ,system
+from os import path,environ,system,remove
+from tempfile import mktemp
 
-from PyFoam.RunDictionary.ParsedParameterFile import FoamStringParser,ParsedParameterFile,ParsedBoundaryDict,DictProxy,TupleProxy,PyFoamParserError
+from PyFoam.RunDictionary.ParsedParameterFile import FoamStringParser,FoamFileParser,ParsedParameterFile,ParsedBoundaryDict,DictProxy,TupleProxy,PyFoamParserError,inputModes
 
-from PyFoam.Basics.FoamFileGenerator import Vector,Dimension,Field,Tensor,SymmTensor,Codestream
+from PyFoam.Basics.FoamFileGenerator import FoamFileGenerator,Vector,Dimension,Field,Tensor,SymmTensor,Codestream,UnparsedList
 
 from PyFoam.FoamInformation import oldAppConvention as oldApp
 
@@ -356,6 +357,233 @@ nix "a=3+x;b=4;";
         
 theSuite.addTest(unittest.makeSuite(FoamStringParserTest,"test"))
 
+class FoamStringParserReuseTest(unittest.TestCase):
+    def testAlternatingStartSymbols(self):
+        for i in range(3):
+            p1=FoamStringParser("test %d;" % i)
+            self.assertEqual(p1["test"],i)
+            p2=FoamStringParser("(a b %d)" % i,listDict=True)
+            self.assertEqual(p2.getData(),["a","b",i])
+
+    def testNoStateLeftOver(self):
+        p1=FoamStringParser("#inputMode overwrite\na 1; // comment\n")
+        self.assertEqual(p1.inputMode,inputModes.overwrite)
+        p2=FoamStringParser("a 2;\n")
+        self.assertEqual(p2.inputMode,inputModes.merge)
+        self.assertEqual(p2.getData().getDecoration("a"),"")
+        self.assertEqual(str(p2).find("comment"),-1)
+
+    def testReparseSameInstance(self):
+        p1=FoamStringParser("a 1;\nb (1 2 3);")
+        h,d=p1.parse("c\n 2;")
+        self.assertEqual(d.keys(),["c"])
+        self.assertEqual(p1._lexer.lineno,2)
+        
+theSuite.addTest(unittest.makeSuite(FoamStringParserReuseTest,"test"))
+
+class FoamStringParserNumpyListTest(unittest.TestCase):
+    def testScalarList(self):
+        p1=FoamStringParser("a nonuniform List<scalar> 4(1 2.5 3 -4e-2);",listLengthNumpy=3)
+        self.assertEqual(type(p1["a"]),Field)
+        self.assert_(not p1["a"].isUniform())
+        self.assertEqual(p1["a"].val.shape,(4,))
+        self.assertAlmostEqual(p1["a"][3],-0.04)
+
+    def testVectorList(self):
+        p1=FoamStringParser("a nonuniform List<vector> 3((1 2 3) (4 5 6)\n(7 8 9.5));",listLengthNumpy=3)
+        self.assertEqual(p1["a"].val.shape,(3,3))
+        self.assertEqual(p1["a"][2][2],9.5)
+
+    def testLabelList(self):
+        p1=FoamStringParser("a 4(1 2 3 4);",listLengthNumpy=3)
+        self.assertEqual(p1["a"].dtype.kind,"i")
+        self.assertEqual(list(p1["a"]),[1,2,3,4])
+
+    def testShortList(self):
+        p1=FoamStringParser("a 2(1 2);",listLengthNumpy=3)
+        self.assertEqual(p1["a"],[1,2])
+
+    def testNoNumbers(self):
+        p1=FoamStringParser("a 3(a b c);",listLengthNumpy=3)
+        self.assertEqual(p1["a"],["a","b","c"])
+
+    def testPrefixedSublists(self):
+        p1=FoamStringParser("a 2(4(1 2 3 4) 4(5 6 7 8));",listLengthNumpy=2)
+        self.assertEqual(p1["a"],[[1,2,3,4],[5,6,7,8]])
+
+    def testUnparsedHasPriority(self):
+        p1=FoamFileParser("a 4(1 2 3 4);",noHeader=True,listLengthNumpy=3,listLengthUnparsed=4)
+        self.assertEqual(type(p1["a"]),UnparsedList)
+        
+theSuite.addTest(unittest.makeSuite(FoamStringParserNumpyListTest,"test"))
+
+class FoamFileParserBinaryTest(unittest.TestCase):
+    def binaryFile(self,arch="LSB;label=32;scalar=64"):
+        import numpy
+        if arch[0]=="L":
+            order="<"
+        else:
+            order=">"
+        vec=numpy.array([[41.,40.,1.],[2.,3.,4.]],dtype=order+"f8")
+        lab=numpy.array([40,41],dtype=order+"i4")
+        return """FoamFile
+{
+    version 2.0;
+    format binary;
+    arch "%s";
+    class volVectorField;
+    object U;
+}
+internalField nonuniform List<vector> 2
+(%s)
+;
+value nonuniform List<scalar> 0();
+lab 2(%s);
+""" % (arch,vec.tostring(),lab.tostring())
+
+    def testReadBinary(self):
+        for arch in ["LSB;label=32;scalar=64","MSB;label=32;scalar=64"]:
+            p1=FoamFileParser(self.binaryFile(arch))
+            self.assertEqual(p1["internalField"].val.shape,(2,3))
+            self.assertEqual(p1["internalField"][0][0],41.)
+            self.assertEqual(p1["internalField"][1][2],4.)
+            self.assertEqual(list(p1["lab"]),[40,41])
+            self.assertEqual(p1["value"].val,[])
+
+    def testWriteBinary(self):
+        p1=FoamFileParser(self.binaryFile())
+        p1["internalField"][1][2]=5
+        txt=str(FoamFileGenerator(p1.getData(),header=p1.getHeader()))
+        self.assertEqual(txt,str(FoamFileGenerator(FoamFileParser(txt).getData(),
+                                                   header=p1.getHeader())))
+        p2=FoamFileParser(txt)
+        self.assertEqual(p2["internalField"][1][2],5.)
+        self.assertEqual(list(p2["lab"]),[40,41])
+
+    def testWriteAscii(self):
+        p1=FoamFileParser(self.binaryFile())
+        header=p1.getHeader()
+        header["format"]="ascii"
+        p2=FoamFileParser(str(FoamFileGenerator(p1.getData(),header=header)))
+        self.assertEqual(p2["internalField"][0],Vector(41,40,1))
+
+    def testAsciiListsInBinaryFile(self):
+        p1=FoamFileParser(self.binaryFile()+"""
+names 2(inlet outlet);
+single 1(wall);
+""")
+        self.assertEqual(p1["names"],["inlet","outlet"])
+        self.assertEqual(p1["single"],["wall"])
+        self.assertEqual(list(p1["lab"]),[40,41])
+
+    def testBinaryBoundaryFile(self):
+        p1=FoamFileParser("""FoamFile
+{
+    version 2.0;
+    format binary;
+    class polyBoundaryMesh;
+    object boundary;
+}
+2
+(
+    inlet
+    {
+        type patch;
+        nFaces 10;
+        startFace 100;
+    }
+    walls
+    {
+        type wall;
+        nFaces 20;
+        startFace 110;
+    }
+)
+""",boundaryDict=True)
+        data=p1.getData()
+        self.assertEqual(data[0::2],["inlet","walls"])
+        self.assertEqual(data[3]["type"],"wall")
+        self.assertEqual(data[1]["startFace"],100)
+
+theSuite.addTest(unittest.makeSuite(FoamFileParserBinaryTest,"test"))
+
+class ParsedParameterFileLazyTest(unittest.TestCase):
+    def setUp(self):
+        self.theFile=mktemp()
+        open(self.theFile,"w").write("""FoamFile
+{
+    version     2.0;
+    format      ascii;
+    class       volVectorField;
+    object      U;
+}
+// * * * //
+
+dimensions      [0 1 -1 0 0 0 0];
+
+internalField   nonuniform List<vector> 3
+(
+(1 2 3)
+(4 5 6)
+(7 8 9)
+)
+;
+
+boundaryField
+{
+    inlet
+    {
+        type            fixedValue;
+        value           uniform (10 0 0);
+    }
+    "(outlet|side)"
+    {
+        type            zeroGradient;
+    }
+}
+""")
+
+    def tearDown(self):
+        remove(self.theFile)
+
+    def testLazyRead(self):
+        test=ParsedParameterFile(self.theFile,lazy=True)
+        self.assertEqual(test.header["class"],"volVectorField")
+        self.assertEqual(test["boundaryField"]["inlet"]["type"],"fixedValue")
+        self.assert_(test.content.isUnparsed("internalField"))
+        self.assert_(test["boundaryField"]["inlet"].isUnparsed("value"))
+        self.assertEqual(test["boundaryField"]["outlet"]["type"],"zeroGradient")
+        self.assertEqual(test["internalField"][2],Vector(7,8,9))
+
+    def testSameAsFull(self):
+        test=ParsedParameterFile(self.theFile,lazy=True)
+        full=ParsedParameterFile(self.theFile)
+        self.assertEqual(test.content.keys(),full.content.keys())
+        self.assertEqual(str(test["boundaryField"]),str(full["boundaryField"]))
+        self.assertEqual(test["dimensions"],full["dimensions"])
+
+    def testWriteUnparsed(self):
+        test=ParsedParameterFile(self.theFile,lazy=True)
+        test["boundaryField"]["inlet"]["type"]="slip"
+        txt=str(test)
+        self.assert_(txt.find("internalField   nonuniform List<vector> 3\n(\n(1 2 3)")>0)
+        self.assert_(txt.find("value           uniform (10 0 0);")>0)
+        test.writeFile()
+        full=ParsedParameterFile(self.theFile)
+        self.assertEqual(full["boundaryField"]["inlet"]["type"],"slip")
+        self.assertEqual(full["internalField"][1],Vector(4,5,6))
+
+    def testModifyAndDelete(self):
+        test=ParsedParameterFile(self.theFile,lazy=True)
+        test["internalField"]=Field(Vector(0,0,0))
+        del test["dimensions"]
+        test.writeFile()
+        full=ParsedParameterFile(self.theFile)
+        self.assert_("dimensions" not in full)
+        self.assert_(full["internalField"].isUniform())
+
+theSuite.addTest(unittest.makeSuite(ParsedParameterFileLazyTest,"test"))
+
 class ParsedBoundaryDictTest(unittest.TestCase):
     def setUp(self):
         self.theFile="/tmp/test.boundaryFile"
@@ -100,6 +100,36 @@ class SampleDataTest(unittest.TestCase):
         self.assertEqual(p.domain(),(0.,3.))
         self.assertEqual(p.range(),(0.,1.))
 
+    def testDataIsShared(self):
+        sd=SampleDirectory(theDir)
+        st=sd["0"]
+        self.assert_(sd["0"] is st)
+        p=st[("line1","p")]
+        p3=st[("line1","p3")]
+        self.assert_(p.col0.base is p3.col0.base)
+        self.assertEqual(list(p3.data),[0.,1.,1.])
+        U2=st[("line1","U2")]
+        self.assert_(U2.isVector())
+        self.assertEqual(list(U2.component(0)),[0.,0.,1.])
+        self.assertEqual(U2.range(),(0.,3**0.5))
+
+    def testFileChanged(self):
+        sd=SampleDirectory(theDir)
+        self.assertEqual(sd["0"][("line1","p")].domain(),(0.,3.))
+        open(path.join(theDir,"samples","0","line1_p_p2_p3.xy"),"a").write("4 2 2 2\n")
+        self.assertEqual(SampleDirectory(theDir)["0"][("line1","p")].domain(),(0.,4.))
+
+    def testFileRewritten(self):
+        sd=SampleDirectory(theDir)
+        st=sd["0"]
+        p=st[("line1","p")]
+        self.assertEqual(list(p.data),[0.,0.,1.])
+        self.assert_(st[("line1","p")] is p)
+        open(path.join(theDir,"samples","0","line1_p_p2_p3.xy"),"w").write("5 6 7 8\n")
+        p=sd["0"][("line1","p")]
+        self.assertEqual(list(p.col0),[5.])
+        self.assertEqual(list(p.data),[6.])
+
     def testFailOnWrongData(self):
         sd=SampleDirectory(theDir)
         st=sd["0"]
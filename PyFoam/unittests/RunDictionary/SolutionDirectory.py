@@ -48,3 +48,229 @@ class SolutionDirectoryTest(unittest.TestCase):
         
 theSuite.addTest(unittest.makeSuite(SolutionDirectoryTest,"test"))
 
+
+from os import mkdir,getpid,stat,remove,listdir
+import tarfile
+from shutil import rmtree
+from PyFoam.RunDictionary.FileBasis import FileBasis
+
+class SolutionDirectoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.theFile="/tmp/test.solutionDirectoryIndex.%d" % getpid()
+        if path.exists(self.theFile):
+            rmtree(self.theFile)
+        mkdir(self.theFile)
+        for d in ["system","constant","0","1","0.5"]:
+            mkdir(path.join(self.theFile,d))
+        open(path.join(self.theFile,"system","controlDict"),"w").close()
+        mkdir(path.join(self.theFile,"constant","polyMesh"))
+        for p in range(3):
+            pDir=path.join(self.theFile,"processor%d" % p)
+            mkdir(pDir)
+            for t in ["0","2","3"]:
+                mkdir(path.join(pDir,t))
+
+    def tearDown(self):
+        rmtree(self.theFile)
+
+    def testTimesAndProcessors(self):
+        sol=SolutionDirectory(self.theFile,archive=None,paraviewLink=False)
+        self.assertEqual(sol.getTimes(),["0","0.5","1"])
+        self.assertEqual(sol.nrProcs(),3)
+        self.assertEqual(sol.processorDirs(),["processor0","processor1","processor2"])
+        self.assertEqual(sol.getParallelTimes(),["0","2","3"])
+        par=SolutionDirectory(self.theFile,archive=None,paraviewLink=False,parallel=True)
+        self.assertEqual(par.getTimes(),["0","2","3"])
+        self.assertEqual(par.getLast(),"3")
+
+    def testChangesAreSeen(self):
+        sol=SolutionDirectory(self.theFile,archive=None,paraviewLink=False)
+        other=SolutionDirectory(self.theFile,archive=None,paraviewLink=False)
+        mkdir(path.join(self.theFile,"2"))
+        self.assertEqual(sol.getLast(),"2")
+        self.assertEqual(other.getTimes(),["0","0.5","1","2"])
+        rmtree(path.join(self.theFile,"processor2"))
+        self.assertEqual(sol.nrProcs(),2)
+        mkdir(path.join(self.theFile,"processor0","4"))
+        par=SolutionDirectory(self.theFile,archive=None,paraviewLink=False,parallel=True)
+        self.assertEqual(par.getLast(),"4")
+        mkdir(path.join(self.theFile,"processor0","5"))
+        self.assertEqual(par.getLast(),"5")
+
+    def testRegions(self):
+        sol=SolutionDirectory(self.theFile,archive=None,paraviewLink=False)
+        self.assertEqual(sol.getRegions(),[])
+        self.assertEqual(sol.getRegions(defaultRegion=True),[None])
+        mkdir(path.join(self.theFile,"constant","solid"))
+        mkdir(path.join(self.theFile,"constant","solid","polyMesh"))
+        self.assertEqual(sol.getRegions(defaultRegion=True),[None,"solid"])
+
+theSuite.addTest(unittest.makeSuite(SolutionDirectoryIndexTest,"test"))
+
+class SolutionDirectoryCloneTest(unittest.TestCase):
+    def setUp(self):
+        self.theFile="/tmp/test.solutionDirectoryClone.%d" % getpid()
+        self.dest=self.theFile+".clone"
+        for d in [self.theFile,self.dest]:
+            if path.exists(d):
+                rmtree(d)
+        mkdir(self.theFile)
+        for d in ["system","constant","0","1",
+                  path.join("constant","polyMesh"),
+                  path.join("system",".svn")]:
+            mkdir(path.join(self.theFile,d))
+        for p in range(3):
+            pDir=path.join(self.theFile,"processor%d" % p)
+            for d in ["","0","2","constant",path.join("constant","polyMesh")]:
+                mkdir(path.join(pDir,d))
+        for f in ["system/controlDict","system/.svn/entries","0/U",
+                  "constant/transportProperties",
+                  "constant/polyMesh/points","constant/polyMesh/boundary",
+                  "processor1/0/U","processor1/constant/polyMesh/faces"]:
+            open(path.join(self.theFile,f),"w").write(f+"\n")
+
+    def tearDown(self):
+        for d in [self.theFile,self.dest]:
+            if path.exists(d):
+                rmtree(d)
+
+    def sameFile(self,f):
+        return stat(path.join(self.theFile,f)).st_ino==stat(path.join(self.dest,f)).st_ino
+
+    def testCopy(self):
+        sol=SolutionDirectory(self.theFile,archive=None,paraviewLink=False)
+        sol.cloneCase(self.dest)
+        self.assert_(path.exists(path.join(self.dest,"system","controlDict")))
+        self.assert_(not path.exists(path.join(self.dest,"system",".svn")))
+        self.assert_(not path.exists(path.join(self.dest,"1")))
+        self.assert_(not path.exists(path.join(self.dest,"processor1")))
+        self.assert_(not self.sameFile("constant/polyMesh/points"))
+
+    def testHardlinkParallel(self):
+        sol=SolutionDirectory(self.theFile,archive=None,paraviewLink=False,parallel=True)
+        sol.cloneCase(self.dest,link="hardlink",jobs=2)
+        for f in ["system/controlDict","constant/transportProperties",
+                  "constant/polyMesh/boundary","processor1/0/U"]:
+            self.assert_(not self.sameFile(f))
+            self.assertEqual(open(path.join(self.dest,f)).read(),f+"\n")
+        for f in ["constant/polyMesh/points","processor1/constant/polyMesh/faces"]:
+            self.assert_(self.sameFile(f))
+        for p in range(3):
+            self.assert_(path.isdir(path.join(self.dest,"processor%d" % p,"constant","polyMesh")))
+        self.assert_(not path.exists(path.join(self.dest,"system",".svn")))
+
+        # writing the clone does not change the original
+        f=FileBasis(path.join(self.dest,"constant","polyMesh","points"))
+        f.readFile()
+        f.writeFile("changed")
+        self.assertEqual(open(path.join(self.theFile,"constant","polyMesh","points")).read(),
+                         "constant/polyMesh/points\n")
+        self.assertEqual(open(path.join(self.dest,"constant","polyMesh","points")).read(),
+                         "changed")
+
+    def testReflink(self):
+        sol=SolutionDirectory(self.theFile,archive=None,paraviewLink=False)
+        # copies if the file-system does not support reflinks
+        sol.cloneCase(self.dest,link="reflink")
+        self.assert_(not self.sameFile("constant/polyMesh/points"))
+        self.assertEqual(open(path.join(self.dest,"constant","polyMesh","points")).read(),
+                         "constant/polyMesh/points\n")
+
+theSuite.addTest(unittest.makeSuite(SolutionDirectoryCloneTest,"test"))
+
+class SolutionDirectoryPackTest(unittest.TestCase):
+    def setUp(self):
+        self.theFile="/tmp/test.solutionDirectoryPack.%d" % getpid()
+        self.tarName=self.theFile+".tgz"
+        self.manifest=self.theFile+".manifest"
+        if path.exists(self.theFile):
+            rmtree(self.theFile)
+        mkdir(self.theFile)
+        for d in ["system","constant","0","1",
+                  path.join("constant","polyMesh"),
+                  path.join("system",".svn")]:
+            mkdir(path.join(self.theFile,d))
+        for f in ["system/controlDict","system/controlDict~","system/.svn/entries",
+                  "0/U","1/U","constant/polyMesh/points"]:
+            open(path.join(self.theFile,f),"w").write(f+"\n"*1000)
+
+    def tearDown(self):
+        rmtree(self.theFile)
+        for f in [self.tarName,self.manifest]:
+            if path.exists(f):
+                remove(f)
+
+    def members(self):
+        tar=tarfile.open(self.tarName)
+        names=sorted(tar.getnames())
+        for n in names:
+            self.assertEqual(tar.extractfile(n).read(),n[n.index("/")+1:]+"\n"*1000)
+        tar.close()
+        return names
+
+    def testPack(self):
+        sol=SolutionDirectory(self.theFile,archive=None,paraviewLink=False)
+        self.assertEqual(sol.packCase(self.tarName,base="case",threads=3),3)
+        self.assertEqual(self.members(),["case/0/U","case/constant/polyMesh/points",
+                                         "case/system/controlDict"])
+        sol.packCase(self.tarName,base="case",last=True,exclude=["polyMesh"],threads=1)
+        self.assertEqual(self.members(),["case/0/U","case/1/U","case/system/controlDict"])
+
+    def testIncremental(self):
+        sol=SolutionDirectory(self.theFile,archive=None,paraviewLink=False)
+        self.assertEqual(sol.packCase(self.tarName,base="case",manifest=self.manifest),3)
+        mkdir(path.join(self.theFile,"2"))
+        open(path.join(self.theFile,"2","U"),"w").write("2/U"+"\n"*1000)
+        open(path.join(self.theFile,"0","U"),"a").write("\n")
+        self.assertEqual(sol.packCase(self.tarName,base="case",additional=["[0-9]*"],
+                                      since=self.manifest,manifest=self.manifest),3)
+        tar=tarfile.open(self.tarName)
+        self.assertEqual(sorted(tar.getnames()),["case/0/U","case/1/U","case/2/U"])
+        tar.close()
+        self.assertEqual(sol.packCase(self.tarName,base="case",additional=["[0-9]*"],
+                                      since=self.manifest),0)
+        self.assertEqual(tarfile.open(self.tarName).getnames(),[])
+
+theSuite.addTest(unittest.makeSuite(SolutionDirectoryPackTest,"test"))
+
+class SolutionDirectoryClearTest(unittest.TestCase):
+    def setUp(self):
+        self.theFile="/tmp/test.solutionDirectoryClear.%d" % getpid()
+        if path.exists(self.theFile):
+            rmtree(self.theFile)
+        mkdir(self.theFile)
+        for d in ["system","constant","0","1","2","VTK","PyFoam.blockMesh"]:
+            mkdir(path.join(self.theFile,d))
+        open(path.join(self.theFile,"system","controlDict"),"w").close()
+        open(path.join(self.theFile,"1","U"),"w").write("x"*10000)
+        open(path.join(self.theFile,"blockMesh.analyzed"),"w").close()
+        for p in range(4):
+            pDir=path.join(self.theFile,"processor%d" % p)
+            mkdir(pDir)
+            for t in ["0","1","2","constant"]:
+                mkdir(path.join(pDir,t))
+
+    def tearDown(self):
+        rmtree(self.theFile)
+
+    def testDryRun(self):
+        sol=SolutionDirectory(self.theFile,archive=None,paraviewLink=False)
+        before=sorted(listdir(self.theFile))
+        remover=sol.clear(processor=False,dryRun=True)
+        self.assertEqual(sorted(listdir(self.theFile)),before)
+        self.assertEqual(remover.files,2+1+1+1+1+4*2)
+        self.assert_(remover.bytes>=10000)
+        self.assert_(remover.report().find("Would remove")==0)
+
+    def testClear(self):
+        sol=SolutionDirectory(self.theFile,archive=None,paraviewLink=False)
+        sol.clear(processor=False,jobs=3)
+        self.assertEqual(sorted(listdir(self.theFile)),
+                         ["0","constant","processor0","processor1","processor2","processor3","system"])
+        self.assertEqual(sorted(listdir(path.join(self.theFile,"processor2"))),["0","constant"])
+        self.assertEqual(sol.getTimes(),["0"])
+        sol.clearResults(removeProcs=True)
+        self.assertEqual(sol.nrProcs(),0)
+        self.assertEqual(sorted(listdir(self.theFile)),["0","constant","system"])
+
+theSuite.addTest(unittest.makeSuite(SolutionDirectoryClearTest,"test"))
@@ -52,6 +52,17 @@ def createDirectory():
 0 0 0 0 0 
 1 0 1
 3 1 1 1
+""")
+    mkdir(path.join(theDir,"vectors"))
+    mkdir(path.join(theDir,"vectors","0"))
+    open(path.join(theDir,"vectors","0","U"),"w").write(
+"""# x 0 1 2 3
+# y 0 0 0 1
+# z 1 1 1 1
+# Time
+0 (0 0 0) (1 2 3) (0 0 0) (0 0 0)
+1 (1 0 0) (1 2 4) (0 0 0) (0 0 0)
+3 (2 0 0) (1e300 1e300 1e300) (0 0 0) (0 0 0)
 """)
 
 class TimelineDirectoryTest(unittest.TestCase):
@@ -95,6 +106,29 @@ class TimelineValueTest(unittest.TestCase):
                                                    [1.0, 1.0, 1.0]])
         self.assertRaises(KeyError,sd.__getitem__,"ha")
 
+    def testGetTimesVector(self):
+        sd=TimelineDirectory(theDir,dirName="vectors")
+        st=sd["U"]
+        self.assert_(st.isVector)
+        self.assertEqual(st.getData([0.2,2.5]),[[0.0, 0.0, 0.0, 1.0, 2.0, 3.0]+6*[0.0],
+                                                [2.0, 0.0, 0.0]+6*[0.0]])
+
+    def testTimeRangeIncomplete(self):
+        sd=TimelineDirectory(theDir,dirName="timeline")
+        self.assertEqual(sd["h"].timeRange(),(0.,3.))
+        open(path.join(theDir,"timeline","0","h"),"a").write("4 1\n")
+        self.assertEqual(sd["h"].timeRange(),(0.,3.))
+        self.assertEqual(sd["h"].getData([5]),[[1.0]])
+
+    def testFileChanged(self):
+        sd=TimelineDirectory(theDir,dirName="timeline")
+        st=sd["p"]
+        self.assertEqual(st.timeRange(),(0.,3.))
+        self.assertEqual(st.getData([4]),[[1.0, 1.0, 1.0]])
+        open(st.file,"a").write("5 2 2 2\n")
+        self.assertEqual(st.timeRange(),(0.,5.))
+        self.assertEqual(st.getData([4.5]),[[2.0, 2.0, 2.0]])
+
     def testGetTimesTimeline(self):
         sd=TimelineDirectory(theDir,dirName="timeline")
         st=sd["p"]
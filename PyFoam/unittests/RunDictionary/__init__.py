@@ -10,6 +10,8 @@ from SolutionFile import theSuite as SolutionFile
 from SolutionDirectory import theSuite as SolutionDirectory
 from SampleDirectory import theSuite as SampleDirectory
 from TimeDirectory import theSuite as TimeDirectory
+from TimelineDirectory import theSuite as TimelineDirectory
+from DirectoryIndex import theSuite as DirectoryIndex
 
 theSuite=unittest.TestSuite()
 
@@ -22,3 +24,5 @@ theSuite.addTest(SolutionFile)
 theSuite.addTest(SolutionDirectory)
 theSuite.addTest(SampleDirectory)
 theSuite.addTest(TimeDirectory)
+theSuite.addTest(TimelineDirectory)
+theSuite.addTest(DirectoryIndex)